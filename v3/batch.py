@@ -0,0 +1,246 @@
+"""Vektoriserad spelmotor för att köra många Memory-spel samtidigt.
+
+Modulen innehåller GameBatch, som håller N spel av samma storlek som
+NumPy-arrayer och kör ett drag (flip eller resolve) i alla spel på en
+gång. Reglerna är exakt desamma som i Game.flip/Game.resolve i main.py,
+men istället för undantag returneras en felkod per spel så att ett
+ogiltigt drag i ett spel inte stoppar de andra.
+
+Används för stora simuleringar (t.ex. för att ställa in
+Settings.difficulties), inte för vanligt spelande. Kräver numpy.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from main import (
+    Game, CardState, GameState, WordRepository, RandomGen,
+    CompactBoard, build_id_deck
+)
+
+# Korttillstånd, samma koder som CompactBoard använder
+HIDDEN = 0
+FLIPPED = 1
+MATCHED = 2
+
+# Speltillstånd
+WAIT_FIRST = 0
+WAIT_SECOND = 1
+RESOLVING = 2
+FINISHED = 3
+
+# Felkoder som flip/resolve/step returnerar per spel
+OK = 0
+STATE_ERROR = 1      # motsvarar GameStateError
+COORD_ERROR = 2      # motsvarar CoordinateError
+INVALID_MOVE = 3     # motsvarar InvalidMove
+
+# Specialvärden i step(actions)
+NOOP = -1
+RESOLVE = -2
+
+_CARD_CODES = {CardState.HIDDEN: HIDDEN, CardState.FLIPPED: FLIPPED, CardState.MATCHED: MATCHED}
+_GAME_CODES = {
+    GameState.WAIT_FIRST: WAIT_FIRST,
+    GameState.WAIT_SECOND: WAIT_SECOND,
+    GameState.RESOLVING: RESOLVING,
+    GameState.FINISHED: FINISHED,
+}
+
+
+class GameBatch:
+    """N memory-spel av samma storlek lagrade som NumPy-arrayer.
+
+    Attribut (en rad per spel):
+        values:  (N, size*size) kortvärden som heltals-id:n
+        states:  (N, size*size) korttillstånd (HIDDEN/FLIPPED/MATCHED)
+        game_states: (N,) speltillstånd (WAIT_FIRST ... FINISHED)
+        moves:   (N,) antal drag (resolve) per spel
+        flipped: (N, 2) platt index för första/andra vända kortet, -1 om tomt
+        matched: (N,) antal matchade kort per spel
+    """
+    def __init__(self, values: np.ndarray, size: int) -> None:
+        """Skapar en batch med nyutdelade spel.
+
+        Args:
+            values: Array (N, size*size) med redan blandade kortvärden (id:n).
+            size: Brädans storlek (size x size).
+
+        Raises:
+            ValueError: Om values inte har formen (N, size*size)."""
+        values = np.asarray(values)
+        if values.ndim != 2 or values.shape[1] != size * size:
+            raise ValueError(f"values måste ha formen (N, {size * size})")
+        n_games = values.shape[0]
+
+        self.size = size
+        self.cells = size * size
+        self.values = values.astype(np.int32, copy=True)
+        self.states = np.zeros((n_games, self.cells), dtype=np.uint8)
+        self.game_states = np.full(n_games, WAIT_FIRST, dtype=np.uint8)
+        self.moves = np.zeros(n_games, dtype=np.int64)
+        self.flipped = np.full((n_games, 2), -1, dtype=np.int64)
+        self.matched = np.zeros(n_games, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return self.values.shape[0]
+
+    @classmethod
+    def from_seeds(cls, word_repo: WordRepository, size: int,
+                   seeds: list[int]) -> GameBatch:
+        """Skapa en batch där spel i delas ut precis som ett Game med RandomGen(seeds[i]).
+
+        Samma kortlek och blandning som build_id_deck + Game.start_new_game,
+        så resultaten kan jämföras direkt med den vanliga motorn."""
+        n_pairs = (size * size) // 2
+        rows = []
+        for seed in seeds:
+            rng = RandomGen(seed)
+            deck = build_id_deck(word_repo, n_pairs, rng, allow_repeats=True)
+            rng.shuffle(deck)
+            rows.append(deck)
+        return cls(np.array(rows, dtype=np.int32).reshape(len(seeds), size * size), size)
+
+    @classmethod
+    def from_games(cls, games: list[Game]) -> GameBatch:
+        """Kopiera tillståndet från en lista med Game-objekt (samma storlek).
+
+        Kortvärden på vanliga Board översätts till lokala id:n, på
+        CompactBoard används brädans id:n direkt.
+
+        Raises:
+            ValueError: Om listan är tom eller spelen har olika storlek."""
+        if not games:
+            raise ValueError("Behöver minst ett spel")
+        size = games[0].board.size
+        if any(game.board.size != size for game in games):
+            raise ValueError("Alla spel i en batch måste ha samma storlek")
+
+        ids: dict[str, int] = {}
+        values = np.empty((len(games), size * size), dtype=np.int32)
+        for i, game in enumerate(games):
+            board = game.board
+            if isinstance(board, CompactBoard):
+                values[i] = board.values
+            else:
+                values[i] = [ids.setdefault(str(board.get_card(r, c).value), len(ids))
+                             for r in range(size) for c in range(size)]
+
+        batch = cls(values, size)
+        for i, game in enumerate(games):
+            board = game.board
+            for r in range(size):
+                for c in range(size):
+                    batch.states[i, r * size + c] = _CARD_CODES[board.get_card(r, c).state]
+            batch.game_states[i] = _GAME_CODES[game.state()]
+            batch.moves[i] = game.moves
+            batch.matched[i] = board.matched_count()
+            for slot, (r, c) in enumerate(board.flipped_positions()):
+                batch.flipped[i, slot] = r * size + c
+        return batch
+
+    def _active(self, active: np.ndarray | None) -> np.ndarray:
+        """Index för spelen som ska påverkas (alla om active är None)"""
+        if active is None:
+            return np.arange(len(self))
+        active = np.asarray(active)
+        if active.dtype == bool:
+            return np.nonzero(active)[0]
+        return active
+
+    def flip(self, rows: np.ndarray, cols: np.ndarray,
+             active: np.ndarray | None = None) -> np.ndarray:
+        """Vänd ett kort i varje aktivt spel, samma regler som Game.flip.
+
+        Args:
+            rows: (N,) radindex per spel.
+            cols: (N,) kolumnindex per spel.
+            active: Bool-mask eller index för spelen som ska göra drag
+                (None = alla). Övriga spel lämnas orörda och får OK.
+
+        Returns:
+            (N,) felkoder: OK, STATE_ERROR, COORD_ERROR eller INVALID_MOVE.
+            Spel med felkod ändras inte."""
+        codes = np.zeros(len(self), dtype=np.uint8)
+        idx = self._active(active)
+        rows = np.asarray(rows)[idx]
+        cols = np.asarray(cols)[idx]
+        game_states = self.game_states[idx]
+
+        # Samma ordning på kontrollerna som i Game.flip
+        bad_state = (game_states != WAIT_FIRST) & (game_states != WAIT_SECOND)
+        in_bounds = (rows >= 0) & (rows < self.size) & (cols >= 0) & (cols < self.size)
+        bad_coord = ~bad_state & ~in_bounds
+        cells = np.where(in_bounds, rows * self.size + cols, 0)
+        bad_move = ~bad_state & in_bounds & (self.states[idx, cells] != HIDDEN)
+
+        codes[idx[bad_state]] = STATE_ERROR
+        codes[idx[bad_coord]] = COORD_ERROR
+        codes[idx[bad_move]] = INVALID_MOVE
+
+        ok = ~(bad_state | bad_coord | bad_move)
+        games = idx[ok]
+        cells = cells[ok]
+        first = self.game_states[games] == WAIT_FIRST
+
+        self.states[games, cells] = FLIPPED
+        self.flipped[games, np.where(first, 0, 1)] = cells
+        self.game_states[games] = np.where(first, WAIT_SECOND, RESOLVING)
+        return codes
+
+    def resolve(self, active: np.ndarray | None = None) -> np.ndarray:
+        """Försök para ihop de två vända korten i varje aktivt spel, som Game.resolve.
+
+        Args:
+            active: Bool-mask eller index för spelen (None = alla).
+
+        Returns:
+            (N,) felkoder: OK eller STATE_ERROR (spelet väntade inte på resolve)."""
+        codes = np.zeros(len(self), dtype=np.uint8)
+        idx = self._active(active)
+        resolving = self.game_states[idx] == RESOLVING
+        codes[idx[~resolving]] = STATE_ERROR
+
+        games = idx[resolving]
+        first = self.flipped[games, 0]
+        second = self.flipped[games, 1]
+        is_match = self.values[games, first] == self.values[games, second]
+
+        self.moves[games] += 1
+        new_state = np.where(is_match, MATCHED, HIDDEN).astype(np.uint8)
+        self.states[games, first] = new_state
+        self.states[games, second] = new_state
+        self.matched[games] += 2 * is_match
+        self.flipped[games] = -1
+
+        finished = self.matched[games] == self.cells
+        self.game_states[games] = np.where(finished, FINISHED, WAIT_FIRST)
+        return codes
+
+    def step(self, actions: np.ndarray) -> np.ndarray:
+        """Kör en vektor med drag, ett per spel.
+
+        Args:
+            actions: (N,) där ett värde ≥ 0 är ett platt cellindex att vända
+                (row * size + col), RESOLVE kör resolve och NOOP hoppar över spelet.
+
+        Returns:
+            (N,) felkoder, se flip och resolve."""
+        actions = np.asarray(actions)
+        rows, cols = np.divmod(np.maximum(actions, 0), self.size)
+        codes = self.flip(rows, cols, actions >= 0)
+        resolve_codes = self.resolve(actions == RESOLVE)
+        return np.where(actions == RESOLVE, resolve_codes, codes)
+
+    def hidden_mask(self) -> np.ndarray:
+        """(N, size*size) bool-array med True för dolda kort"""
+        return self.states == HIDDEN
+
+    def is_finished(self) -> np.ndarray:
+        """(N,) bool-array med True för färdiga spel"""
+        return self.game_states == FINISHED
+
+    def all_finished(self) -> bool:
+        """Retunerar True om alla spel i batchen är klara"""
+        return bool(np.all(self.game_states == FINISHED))
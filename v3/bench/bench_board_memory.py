@@ -0,0 +1,55 @@
+"""Benchmark: minnesåtgång för Board (Card-objekt) mot CompactBoard.
+
+Skapar många brädor av samma storlek i varje läge och mäter hur mycket
+minne som allokerats med tracemalloc. Alla CompactBoard delar samma
+Vocabulary, precis som när många spel körs samtidigt.
+
+Körs med:  python bench/bench_board_memory.py --size 8 --boards 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import tracemalloc
+
+from common import make_deck
+from main import Board, CompactBoard, Vocabulary, RandomGen
+
+
+def measure(factory, size: int, n_boards: int) -> tuple[int, list]:
+    """Mäter allokerat minne (bytes) för n_boards brädor från factory."""
+    rng = RandomGen(1)
+    decks = [make_deck(size, rng) for _ in range(n_boards)]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    boards = []
+    for deck in decks:
+        board = factory(size)
+        board.create_board(deck)
+        boards.append(board)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, boards
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=8)
+    parser.add_argument("--boards", type=int, default=2000)
+    args = parser.parse_args()
+
+    vocabulary = Vocabulary()
+    cells = args.size * args.size * args.boards
+    modes = {
+        "Board": Board,
+        "CompactBoard": lambda size: CompactBoard(size, vocabulary),
+    }
+    print(f"{args.boards} brädor á {args.size}x{args.size} ({cells} kort)")
+    print(f"{'Läge':<14}{'Totalt (KiB)':>14}{'Bytes/kort':>12}")
+    for name, factory in modes.items():
+        used, _ = measure(factory, args.size, args.boards)
+        print(f"{name:<14}{used / 1024:>14.1f}{used / cells:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
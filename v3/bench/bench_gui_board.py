@@ -0,0 +1,68 @@
+"""Benchmark: uppstartstid för brädvyerna i Tk-gränssnittet.
+
+Bygger ButtonBoardView och CanvasBoardView för olika brädstorlekar i ett
+dolt Tk-fönster och mäter tiden tills brädet är ritat (konstruktion,
+första update och update_idletasks), samt tiden för att rita om ett kort.
+
+Kräver en display (eller t.ex. xvfb-run).
+
+Körs med:  python bench/bench_gui_board.py --sizes 4 8 16 26
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+import tkinter as tk
+
+from common import make_deck
+from main import CardState, RandomGen, make_board
+from board_view import BOARD_VIEWS
+
+
+def measure(root: tk.Tk, view_cls, size: int) -> tuple[float, float]:
+    """Retunerar (uppstart, omritning av ett kort) i millisekunder."""
+    board = make_board(size)
+    board.create_board(make_deck(size, RandomGen(1)))
+    frame = tk.Frame(root)
+    frame.pack()
+
+    start = time.perf_counter()
+    view = view_cls(frame, board, lambda row, col: None)
+    view.widget.pack()
+    view.update(None, False)
+    root.update_idletasks()
+    startup = time.perf_counter() - start
+
+    board.get_card(0, 0).set_state(CardState.FLIPPED)
+    start = time.perf_counter()
+    view.update([(0, 0)], False)
+    root.update_idletasks()
+    redraw = time.perf_counter() - start
+
+    frame.destroy()
+    return startup * 1000, redraw * 1000
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[4, 8, 16, 26])
+    args = parser.parse_args(argv)
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        sys.exit(f"Kan inte starta Tk: {e}")
+    root.withdraw()
+
+    print(f"{'storlek':>8} {'vy':>8} {'uppstart ms':>12} {'ett kort ms':>12}")
+    for size in args.sizes:
+        for name, view_cls in BOARD_VIEWS.items():
+            startup, redraw = measure(root, view_cls, size)
+            print(f"{size:>8} {name:>8} {startup:>12.1f} {redraw:>12.3f}")
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
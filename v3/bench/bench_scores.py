@@ -0,0 +1,120 @@
+"""Benchmark: append och top för de olika score-lagringarna.
+
+Fyller en fil/databas med N påhittade resultat för varje lagring och
+mäter sedan:
+    append  medianen för att lägga till ett resultat
+    top     första top(limit=10) i en ny instans (kall, läser filen)
+    top2    ett andra anrop i samma instans (varm, cache/index)
+
+JSON-listan (ScoreRepository) skriver om hela filen vid varje append och
+körs därför bara upp till --json-max poster.
+
+Körs med:  python bench/bench_scores.py --sizes 10000 100000 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import common  # noqa: F401, lägger till main.py i sys.path
+from main import RandomGen, ScoreRepository, Settings
+from scores import (
+    JsonlScoreRepository, SqliteScoreRepository, encode_record
+)
+from score_segments import SegmentedScoreRepository, migrate_to_segments
+from score_binary import BinaryScoreRepository, migrate_to_binary
+
+BACKENDS = {
+    "json": (ScoreRepository, "score.json"),
+    "jsonl": (JsonlScoreRepository, "score.jsonl"),
+    "sqlite": (SqliteScoreRepository, "score.sqlite"),
+    "segments": (SegmentedScoreRepository, "score.segments"),
+    "bin": (BinaryScoreRepository, "score.bin"),
+}
+
+
+def make_entry(i: int, rng: RandomGen) -> dict:
+    """Ett påhittat resultat."""
+    return {
+        "game_id": i,
+        "user_name": f"spelare{rng.get(0, 999)}",
+        "moves": rng.get(8, 200),
+        "time": rng.get(5_000, 600_000) / 1000,
+        "difficulty": ("easy", "medium", "hard")[i % 3],
+        "finished": rng.get(0, 9) > 0,
+        "timestamp": "2025-11-18 14:17:36",
+        "seed": rng.get(),
+    }
+
+
+def fill(name: str, path: Path, n: int) -> None:
+    """Skriv n resultat direkt i filformatet (snabbare än n st append)."""
+    rng = RandomGen(1)
+    records = (make_entry(i, rng) for i in range(n))
+    if name == "json":
+        path.write_text(json.dumps(list(records)), encoding="utf-8")
+    elif name == "jsonl":
+        with path.open("wb") as f:
+            f.writelines(encode_record(e) for e in records)
+    elif name == "segments":
+        migrate_to_segments(records, path)
+    elif name == "bin":
+        migrate_to_binary(records, path)
+    else:
+        repo = SqliteScoreRepository(Settings(), path.parent, path.name)
+        repo._insert_many(records)
+        repo.close()
+
+
+def measure(name: str, directory: Path, n: int, appends: int) -> dict[str, float]:
+    """Tider i millisekunder för en lagring med n poster."""
+    cls, filename = BACKENDS[name]
+    path = directory / f"{n}-{filename}"
+    fill(name, path, n)
+
+    repo = cls(Settings(), directory, path.name)
+    start = time.perf_counter()
+    repo.top("easy", limit=10)
+    cold = time.perf_counter() - start
+    start = time.perf_counter()
+    repo.top("easy", limit=10)
+    warm = time.perf_counter() - start
+
+    rng = RandomGen(2)
+    times = []
+    for i in range(appends):
+        entry = make_entry(n + i, rng)
+        start = time.perf_counter()
+        repo.append(entry)
+        times.append(time.perf_counter() - start)
+    if isinstance(repo, SqliteScoreRepository):
+        repo.close()
+    return {"append": statistics.median(times) * 1000, "top": cold * 1000, "top2": warm * 1000}
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--appends", type=int, default=20, help="Antal append att mäta per lagring")
+    parser.add_argument("--json-max", type=int, default=100_000,
+                        help="Största N för JSON-listan (default: 100000)")
+    args = parser.parse_args(argv)
+
+    print(f"{'poster':>9} {'lagring':>8} {'append ms':>10} {'top ms':>10} {'top2 ms':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.sizes:
+            for name in BACKENDS:
+                if name == "json" and n > args.json_max:
+                    continue
+                appends = min(args.appends, 3) if name == "json" else args.appends
+                r = measure(name, Path(tmp), n, appends)
+                print(f"{n:>9} {name:>8} {r['append']:>10.3f} {r['top']:>10.1f} {r['top2']:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
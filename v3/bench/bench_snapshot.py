@@ -0,0 +1,73 @@
+"""Benchmark: Game.snapshot/Game.restore jämfört med pickle.
+
+Mäter storlek per sparat spel och tid för att spara och läsa tillbaka,
+för spel som är halvvägs spelade. Körs med olika brädstorlekar och med
+och utan RNG-tillstånd (som står för ca 2,5 kB av en snapshot).
+
+Körs med:  python bench/bench_snapshot.py --sizes 4 8 26 --repeat 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import pickle
+import time
+
+import common  # noqa: F401, lägger till main.py i sys.path
+from main import Game, CardState, RandomGen, Vocabulary, make_board
+
+
+def half_played_game(size: int, vocabulary: Vocabulary) -> Game:
+    """Ett spel där ungefär hälften av paren är matchade."""
+    n_pairs = size * size // 2
+    deck = [vocabulary.intern(f"ord{i}") for i in range(n_pairs) for _ in range(2)]
+    game = Game(make_board(size, vocabulary), "bench", RandomGen(1))
+    game.start_new_game(deck)
+    board = game.board
+    by_value: dict[str, list[tuple[int, int]]] = {}
+    for row in range(size):
+        for col in range(size):
+            by_value.setdefault(board.get_card(row, col).value, []).append((row, col))
+    for first, second in list(by_value.values())[:n_pairs // 2]:
+        game.flip(*first)
+        game.flip(*second)
+        game.resolve()
+    assert board.get_card(*first).state == CardState.MATCHED
+    return game
+
+
+def timed(func, repeat: int) -> float:
+    """Medeltid i mikrosekunder för ett anrop av func."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[4, 8, 26])
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    vocabulary = Vocabulary()
+    print(f"{'Storlek':<9}{'Format':<22}{'Bytes':>9}{'Spara (µs)':>12}{'Läsa (µs)':>12}")
+    for size in args.sizes:
+        game = half_played_game(size, vocabulary)
+        formats = {
+            "snapshot": (lambda: game.snapshot(),
+                         lambda data: Game.restore(data, vocabulary)),
+            "snapshot utan rng": (lambda: game.snapshot(include_rng=False),
+                                  lambda data: Game.restore(data, vocabulary)),
+            "pickle": (lambda: pickle.dumps(game, pickle.HIGHEST_PROTOCOL),
+                       pickle.loads),
+        }
+        for name, (dump, load) in formats.items():
+            data = dump()
+            save_us = timed(dump, args.repeat)
+            load_us = timed(lambda: load(data), args.repeat)
+            print(f"{size:<9}{name:<22}{len(data):>9}{save_us:>12.1f}{load_us:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
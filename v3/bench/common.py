@@ -0,0 +1,23 @@
+"""Gemensamt för benchmark-skripten i bench/.
+
+Skripten körs direkt (python bench/bench_x.py), så katalogen ovanför,
+där main.py ligger, läggs till i sys.path när modulen importeras.
+Importera därför common före main och de andra modulerna.
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from main import RandomGen  # noqa: E402
+
+
+def make_deck(size: int, rng: RandomGen) -> list[str]:
+    """Bygger en kortlek med påhittade ord (oberoende av ordfilen)."""
+    n_pairs = size * size // 2
+    deck = [f"ord{i}" for i in range(n_pairs) for _ in range(2)]
+    rng.shuffle(deck)
+    return deck
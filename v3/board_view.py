@@ -0,0 +1,211 @@
+"""Vyer som ritar ett Board i Tk-gränssnittet.
+
+Två varianter med samma gränssnitt:
+
+ButtonBoardView
+    En ttk.Button per kort, som gui.py alltid har gjort. Bra för små
+    brädor men varje knapp är en egen widget, så 26x26 ger 676 widgets.
+
+CanvasBoardView
+    Hela brädet på en enda tk.Canvas med en rektangel och en text per
+    kort. Klick översätts till (row, col) med ren aritmetik och bara de
+    ändrade korten konfigureras om. Startar snabbt även på stora brädor.
+
+Båda tar emot ändrade positioner från Game.flip/Game.resolve i update().
+"""
+
+from __future__ import annotations
+
+import tkinter as tk
+from tkinter import ttk
+from typing import Callable
+
+from main import Board, CardState
+
+CANVAS_MIN_SIZE = 10
+"""Brädor med minst så här många rader ritas på Canvas i läget "auto"."""
+
+
+class ButtonBoardView:
+    """Brädet som ett rutnät av ttk.Button, en per kort."""
+    def __init__(self, parent: tk.Misc, board: Board,
+                 on_click: Callable[[int, int], None]) -> None:
+        """Args:
+            parent: Widget som brädet läggs i.
+            board: Brädet som ska visas.
+            on_click: Anropas med (row, col) när ett kort klickas."""
+        self.board = board
+        self.widget = ttk.Frame(parent)
+        self.buttons: dict[tuple[int, int], ttk.Button] = {}
+        # låsläget som de dolda knapparna visar just nu
+        self._locked = False
+
+        for r in range(board.size):
+            for c in range(board.size):
+                btn = ttk.Button(
+                    self.widget,
+                    text="",
+                    width=12,
+                    command=lambda row=r, col=c: on_click(row, col)
+                )
+                btn.grid(row=r, column=c, padx=2, pady=2, sticky="nsew")
+                self.buttons[(r, c)] = btn
+
+    def update(self, changed: list[tuple[int, int]] | None, locked: bool) -> None:
+        """Konfigurera om knapparna som ändrats.
+
+        Args:
+            changed: Positioner som bytt tillstånd, None ritar om alla.
+            locked: True om dolda kort inte får klickas just nu."""
+        board = self.board
+        if changed is None:
+            changed = list(self.buttons)
+        elif locked != self._locked:
+            # låset har slagit om, dolda knappar ska bli disabled/normal
+            changed = list(changed) + board.hidden_positions()
+        self._locked = locked
+
+        for r, c in changed:
+            btn = self.buttons[(r, c)]
+            card = board.get_card(r, c)
+
+            if card.state == CardState.HIDDEN:
+                btn.config(text="", state=("disabled" if locked else "normal"))
+
+            elif card.state == CardState.FLIPPED:
+                btn.config(text=card.value, state="disabled")
+
+            elif card.state == CardState.MATCHED:
+                btn.config(text=card.value, state="disabled")
+
+
+class CanvasBoardView:
+    """Brädet ritat på en enda tk.Canvas.
+
+    Varje kort är en rektangel och en text med taggen "cell<index>", där
+    index är row * size + col. Item-id:n sparas i listor så update bara
+    behöver itemconfigure på de ändrade korten. Rektanglarna för dolda
+    kort har dessutom taggen "hidden", så när låset slår om räcker ett
+    enda itemconfigure("hidden", ...) istället för ett per dolt kort."""
+    CELL_WIDTH = 96
+    CELL_HEIGHT = 32
+    MIN_CELL_WIDTH = 40
+    MIN_CELL_HEIGHT = 18
+    GAP = 2
+
+    COLORS = {
+        CardState.HIDDEN: "#b0c4de",
+        CardState.FLIPPED: "#ffffff",
+        CardState.MATCHED: "#c8e6c9",
+    }
+    LOCKED_COLOR = "#d3d3d3"
+
+    def __init__(self, parent: tk.Misc, board: Board,
+                 on_click: Callable[[int, int], None]) -> None:
+        """Args:
+            parent: Widget som brädet läggs i.
+            board: Brädet som ska visas.
+            on_click: Anropas med (row, col) när ett dolt kort klickas."""
+        self.board = board
+        self.on_click = on_click
+        self._locked = False
+
+        size = board.size
+        # krymp korten så brädet får plats på skärmen
+        self.cell_width = max(self.MIN_CELL_WIDTH, min(
+            self.CELL_WIDTH, int(parent.winfo_screenwidth() * 0.9) // size))
+        self.cell_height = max(self.MIN_CELL_HEIGHT, min(
+            self.CELL_HEIGHT, int(parent.winfo_screenheight() * 0.8) // size))
+        font_size = 9 if self.cell_width >= 70 else 7
+
+        self.widget = tk.Canvas(
+            parent,
+            width=size * self.cell_width,
+            height=size * self.cell_height,
+            highlightthickness=0,
+        )
+        self.rects: list[int] = []
+        self.texts: list[int] = []
+        w, h, gap = self.cell_width, self.cell_height, self.GAP
+        for r in range(size):
+            for c in range(size):
+                tag = f"cell{r * size + c}"
+                x, y = c * w, r * h
+                self.rects.append(self.widget.create_rectangle(
+                    x + gap, y + gap, x + w - gap, y + h - gap,
+                    fill=self.COLORS[CardState.HIDDEN], outline="#808080", tags=(tag, "hidden")))
+                self.texts.append(self.widget.create_text(
+                    x + w // 2, y + h // 2, text="", width=w - 2 * gap,
+                    font=("TkDefaultFont", font_size), tags=(tag,)))
+
+        self.widget.bind("<Button-1>", self._clicked)
+
+    def cell_at(self, x: int, y: int) -> tuple[int, int] | None:
+        """Översätt en punkt på canvasen till (row, col).
+
+        None utanför brädet och i mellanrummet (GAP) runt korten, där
+        ingen rektangel ritas, precis som padding runt knapparna."""
+        row, dy = divmod(y, self.cell_height)
+        col, dx = divmod(x, self.cell_width)
+        if not (0 <= row < self.board.size and 0 <= col < self.board.size):
+            return None
+        gap = self.GAP
+        if not (gap <= dx < self.cell_width - gap and gap <= dy < self.cell_height - gap):
+            return None
+        return row, col
+
+    def _clicked(self, event: tk.Event) -> None:
+        cell = self.cell_at(event.x, event.y)
+        # uppvända och matchade kort går inte att klicka, som disabled knappar
+        if cell is None or self._locked or not self.board.is_hidden(*cell):
+            return
+        self.on_click(*cell)
+
+    def update(self, changed: list[tuple[int, int]] | None, locked: bool) -> None:
+        """Rita om korten som ändrats.
+
+        Args:
+            changed: Positioner som bytt tillstånd, None ritar om alla.
+            locked: True om dolda kort inte får klickas just nu."""
+        board = self.board
+        size = board.size
+        if changed is None:
+            changed = [(r, c) for r in range(size) for c in range(size)]
+        hidden_fill = self.LOCKED_COLOR if locked else self.COLORS[CardState.HIDDEN]
+
+        canvas = self.widget
+        for r, c in changed:
+            index = r * size + c
+            rect = self.rects[index]
+            card = board.get_card(r, c)
+            if card.state == CardState.HIDDEN:
+                canvas.addtag_withtag("hidden", rect)
+                canvas.itemconfigure(rect, fill=hidden_fill)
+                canvas.itemconfigure(self.texts[index], text="")
+            else:
+                canvas.dtag(rect, "hidden")
+                canvas.itemconfigure(rect, fill=self.COLORS[card.state])
+                canvas.itemconfigure(self.texts[index], text=card.value)
+
+        if locked != self._locked:
+            # alla dolda kort byter färg med ett enda anrop
+            canvas.itemconfigure("hidden", fill=hidden_fill)
+        self._locked = locked
+
+
+BOARD_VIEWS = {"buttons": ButtonBoardView, "canvas": CanvasBoardView}
+
+
+def board_view_class(name: str, size: int) -> type[ButtonBoardView] | type[CanvasBoardView]:
+    """Välj vy-klass efter namn ("buttons", "canvas" eller "auto").
+
+    "auto" ger knappar för små brädor och Canvas från CANVAS_MIN_SIZE.
+
+    Raises:
+        ValueError: Om namnet är okänt."""
+    if name == "auto":
+        name = "canvas" if size >= CANVAS_MIN_SIZE else "buttons"
+    try:
+        return BOARD_VIEWS[name]
+    except KeyError:
+        raise ValueError(f"Okänd brädvy: {name}") from None
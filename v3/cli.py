@@ -11,13 +11,15 @@ den här filen sköter "snacket" med spelaren i terminalen.
 from __future__ import annotations
 from typing import Any
 
-import os
 import time
 from main import (
     Game, Board, GameError,
     GameState, WordRepository, ScoreRepository,
-    Settings, RandomGen, build_deck
+    Settings, new_game
 )
+from score_stats import ScoreStats
+from scores import APP_SCORE_FILE, open_score_repository
+from terminal import TerminalRenderer
 
 
 class QuitGame(Exception):
@@ -31,10 +33,11 @@ class QuitGame(Exception):
 def clear() -> None:
     """Rensar terminalfönstret.
 
-    Använder rätt kommando beroende på operativsystem (Windows eller Unix).
+    Skriver ANSI-koden för att rensa skärmen direkt, istället för att starta
+    ett skalkommando. Om stdout inte är en terminal görs ingenting.
     Inga värden returneras, den bara "städer upp" innan nästa utskrift.
     """
-    os.system("cls" if os.name == "nt" else "clear")
+    TerminalRenderer().clear()
 
 
 def pause() -> None:
@@ -68,7 +71,16 @@ def choose_difficulty(settings: Settings) -> str:
         print("Ogiltig svårigetsgrad")
 
 
-def ask_coord(board: Board, prompt: str) -> tuple[int, int]:
+def show_message(text: str, renderer: TerminalRenderer | None = None) -> None:
+    """Visa ett meddelande under brädet, eller med print utan renderer."""
+    if renderer is None:
+        print(text)
+    else:
+        renderer.message(text)
+
+
+def ask_coord(board: Board, prompt: str,
+              renderer: TerminalRenderer | None = None) -> tuple[int, int]:
     """Frågar spelaren efter en koordinat på brädet.
 
     Spelaren kan skriva t.ex. ``A1`` eller ``b3``, eller ``q`` för att
@@ -77,6 +89,7 @@ def ask_coord(board: Board, prompt: str) -> tuple[int, int]:
     Args:
         board: Det aktuella spelbrädet som används för att tolka koordinater.
         prompt: Text som visas innan inmatning, t.ex. "Drag 1: ".
+        renderer: Skriver felmeddelanden under brädet (default: print).
 
     Returns:
         En tuple (rad, kolumn) med tolkad koordinat.
@@ -91,10 +104,11 @@ def ask_coord(board: Board, prompt: str) -> tuple[int, int]:
         try:
             return board.parse_coord(coord)
         except GameError as e:
-            print(f"{e}, [q] för att avsluta")
+            show_message(f"{e}, [q] för att avsluta", renderer)
 
 
-def ask_valid_flip(game: Game, board: Board, prompt: str) -> tuple[int, int]:
+def ask_valid_flip(game: Game, board: Board, prompt: str,
+                   renderer: TerminalRenderer | None = None) -> tuple[int, int]:
     """Frågar efter en koordinat och gör ett giltigt drag.
 
     Den här funktionen kombinerar inmatning av koordinat med själva
@@ -105,17 +119,18 @@ def ask_valid_flip(game: Game, board: Board, prompt: str) -> tuple[int, int]:
         game: Det aktuella Game-objektet.
         board: Brädet som används för att tolka koordinater.
         prompt: Text som visas innan inmatning.
+        renderer: Skriver felmeddelanden under brädet (default: print).
 
     Returns:
         En tuple (rad, kolumn) för den ruta som faktiskt vändes.
     """
     while True:
-        row, col = ask_coord(board, prompt)
+        row, col = ask_coord(board, prompt, renderer)
         try:
             game.flip(row, col)
             return row, col
         except GameError as e:
-            print(e)
+            show_message(str(e), renderer)
 
 
 def get_username() -> str:
@@ -140,7 +155,8 @@ def get_username() -> str:
         print("Namnet får max vara 15 tecken, försök igen.")
 
 
-def play_game(settings: Settings, word_repo: WordRepository) -> Game:
+def play_game(settings: Settings, word_repo: WordRepository,
+              renderer: TerminalRenderer | None = None) -> Game:
     """Kör ett helt Memory-spel från start till slut.
 
     Skapar en ny kortlek baserat på vald svårighetsgrad, startar spelet
@@ -148,46 +164,46 @@ def play_game(settings: Settings, word_repo: WordRepository) -> Game:
 
     Under spelets gång sköter funktionen utskrift av brädet, inmatning
     av drag och anrop till ``game.resolve`` när två kort har valts.
+    Brädet ritas med en TerminalRenderer, som bara skriver om de kort
+    som ändrats sedan förra gången.
 
     Args:
         settings: Inställningar för spelet (t.ex. storlekar per svårighetsgrad).
         word_repo: Repository som används för att bygga upp kortleken.
+        renderer: Renderer för brädet (default: en ny för stdout).
 
     Returns:
         Game-objektet efter att spelet avslutats (klart eller avbrutet).
     """
-    rng = RandomGen()
     difficulty = choose_difficulty(settings)
-    size = settings.difficulties[difficulty]
-    n_pairs = (size * size) // 2
-
-    deck = build_deck(word_repo, n_pairs, rng)
-    board = Board(size)
-    game = Game(board, difficulty, rng)
-    game.start_new_game(deck)
+    game = new_game(settings, word_repo, difficulty, journal=True)
+    board = game.board
+    renderer = renderer or TerminalRenderer()
+    renderer.clear()
     try:
         while not game.is_finished():
-            print(board)
-            ask_valid_flip(game, board, "Drag 1: ")
-            clear()
-            print(board)
-            ask_valid_flip(game, board, "Drag 2: ")
-            clear()
-            print(board)
+            renderer.draw(board)
+            ask_valid_flip(game, board, "Drag 1: ", renderer)
+            renderer.draw(board)
+            ask_valid_flip(game, board, "Drag 2: ", renderer)
+            renderer.draw(board)
             pause()
-            clear()
 
             if game.state() == GameState.RESOLVING:
                 try:
                     game.resolve()
                 except GameError as e:
-                    print(e)
+                    renderer.message(str(e))
+        renderer.draw(board)
     except QuitGame:
         print("Avslutar spel...")
+    finally:
+        renderer.close()
     return game
 
 
-def save_score(username: str, score_repo: ScoreRepository, game: Game) -> dict[str, Any]:
+def save_score(username: str, score_repo: ScoreRepository, game: Game,
+               stats: ScoreStats | None = None) -> dict[str, Any]:
     """Sparar resultatet från ett spel till highscore-listan.
 
     Bygger upp en dictionary med spelinformation (drag, tid, namn osv.)
@@ -197,6 +213,7 @@ def save_score(username: str, score_repo: ScoreRepository, game: Game) -> dict[s
         username: Namnet som ska kopplas till resultatet.
         score_repo: Repository som hanterar lagring av highscores.
         game: Game-objektet som innehåller data om spelrundan.
+        stats: Statistik per spelare som uppdateras med resultatet.
 
     Returns:
         En dictionary med hela score-posten som sparats.
@@ -211,7 +228,13 @@ def save_score(username: str, score_repo: ScoreRepository, game: Game) -> dict[s
         "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
         "seed": game.rng.seed,
     }
-    score_repo.append(entry)
+    if game.journal is not None:
+        # alla drag, så att resultatet kan spelas om och kontrolleras (replay.py)
+        entry["journal"] = game.journal.to_text()
+    if stats is not None:
+        stats.append(entry)
+    else:
+        score_repo.append(entry)
     return entry
 
 
@@ -289,13 +312,7 @@ def show_result(game: Game, score_repo: ScoreRepository, entry: dict[str, Any])
     difficulty = entry.get("difficulty")
     if not isinstance(difficulty, str):  # Säkerställer att difficulty är str (mypy klagar annrs)
         raise ValueError
-    finished_games = score_repo.top(difficulty)
-    positions = [
-        i for i, game in enumerate(finished_games)
-        if game.get("game_id") == entry.get("game_id")
-    ]
-    position = positions[0] + 1 if positions else len(finished_games) + 1
-
+    position = score_repo.rank_of(entry).position
 
     if game.is_finished():
         print("\nGrattis! Du har klarat spelet!")
@@ -321,9 +338,10 @@ def main() -> None:
 
     Funktionen loopar tills spelaren väljer att avsluta.
     """
-    settings = Settings()
+    settings = Settings(score_file=APP_SCORE_FILE)
     word_repo = WordRepository(settings)
-    score_repo = ScoreRepository(settings)
+    score_repo = open_score_repository(settings)
+    score_stats = ScoreStats(score_repo)
     print("Välkommen till memory spelet i terminalläge")
     while True:
         print(
@@ -335,7 +353,7 @@ def main() -> None:
         if choice == "1":
             game = play_game(settings, word_repo)
             username = get_username()
-            score = save_score(username, score_repo, game)
+            score = save_score(username, score_repo, game, score_stats)
             show_result(game, score_repo, score)
             pause()
 
@@ -345,6 +363,7 @@ def main() -> None:
 
         elif choice == "3":
             print("Avslutar...")
+            score_stats.close()
             break
         else:
             print("Ogiltigt val.")
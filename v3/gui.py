@@ -1,26 +1,39 @@
+import argparse
 import time
 
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
 
 from main import (
-    Game, Board, GameError, CardState,
-    GameState, WordRepository, ScoreRepository,
-    Settings, RandomGen, build_deck
+    Game, GameError,
+    GameState, WordRepository,
+    Settings, new_game
 )
+from board_view import BOARD_VIEWS, ButtonBoardView, CanvasBoardView, board_view_class
+from score_stats import ScoreStats
+from score_windows import WindowedLeaderboards
+from score_writer import ScoreWriter
+from scores import APP_SCORE_FILE, open_score_repository
 
 class MemoryApp(tk.Tk):
-    def __init__(self) -> None:
+    def __init__(self, board_view: str = "auto") -> None:
+        """Args:
+            board_view: "buttons", "canvas" eller "auto" (Canvas för stora brädor)."""
         super().__init__()
 
         self.title("Memory")
         self.resizable(False, False)
 
-        self.settings = Settings()
+        self.settings = Settings(score_file=APP_SCORE_FILE)
         self.word_repo = WordRepository(self.settings)
-        self.score_repo = ScoreRepository(self.settings)
+        self.score_repo = open_score_repository(self.settings)
+        self.score_stats = ScoreStats(self.score_repo)
+        self.leaderboards = WindowedLeaderboards(self.score_repo)
+        # sparar resultat i bakgrunden så fönstret inte fryser
+        self.score_writer = ScoreWriter(self.score_repo, self.score_stats, self.leaderboards)
         self.game: Game | None = None
-        self.board_buttons: dict[tuple[int, int], tk.Button] = {}
+        self.board_view_name = board_view
+        self.board_view: ButtonBoardView | CanvasBoardView | None = None
         self.input_locked: bool = False
         self.timer_running: bool = False
 
@@ -37,6 +50,18 @@ class MemoryApp(tk.Tk):
         self.build_highscore_frame()
 
         self.show_frame(self.main_menu_frame)
+        self.poll_score_writer()
+
+    def destroy(self):
+        # skriv klart resultat som ligger i kön innan programmet avslutas
+        self.score_writer.close()
+        self.score_stats.close()
+        super().destroy()
+
+    def poll_score_writer(self):
+        """Kör callbacks från skrivtråden här i Tk-tråden."""
+        self.score_writer.poll()
+        self.after(100, self.poll_score_writer)
 
     def show_frame(self, frame):
         for f in (self.main_menu_frame, self.difficulty_frame, self.game_frame, self.highscore_frame):
@@ -132,6 +157,15 @@ class MemoryApp(tk.Tk):
                 )
                 ttk.Label(diff_frame, text=line, font=("Courier New", 9)).pack(anchor="w", padx=5)
 
+            today = self.leaderboards.top(diff, "day", limit=1)
+            if today:
+                best = today[0]
+                ttk.Label(
+                    diff_frame,
+                    text=f"Dagens bästa: {best.get('user_name', '')} "
+                         f"({best.get('moves', 0)} drag, {best.get('time', 0.0):.2f} s)",
+                ).pack(anchor="w", padx=5, pady=(2, 0))
+
         ttk.Button(
             self.highscore_frame,
             text="Tillbaka",
@@ -139,19 +173,12 @@ class MemoryApp(tk.Tk):
         ).pack(fill="x", pady=(15, 0))
 
     def start_new_game(self, difficulty):
-        rng = RandomGen()
-        size = self.settings.difficulties[difficulty]
-        n_pairs = (size * size) // 2
-
         try:
-            deck = build_deck(self.word_repo, n_pairs, rng)
+            game = new_game(self.settings, self.word_repo, difficulty, journal=True)
         except ValueError as e:
             messagebox.showerror("Fel", f"Kunde inte ladda ord:\n{e}")
             return
 
-        board = Board(size)
-        game = Game(board, difficulty, rng)
-        game.start_new_game(deck)
         self.game = game
 
         self.input_locked = False
@@ -166,7 +193,6 @@ class MemoryApp(tk.Tk):
         self.build_game_board()
 
     def build_game_board(self):
-        self.board_buttons.clear()
 
         topbar = ttk.Frame(self.game_frame)
         topbar.pack(fill="x")
@@ -181,21 +207,9 @@ class MemoryApp(tk.Tk):
         self.time_label = ttk.Label(topbar, text="Tid: 0.00 s")
         self.time_label.pack(side="left", padx=10)
 
-        board_frame = ttk.Frame(self.game_frame)
-        board_frame.pack()
-
-        size = self.game.board.size
-
-        for r in range(size):
-            for c in range(size):
-                btn = ttk.Button(
-                    board_frame,
-                    text="",
-                    width=12,
-                    command=lambda row=r, col=c: self.click_on_card(row, col)
-                )
-                btn.grid(row=r, column=c, padx=2, pady=2, sticky="nsew")
-                self.board_buttons[(r, c)] = btn
+        view_cls = board_view_class(self.board_view_name, self.game.board.size)
+        self.board_view = view_cls(self.game_frame, self.game.board, self.click_on_card)
+        self.board_view.widget.pack()
 
     def abort_game(self):
         if not self.game:
@@ -221,29 +235,26 @@ class MemoryApp(tk.Tk):
             return
 
         try:
-            self.game.flip(row, col)
+            changed = self.game.flip(row, col)
         except GameError as e:
             messagebox.showwarning("Fel", str(e))
             return
 
-        self.update_board_view()
-
         if self.game.state() == GameState.RESOLVING:
             self.input_locked = True
             self.after(500, self.resolve_turn)
 
-    def update_board_view(self):
-        for (r, c), btn in self.board_buttons.items():
-            card = self.game.board.get_card(r, c)
+        self.update_board_view(changed)
 
-            if card.state == CardState.HIDDEN:
-                btn.config(text="", state=("disabled" if self.input_locked else "normal"))
+    def update_board_view(self, changed: list[tuple[int, int]] | None = None):
+        """Uppdatera brädvyn.
 
-            elif card.state == CardState.FLIPPED:
-                btn.config(text=card.value, state="disabled")
-
-            elif card.state == CardState.MATCHED:
-                btn.config(text=card.value, state="disabled")
+        Args:
+            changed: Positioner som bytt tillstånd (från Game.flip/resolve).
+                Bara de korten ritas om, plus de dolda korten om
+                input_locked har ändrats. None ritar om alla kort."""
+        if self.board_view:
+            self.board_view.update(changed, self.input_locked)
 
         if self.moves_label:
             self.moves_label.config(text=f"Drag: {self.game.moves}")
@@ -254,20 +265,20 @@ class MemoryApp(tk.Tk):
             return
 
         try:
-            self.game.resolve()
+            changed = self.game.resolve()
         except GameError as e:
             messagebox.showerror("Fel", str(e))
             self.input_locked = False
+            self.update_board_view()
             return
 
-        self.update_board_view()
+        finished = self.game.is_finished()
+        self.input_locked = finished
+        self.update_board_view(changed)
 
-        if self.game.is_finished():
+        if finished:
             self.timer_running = False
-            self.input_locked = True
             self.game_is_finished()
-        else:
-            self.input_locked = False
 
     def update_timer_label(self):
         if not self.timer_running or not self.game:
@@ -284,17 +295,15 @@ class MemoryApp(tk.Tk):
             return
 
         username = self.get_username()
-        entry = self.save_score(username, self.game)
+        self.save_score(username, self.game)
 
-        difficulty = str(entry.get("difficulty", ""))
-
-        finished_games = self.score_repo.top(difficulty)
+    def score_saved(self, entry, position, error):
+        """Visar resultatet när skrivtråden har sparat posten."""
+        if error is not None:
+            messagebox.showerror("Fel", f"Kunde inte spara resultatet:\n{error}")
+            return
 
-        positions = [
-            i for i, game in enumerate(finished_games)
-            if game.get("game_id") == entry.get("game_id")
-        ]
-        position = positions[0] + 1 if positions else len(finished_games) + 1
+        difficulty = str(entry.get("difficulty", ""))
 
         msg = (
             "Grattis! Du har klarat spelet!\n\n"
@@ -316,7 +325,9 @@ class MemoryApp(tk.Tk):
             "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
             "seed": game.rng.seed,
         }
-        self.score_repo.append(entry)
+        if game.journal is not None:
+            entry["journal"] = game.journal.to_text()
+        self.score_writer.submit(entry, self.score_saved)
         return entry
 
     def get_username(self):
@@ -336,5 +347,9 @@ class MemoryApp(tk.Tk):
 
 
 if __name__ == "__main__":
-    app = MemoryApp()
+    parser = argparse.ArgumentParser(description="Memory med Tk-gränssnitt.")
+    parser.add_argument("--board", choices=["auto", *BOARD_VIEWS], default="auto",
+                        help="Hur brädet ritas (default: auto, Canvas för stora brädor)")
+    args = parser.parse_args()
+    app = MemoryApp(board_view=args.board)
     app.mainloop()
\ No newline at end of file
@@ -5,22 +5,45 @@
 
     Modulen innehåller
         - Spelloopen och logik (Game, Board, Card)
+        - En minnessnål bräda (CompactBoard, CardView, Vocabulary)
         - Hantering av ordlistor (WordRepository)
-        - Hantering av highscores (ScoreRepository)
+        - Hantering av highscores (ScoreRepository, ScoreRank)
         - Inställningar (Settings)
         - Slumptalsgenerator med deterministiskt seed (RandomGen)
-        - En hjälpfunktion för att bygga en kortlek (build_deck)
+        - Hjälpfunktioner för att bygga en kortlek (build_deck, build_id_deck)
+        - Hjälpfunktioner för stora brädor och koordinater
+          (make_board, column_label, parse_column)
+        - En hjälpfunktion för att starta ett nytt spel (new_game)
+        - Dragjournal och omspelning av spel (MoveJournal, replay_game)
     """
 
 from __future__ import annotations
-from typing import Any
+from typing import Any, Iterable, Iterator, Sequence, TextIO
 
+from contextlib import contextmanager
 from enum import Enum, auto
+from array import array
+import bisect
+import csv
+import heapq
 import string
 from pathlib import Path
+import base64
 import json
+import math
+import os
 import random
+import struct
+import sys
+import tempfile
 import time
+import zlib
+
+try:
+    import fcntl
+except ImportError:
+    # Windows saknar fcntl, där låses inte score-filen mellan processer
+    fcntl = None
 
 
 class CardState(Enum):
@@ -52,40 +75,46 @@ class Game:
     Håller koll på brädet, speltilstånd, antal drag och
     tid, för en spelomgång
     """
-    def __init__(self, board: Board, difficulty: str, rng: RandomGen) -> None:
+    def __init__(self, board: Board, difficulty: str, rng: RandomGen,
+                 journal: bool = False) -> None:
         """skapar ett nytt Game objekt
         
         Args:
             board (Board): Brädan som ska spelas på
             difficulty (str): En svårhetsgrad t.ex ("easy")
             rng (Randomgen): För att generera slumptal
+            journal (bool): Spara alla drag i en MoveJournal (för replay)
         """
         self.board = board
         self.difficulty = difficulty
         self.rng = rng
+        self.journal: MoveJournal | None = MoveJournal() if journal else None
 
         self._state: GameState = GameState.WAIT_FIRST
         self._start_timestamp: float | None = None
         self._end_timestamp: float | None = None
         self.moves: int = 0
 
-    def start_new_game(self, deck: list[str]) -> None:
+    def start_new_game(self, deck: list[str] | array) -> None:
         """Startar en ny spelomgång, med en given ord lista (deck)
 
         blandar ordlistan, lägger ut orden i och förbereder spelet
 
         Args:
-            deck (list[str]): Lista med ord, måste vara size*size
+            deck (list[str] | array): Lista med ord eller array med ord-id:n
+                (från build_id_deck), måste vara size*size
         Raises:
             GameError: Om antal kort inte är size*size
         """
-        local_deck = list(deck)
+        local_deck = deck[:] if isinstance(deck, array) else list(deck)
         expected = self.board.size * self.board.size
         if len(local_deck) != expected:
             raise GameError(f"Fel antal kort: fick {len(local_deck)}, förväntade {expected}")
 
         self.rng.shuffle(local_deck)
         self.board.create_board(local_deck)
+        if self.journal is not None:
+            self.journal = MoveJournal()
 
         self._state = GameState.WAIT_FIRST
         self.moves = 0
@@ -129,10 +158,15 @@ class Game:
         return []
 
     def can_flip(self, row: int, col: int) -> bool:
-        """Retunerar True om kortet på (row, col) får vändas annars False"""
-        return (row, col) in self.allowed_moves()
+        """Retunerar True om kortet på (row, col) får vändas annars False
+
+            Samma regel som allowed_moves men slår upp positionen direkt
+            istället för att bygga hela listan (O(1))"""
+        if self._state not in (GameState.WAIT_FIRST, GameState.WAIT_SECOND):
+            return False
+        return self.board.in_bounds(row, col) and self.board.is_hidden(row, col)
 
-    def flip(self, row: int, col: int) -> None:
+    def flip(self, row: int, col: int) -> list[tuple[int, int]]:
         """Vänd ett kort på given position.
         
         Uppdaterar speltillstådent beroende på om det är fösta eller andra draget. 
@@ -141,6 +175,10 @@ class Game:
         Args:
             row (int): Radindex för kortet
             col (int): Kolumnindex för kortet
+
+        Returns:
+            Positionerna vars kort bytte tillstånd, dvs [(row, col)],
+            så att en vy bara behöver rita om dem
             
         Raises:
             GameStateError: Om man försöker vända kort i feltillstånd
@@ -163,23 +201,29 @@ class Game:
         card.set_state(CardState.FLIPPED)
         if self._start_timestamp is None:
             self._start_timestamp = time.time()
-        flipped = self.board.flipped_positions()
+        if self.journal is not None:
+            self.journal.record(row * self.board.size + col)
+        flipped = self.board.flipped_count()
 
-        if len(flipped) == 1:
+        if flipped == 1:
             self._state = GameState.WAIT_SECOND
-        elif len(flipped) == 2:
+        elif flipped == 2:
             # om två kort är vända så kan man försöka matcha
             self._state = GameState.RESOLVING
         else:
             raise GameError("Internt fel: fler än två kort uppvända")
+        return [(row, col)]
 
-    def resolve(self) -> None:
+    def resolve(self) -> list[tuple[int, int]]:
         """Försöker para ihop det två uppvända korten,
         
             Jämför de två uppvända korten (Flipped), uppdaterar deras tillstånd
             till MATCHED om de har samma value, annars HIDDEN och spel tillståndet
             går till WAIT_FIRST. Antal drag (moves) ökar med 1. Om alla par är hittade
             så sätts speltilstånd till FINISHED
+
+            Returns:
+                Positionerna för de två korten som bytte tillstånd
             
             Raises:
                 GameStateError: Om resolve anropas i fel speltilstånd
@@ -195,9 +239,11 @@ class Game:
         card1 = self.board.get_card(row1, col1)
         card2 = self.board.get_card(row2, col2)
 
-        matched = card1.value == card2.value
+        matched = self.board.values_match((row1, col1), (row2, col2))
 
         self.moves += 1
+        if self.journal is not None:
+            self.journal.record(MoveJournal.RESOLVE)
 
         if matched:
             card1.set_state(CardState.MATCHED)
@@ -213,27 +259,266 @@ class Game:
         else:
           # Tillbaka till att vänta på första kortet igen
             self._state = GameState.WAIT_FIRST
+        return flipped
 
     def _all_pairs_matched(self) -> bool:
         """Retunerar True om alla kort på brädet är uppvända annars False"""
-        return len(self.board.matched_positions()) == self.board.size * self.board.size
+        return self.board.matched_count() == self.board.size * self.board.size
+
+    def snapshot(self, include_rng: bool = True, include_words: bool | None = None) -> bytes:
+        """Sparar hela spelets tillstånd som ett kompakt binärt format.
+
+        Formatet (version 1, little-endian) innehåller speltillstånd, drag,
+        speltid hittills, seed, svårighetsgrad, 2 bitar per korttillstånd och
+        kortens ord-id:n. Valfritt även RNG-tillståndet (2,5 kB) och en lokal
+        ordtabell. Utan ordtabell pekar id:n in i brädans Vocabulary, som
+        då måste skickas med till restore.
+
+        Args:
+            include_rng: Spara Mersenne Twister-tillståndet så att rng fortsätter
+                exakt där den var. Annars seedas den om från seed vid restore.
+            include_words: Spara orden i snapshoten (default: bara för
+                brädor utan delat ordförråd, dvs vanliga Board).
+
+        Returns:
+            Snapshot som bytes, se Game.restore."""
+        board = self.board
+        if not board._has_cards():
+            raise GameError("Kan inte spara ett spel utan bräda")
+        if include_words is None:
+            include_words = not isinstance(board, CompactBoard)
+
+        flags = 0
+        if isinstance(board, CompactBoard) and not include_words:
+            ids = board.values
+            words: list[str] = []
+        else:
+            values = board._cell_values()
+            local = Vocabulary(values)
+            ids = array(local.typecode(), [local.intern(value) for value in values])
+            words = [local.word(i) for i in range(len(local))]
+            flags |= _SNAPSHOT_LOCAL_WORDS
+        if include_rng:
+            flags |= _SNAPSHOT_RNG_STATE
+
+        elapsed = self.time_elapsed() if self._start_timestamp is not None else float("nan")
+        seed_bytes = self.rng.seed.to_bytes((self.rng.seed.bit_length() + 8) // 8, "little", signed=True)
+        difficulty = self.difficulty.encode("utf-8")
+
+        parts = [
+            _SNAPSHOT_HEADER.pack(_SNAPSHOT_MAGIC, _SNAPSHOT_VERSION, flags,
+                                  _GAME_STATE_CODES[self._state], board.size,
+                                  self.moves, elapsed),
+            bytes([len(seed_bytes)]), seed_bytes,
+            bytes([len(difficulty)]), difficulty,
+            _pack_2bit(board.state_codes()),
+            ids.typecode.encode("ascii"), _little_endian(ids),
+        ]
+        if words:
+            parts.append(struct.pack("<I", len(words)))
+            for word in words:
+                encoded = word.encode("utf-8")
+                parts.append(struct.pack("<H", len(encoded)))
+                parts.append(encoded)
+        if include_rng:
+            _, mt_state, gauss = self.rng.rng.getstate()
+            parts.append(struct.pack(f"<{len(mt_state)}I", *mt_state))
+            parts.append(struct.pack("<d", float("nan") if gauss is None else gauss))
+        return b"".join(parts)
+
+    @classmethod
+    def restore(cls, data: bytes, vocabulary: Vocabulary | None = None) -> Game:
+        """Återskapar ett spel från Game.snapshot.
+
+        Timern fortsätter från den sparade speltiden, så tiden som en
+        snapshot legat sparad räknas inte (suspend/resume).
+
+        Args:
+            data: Bytes från Game.snapshot.
+            vocabulary: Ordförrådet som id:n pekar in i, krävs om
+                snapshoten sparades utan ordtabell.
+
+        Raises:
+            GameError: Om data inte är en giltig snapshot eller ordförråd saknas.
+
+        Returns:
+            Ett nytt Game-objekt i samma tillstånd."""
+        try:
+            return cls._restore(memoryview(data), vocabulary)
+        except (struct.error, IndexError, ValueError, KeyError, UnicodeDecodeError) as e:
+            raise GameError("Ogiltig eller trasig snapshot") from e
+
+    @classmethod
+    def _restore(cls, view: memoryview, vocabulary: Vocabulary | None) -> Game:
+        """Själva avkodningen för restore, fel fångas av restore"""
+        (magic, version, flags, state_code, size, moves,
+         elapsed) = _SNAPSHOT_HEADER.unpack_from(view, 0)
+        if magic != _SNAPSHOT_MAGIC or version != _SNAPSHOT_VERSION:
+            raise GameError("Okänt snapshot-format")
+        pos = _SNAPSHOT_HEADER.size
+        n_cards = size * size
+
+        seed = int.from_bytes(view[pos + 1:pos + 1 + view[pos]], "little", signed=True)
+        pos += 1 + view[pos]
+        difficulty = bytes(view[pos + 1:pos + 1 + view[pos]]).decode("utf-8")
+        pos += 1 + view[pos]
+
+        packed_len = (n_cards + 3) // 4
+        codes = _unpack_2bit(view[pos:pos + packed_len], n_cards)
+        pos += packed_len
+
+        ids = array(chr(view[pos]))
+        pos += 1
+        id_bytes = n_cards * ids.itemsize
+        ids.frombytes(view[pos:pos + id_bytes])
+        if sys.byteorder == "big":
+            ids.byteswap()
+        pos += id_bytes
+        if len(ids) != n_cards:
+            raise GameError("Snapshoten är avkortad")
+
+        if flags & _SNAPSHOT_LOCAL_WORDS:
+            (n_words,) = struct.unpack_from("<I", view, pos)
+            pos += 4
+            words = []
+            for _ in range(n_words):
+                (length,) = struct.unpack_from("<H", view, pos)
+                words.append(bytes(view[pos + 2:pos + 2 + length]).decode("utf-8"))
+                pos += 2 + length
+            board = make_board(size)
+            board.create_board([words[i] for i in ids])
+        else:
+            if vocabulary is None:
+                raise GameError("Snapshoten saknar ord, ange ett Vocabulary")
+            board = CompactBoard(size, vocabulary)
+            board.create_board(ids)
+        board.load_state_codes(codes)
+
+        rng = RandomGen(seed)
+        if flags & _SNAPSHOT_RNG_STATE:
+            mt_state = struct.unpack_from("<625I", view, pos)
+            pos += 625 * 4
+            (gauss,) = struct.unpack_from("<d", view, pos)
+            rng.rng.setstate((3, mt_state, None if math.isnan(gauss) else gauss))
+
+        game = cls(board, difficulty, rng)
+        game._state = _CODE_GAME_STATES[state_code]
+        game.moves = moves
+        if not math.isnan(elapsed):
+            now = time.time()
+            game._start_timestamp = now - elapsed
+            if game._state == GameState.FINISHED:
+                game._end_timestamp = now
+        return game
+
+
+class MoveJournal:
+    """Kompakt logg över alla drag i ett spel, för replay och kontroll.
+
+    Varje händelse är ett platt cellindex (row * size + col) för flip,
+    eller RESOLVE för resolve, plus tiden i nanosekunder (perf_counter_ns)
+    sedan föregående händelse. Båda lagras i packade arrayer."""
+    RESOLVE = 0xFFFFFFFF
+    VERSION = 1
+
+    def __init__(self) -> None:
+        """Skapar en tom journal, tiden räknas från att journalen skapas"""
+        self.cells: array = array("I")
+        self.deltas: array = array("Q")
+        self._last_ns = time.perf_counter_ns()
+
+    def record(self, cell: int) -> None:
+        """Lägg till en händelse (cellindex eller RESOLVE)"""
+        now = time.perf_counter_ns()
+        self.cells.append(cell)
+        self.deltas.append(now - self._last_ns)
+        self._last_ns = now
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    def __iter__(self):
+        """Itererar över (cell, delta_ns) i ordning"""
+        return zip(self.cells, self.deltas)
+
+    def duration_ns(self) -> int:
+        """Total tid i nanosekunder från start till sista händelsen"""
+        return sum(self.deltas)
+
+    def to_bytes(self) -> bytes:
+        """Serialisera journalen (version, antal, celler, tider, little-endian)"""
+        return (struct.pack("<BI", self.VERSION, len(self.cells))
+                + _little_endian(self.cells) + _little_endian(self.deltas))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> MoveJournal:
+        """Läs in en journal från to_bytes
+
+        Raises:
+            GameError: Om data inte är en giltig journal"""
+        try:
+            version, count = struct.unpack_from("<BI", data, 0)
+        except struct.error as e:
+            raise GameError("Trasig dragjournal") from e
+        if version != cls.VERSION:
+            raise GameError(f"Okänd version av dragjournal: {version}")
+        journal = cls()
+        cells_end = 5 + 4 * count
+        if len(data) != cells_end + 8 * count:
+            raise GameError("Trasig dragjournal")
+        journal.cells.frombytes(data[5:cells_end])
+        journal.deltas.frombytes(data[cells_end:])
+        if sys.byteorder == "big":
+            journal.cells.byteswap()
+            journal.deltas.byteswap()
+        return journal
+
+    def to_text(self) -> str:
+        """Journalen som komprimerad base64-text, för att spara i score-filen"""
+        return base64.b64encode(zlib.compress(self.to_bytes())).decode("ascii")
+
+    @classmethod
+    def from_text(cls, text: str) -> MoveJournal:
+        """Läs in en journal från to_text
+
+        Raises:
+            GameError: Om texten inte är en giltig journal"""
+        try:
+            data = zlib.decompress(base64.b64decode(text, validate=True))
+        except (ValueError, zlib.error) as e:
+            raise GameError("Trasig dragjournal") from e
+        return cls.from_bytes(data)
 
 
 class Board:
-    """Representerar en bräda med en matris av Card objekt"""
+    """Representerar en bräda med en matris av Card objekt
+
+    Brädan håller själv koll på vilka positioner som är dolda, vända
+    och matchade. Korten meddelar brädan när deras tillstånd ändras,
+    så uppslag och räknare behöver aldrig gå igenom hela matrisen.
+    Positioner lagras internt som platta index (row * size + col)."""
     def __init__(self, size: int) -> None:
         """Skapar en bräda med given storlek
         
+        Kolumner efter Z namnges som i ett kalkylark (AA, AB, ...), så det
+        finns ingen övre gräns. För riktigt stora brädor, se make_board.
+
         Args:
             size(int): Antal rader och kolumner (size x size)
 
         Raises:
-            GameError om en större storlek än 26 (Tillåter bara kolummer med bokstäver A-Z)"""
+            GameError om storleken inte är ett positivt heltal"""
         self.size = size
         self.board: list[list[Card]] = []
+        self._hidden: set[int] = set()
+        self._flipped: set[int] = set()
+        self._matched: set[int] = set()
+        self._render_cache: _RenderCache | None = None
+        self._changes: list[int] = []
+        self.generation: int = 0
 
-        if self.size > 26:
-            raise GameError("Storlek över 26 inte tillåtet")
+        if not isinstance(size, int) or size < 1:
+            raise GameError("Storleken måste vara ett positivt heltal")
 
     def create_board(self, deck: list[str]) -> None:
         """Skapa en bräda med ord givet lista med ord
@@ -250,13 +535,41 @@ class Board:
             raise GameError(f"Fel antal kort: fick {len(values)}, förväntade {expected}")
         it = iter(values)
         board = []
-        for _ in range(self.size):
+        for r in range(self.size):
             row = []
-            for _ in range(self.size):
+            for c in range(self.size):
                 value = next(it)
-                row.append(Card(value))
+                card = Card(value)
+                card._attach(self, r * self.size + c)
+                row.append(card)
             board.append(row)
         self.board = board
+        self._hidden = set(range(expected))
+        self._flipped = set()
+        self._matched = set()
+        self._render_cache = None
+        self._changes = []
+        self.generation += 1
+
+    def _card_changed(self, index: int, old: CardState, new: CardState) -> None:
+        """Uppdaterar positionsmängderna när ett kort byter tillstånd (anropas av Card)"""
+        self._positions_for(old).discard(index)
+        self._positions_for(new).add(index)
+        self._changes.append(index)
+        if self._render_cache is not None:
+            self._render_cache.mark(index)
+
+    def _positions_for(self, state: CardState) -> set[int]:
+        """Retunerar mängden med index som hör till ett visst tillstånd"""
+        if state == CardState.HIDDEN:
+            return self._hidden
+        if state == CardState.FLIPPED:
+            return self._flipped
+        return self._matched
+
+    def _to_positions(self, indices: set[int]) -> list[tuple[int, int]]:
+        """Översätter platta index till (row, col) i radordning"""
+        return [divmod(i, self.size) for i in sorted(indices)]
 
     def in_bounds(self, row: int, col: int) -> bool:
         """Retunerar True om (row, col) är på brädan annars False"""
@@ -278,46 +591,50 @@ class Board:
             raise CoordinateError("Position utanför brädet.")
         return self.board[row][col]
 
+    def values_match(self, first: tuple[int, int], second: tuple[int, int]) -> bool:
+        """Retunerar True om korten på två positioner har samma värde"""
+        return self.get_card(*first).value == self.get_card(*second).value
+
+    def is_hidden(self, row: int, col: int) -> bool:
+        """Retunerar True om kortet på (row, col) är dolt (HIDDEN), O(1)"""
+        return self._hidden_index(row * self.size + col)
+
+    def hidden_count(self) -> int:
+        """Retunerar antal dolda kort (HIDDEN)"""
+        return len(self._hidden)
+
+    def flipped_count(self) -> int:
+        """Retunerar antal gissade kort (FLIPPED)"""
+        return len(self._flipped)
+
+    def matched_count(self) -> int:
+        """Retunerar antal matchade kort (MATCHED)"""
+        return len(self._matched)
+
     def hidden_positions(self) -> list[tuple[int, int]]:
         """Retunerar en lista med koordinater för alla dolda kort (HIDDEN)"""
-        result: list[tuple[int, int]] = []
-        for row in range(self.size):
-            for col in range(self.size):
-                if self.board[row][col].state == CardState.HIDDEN:
-                    result.append((row, col))
-        return result
+        return self._to_positions(self._hidden)
 
     def flipped_positions(self) -> list[tuple[int, int]]:
         """Retunerar en lista med koordinater för alla gissade kort (FLIPPED)"""
-        result: list[tuple[int, int]] = []
-        for row in range(self.size):
-            for col in range(self.size):
-                if self.board[row][col].state == CardState.FLIPPED:
-                    result.append((row, col))
-        return result
+        return self._to_positions(self._flipped)
 
     def matched_positions(self) -> list[tuple[int, int]]:
         """Retunerar en lista med koordinater för alla matchade kort (MATCHED)"""
-        result: list[tuple[int, int]] = []
-        for row in range(self.size):
-            for col in range(self.size):
-                if self.board[row][col].state == CardState.MATCHED:
-                    result.append((row, col))
-        return result
+        return self._to_positions(self._matched)
 
     def reset_flipped(self) -> None:
         """Vänder tillbaka alla kort som är gissade kort (FLIPPED) till dola (HIDDEN)"""
-        for row in range(self.size):
-            for col in range(self.size):
-                card = self.board[row][col]
-                if card.state == CardState.FLIPPED:
-                    card.set_state(CardState.HIDDEN)
+        for index in list(self._flipped):
+            row, col = divmod(index, self.size)
+            self.board[row][col].set_state(CardState.HIDDEN)
 
     def parse_coord(self, coord: str) -> tuple[int, int]:
         """Översätter text koordinater till intern baserad (row, col)
         
-            En koordinat tolkas som en bokstav, (Kolumn) följt av en heltal (Rad)
-            t.ex 'A1' -> (0, 0), 'B3' -> (2, 1)
+            En koordinat tolkas som en eller flera bokstäver (Kolumn) följt av
+            ett heltal (Rad), kolumnerna räknas som i ett kalkylark
+            t.ex 'A1' -> (0, 0), 'B3' -> (2, 1), 'AA10' -> (9, 26)
         
         Args:
             Coord (str): En koordinat från användar koordinat som ska översättas
@@ -330,10 +647,12 @@ class Board:
         coord = coord.strip().upper()
         if len(coord) < 2:
             raise CoordinateError("Ange en koordinat, t.ex. A1.")
-        col = ord(coord[0]) - ord("A")
-        # Kolumnen räknas genom bokstaven: A=0, B=1
+        letters = len(coord) - len(coord.lstrip(string.ascii_uppercase))
+        if letters == 0:
+            raise CoordinateError("Ange en koordinat, t.ex. A1.")
+        col = parse_column(coord[:letters])
         try:
-            row = int(coord[1:]) - 1
+            row = int(coord[letters:]) - 1
         except ValueError as exc: # int ger value Error fånga och ge som CoordinateError
             raise CoordinateError("Ogiltigt radnummer") from exc
 
@@ -341,37 +660,317 @@ class Board:
             raise CoordinateError("Koordinaten ligger utanför brädet.")
         return row, col
 
+    def change_cursor(self) -> int:
+        """Retunerar en markör för brädans nuvarande läge, se changes_since"""
+        return len(self._changes)
+
+    def changes_since(self, cursor: int) -> tuple[list[tuple[int, int]], int]:
+        """Retunerar positionerna som bytt tillstånd sedan markören och en ny markör
+
+        Varje läsare (t.ex. en vy) håller sin egen markör, så flera kan följa
+        samma bräda. Markören gäller bara inom samma generation, create_board
+        ökar generation och då måste läsaren rita om allt.
+
+        Args:
+            cursor: Markör från change_cursor eller förra anropet.
+
+        Returns:
+            (positioner i radordning utan dubbletter, ny markör)"""
+        changed = set(self._changes[cursor:])
+        return self._to_positions(changed), len(self._changes)
+
+    def render_cell(self, row: int, col: int) -> tuple[int, int, str]:
+        """Retunerar var och hur ett kort syns i str(board)
+
+        Returns:
+            (radindex i utskriften, teckenposition i raden, paddad celltext)"""
+        if self._render_cache is None:
+            self._render_cache = _RenderCache(self)
+        return self._render_cache.cell(self, row, col)
+
+    def _hidden_index(self, index: int) -> bool:
+        """Retunerar True om kortet med platt index är dolt"""
+        return index in self._hidden
+
+    def _has_cards(self) -> bool:
+        """Retunerar True om brädan har skapats med kort"""
+        return bool(self.board)
+
+    def state_codes(self) -> bytearray:
+        """Retunerar korttillstånden som en byte per kort (0 dold, 1 vänd, 2 matchad)"""
+        codes = bytearray(self.size * self.size)
+        for index in self._flipped:
+            codes[index] = _STATE_CODES[CardState.FLIPPED]
+        for index in self._matched:
+            codes[index] = _STATE_CODES[CardState.MATCHED]
+        return codes
+
+    def load_state_codes(self, codes: bytes | bytearray) -> None:
+        """Sätter alla korttillstånd från state_codes (används vid restore)
+
+        Raises:
+            GameError: Om antalet koder inte matchar brädan"""
+        if len(codes) != self.size * self.size:
+            raise GameError("Fel antal korttillstånd")
+        for index, code in enumerate(codes):
+            row, col = divmod(index, self.size)
+            self.board[row][col].state = _CODE_STATES[code]
+
+    def _cell_values(self) -> list[str]:
+        """Retunerar alla kortvärden som strängar i radordning"""
+        return [str(card.value) for row in self.board for card in row]
+
     def __str__(self) -> str:
         "Retunerar en sträng representation av brädan för utskrift."
-        if not self.board:
+        if not self._has_cards():
             return "<tomt bräde>"
 
-        longest = max(len(str(card.value)) for row in self.board for card in row)
-        letters = list(string.ascii_uppercase[:self.size])
-        header = " "*(longest//2+5) + " ".join(letter.ljust(longest) for letter in letters)
-        rows = [header]
-        for i, row in enumerate(self.board, start=1):
-            row_cells = []
-            for card in row:
-                if card.state != CardState.HIDDEN:
-                    cell_str = str(card.value).ljust(longest)
-                else:
-                    cell_str = ("-"*longest).ljust(longest)
-                row_cells.append(cell_str)
-            row_str = " ".join(row_cells)
-            rows.append(f"{i:<2} | {row_str}")
-        return "\n".join(rows)
+        if self._render_cache is None:
+            self._render_cache = _RenderCache(self)
+        return self._render_cache.render(self)
+
+
+class _RenderCache:
+    """Förformaterad utskrift av en bräda, för Board.__str__
+
+    Kolumnbredden bestäms en gång per create_board (vid första utskriften)
+    och varje kort får en färdigpaddad sträng för sitt synliga läge.
+    Brädan markerar rader som ändrats, och bara de raderna formateras om
+    vid nästa utskrift. Är inget ändrat returneras förra strängen direkt."""
+    def __init__(self, board: Board) -> None:
+        values = board._cell_values()
+        letters = [column_label(col) for col in range(board.size)]
+        longest = max(max(len(value) for value in values), len(letters[-1]))
+        self.size = board.size
+        self.row_width = max(2, len(str(board.size)))
+        # radnumren får bredare kolumn på stora brädor, 2 tecken räcker upp till 99
+        self.header = (" "*(longest//2+self.row_width+3)
+                       + " ".join(letter.ljust(longest) for letter in letters))
+        self.hidden = "-"*longest
+        self.visible = [value.ljust(longest) for value in values]
+        self.rows = [self._format_row(board, row) for row in range(board.size)]
+        self.dirty_rows: set[int] = set()
+        self.text: str | None = None
+
+    def mark(self, index: int) -> None:
+        """Markera att kortet med platt index har ändrats"""
+        self.dirty_rows.add(index // self.size)
+
+    def cell(self, board: Board, row: int, col: int) -> tuple[int, int, str]:
+        """(radindex, teckenposition, text) för ett kort, se Board.render_cell"""
+        index = row * self.size + col
+        text = self.hidden if board._hidden_index(index) else self.visible[index]
+        offset = self.row_width + 3 + col * (len(self.hidden) + 1)
+        return row + 1, offset, text
+
+    def _format_row(self, board: Board, row: int) -> str:
+        start = row * self.size
+        cells = [self.hidden if board._hidden_index(index) else self.visible[index]
+                 for index in range(start, start + self.size)]
+        return f"{row + 1:<{self.row_width}} | {' '.join(cells)}"
+
+    def render(self, board: Board) -> str:
+        """Returnera hela brädan som text, formatera bara om ändrade rader"""
+        if self.dirty_rows:
+            for row in self.dirty_rows:
+                self.rows[row] = self._format_row(board, row)
+            self.dirty_rows.clear()
+            self.text = None
+        if self.text is None:
+            self.text = "\n".join([self.header, *self.rows])
+        return self.text
+
+
+class CompactBoard(Board):
+    """En minnessnål bräda där korten inte är egna Python-objekt
+
+    Tillstånden ligger i en platt bytearray (en byte per kort) och
+    värdena som heltals-id:n i en array som pekar in i ett delat
+    Vocabulary. get_card returnerar en lätt CardView som läser och
+    skriver direkt i arrayerna, så resten av spelet fungerar som vanligt.
+    Används när många brädor ska hållas i minnet samtidigt."""
+    def __init__(self, size: int, vocabulary: Vocabulary) -> None:
+        """Skapar en kompakt bräda med given storlek
+
+        Args:
+            size (int): Antal rader och kolumner (size x size)
+            vocabulary (Vocabulary): Ordförråd för kortvärden, delas med
+                andra brädor som använder samma ord (se new_game)
+
+        Raises:
+            GameError om storleken inte är ett positivt heltal"""
+        super().__init__(size)
+        self.vocabulary: Vocabulary = vocabulary
+        self.states: bytearray = bytearray()
+        self.values: array = array("H")
+        self._hidden_total: int = 0
+        self._matched_total: int = 0
+
+    def create_board(self, deck: Sequence[str | int]) -> None:
+        """Skapa en bräda givet en kortlek, orden lagras som id:n
+
+        Kortleken kan innehålla ord (läggs in i ordförrådet) eller färdiga
+        id:n från samma ordförråd, t.ex. från build_id_deck.
+
+        Args:
+            deck: Lista/array med ord eller id:n, måste vara size x size
+
+        Raises:
+            GameError: Om antal kort inte matchar med brädans storlek
+                eller ett id saknas i ordförrådet"""
+        expected = self.size * self.size
+        if len(deck) != expected:
+            raise GameError(f"Fel antal kort: fick {len(deck)}, förväntade {expected}")
+        if isinstance(deck, array):
+            ids: Sequence[int] = deck
+        else:
+            intern = self.vocabulary.intern
+            ids = [value if isinstance(value, int) else intern(value) for value in deck]
+        if ids and not 0 <= min(ids) <= max(ids) < len(self.vocabulary):
+            raise GameError("Kortleken innehåller id:n som saknas i ordförrådet")
+        self.values = array(self.vocabulary.typecode(), ids)
+        self.states = bytearray(expected)
+        self._hidden_total = expected
+        self._matched_total = 0
+        self._flipped = set()
+        self._render_cache = None
+        self._changes = []
+        self.generation += 1
+
+    def _card_changed(self, index: int, old: CardState, new: CardState) -> None:
+        """Skriver nytt tillstånd i bytearrayen och uppdaterar räknarna"""
+        self.states[index] = _STATE_CODES[new]
+        for state, step in ((old, -1), (new, 1)):
+            if state == CardState.HIDDEN:
+                self._hidden_total += step
+            elif state == CardState.MATCHED:
+                self._matched_total += step
+            elif step < 0:
+                self._flipped.discard(index)
+            else:
+                self._flipped.add(index)
+        self._changes.append(index)
+        if self._render_cache is not None:
+            self._render_cache.mark(index)
+
+    def values_match(self, first: tuple[int, int], second: tuple[int, int]) -> bool:
+        """Retunerar True om två positioner har samma värde (jämför id:n)"""
+        return (self.values[first[0] * self.size + first[1]]
+                == self.values[second[0] * self.size + second[1]])
+
+    def _scan(self, state: CardState) -> list[tuple[int, int]]:
+        """Letar upp alla positioner med ett visst tillstånd i bytearrayen"""
+        code = _STATE_CODES[state]
+        result: list[tuple[int, int]] = []
+        index = self.states.find(code)
+        while index != -1:
+            result.append(divmod(index, self.size))
+            index = self.states.find(code, index + 1)
+        return result
+
+    def get_card(self, row: int, col: int) -> CardView:
+        """Hämtar en vy av kortet på angiven position
+
+            Raises:
+                CoordinateError: om positionen är utanför brädan
+
+            Returns:
+                CardView som läser och skriver direkt i brädans arrayer"""
+        if not self.in_bounds(row, col):
+            raise CoordinateError("Position utanför brädet.")
+        return CardView(self, row * self.size + col)
+
+    def hidden_count(self) -> int:
+        """Retunerar antal dolda kort (HIDDEN)"""
+        return self._hidden_total
+
+    def matched_count(self) -> int:
+        """Retunerar antal matchade kort (MATCHED)"""
+        return self._matched_total
+
+    def hidden_positions(self) -> list[tuple[int, int]]:
+        """Retunerar en lista med koordinater för alla dolda kort (HIDDEN)"""
+        return self._scan(CardState.HIDDEN)
+
+    def matched_positions(self) -> list[tuple[int, int]]:
+        """Retunerar en lista med koordinater för alla matchade kort (MATCHED)"""
+        return self._scan(CardState.MATCHED)
+
+    def reset_flipped(self) -> None:
+        """Vänder tillbaka alla kort som är gissade kort (FLIPPED) till dola (HIDDEN)"""
+        for index in list(self._flipped):
+            CardView(self, index).set_state(CardState.HIDDEN)
+
+    def _hidden_index(self, index: int) -> bool:
+        """Retunerar True om kortet med platt index är dolt"""
+        return self.states[index] == _STATE_CODES[CardState.HIDDEN]
+
+    def _has_cards(self) -> bool:
+        """Retunerar True om brädan har skapats med kort"""
+        return bool(self.values)
+
+    def state_codes(self) -> bytearray:
+        """Retunerar en kopia av korttillstånden, en byte per kort"""
+        return bytearray(self.states)
+
+    def load_state_codes(self, codes: bytes | bytearray) -> None:
+        """Sätter alla korttillstånd på en gång och räknar om räknarna
+
+        Raises:
+            GameError: Om antalet koder inte matchar brädan"""
+        if len(codes) != self.size * self.size:
+            raise GameError("Fel antal korttillstånd")
+        if max(codes, default=0) > _STATE_CODES[CardState.MATCHED]:
+            raise GameError("Ogiltigt korttillstånd")
+        self.states[:] = codes
+        self._hidden_total = self.states.count(_STATE_CODES[CardState.HIDDEN])
+        self._matched_total = self.states.count(_STATE_CODES[CardState.MATCHED])
+        self._flipped = set()
+        self._render_cache = None
+        self._changes = []
+        self.generation += 1
+        index = self.states.find(_STATE_CODES[CardState.FLIPPED])
+        while index != -1:
+            self._flipped.add(index)
+            index = self.states.find(_STATE_CODES[CardState.FLIPPED], index + 1)
+
+    def _cell_values(self) -> list[str]:
+        """Retunerar alla kortvärden som strängar i radordning"""
+        word = self.vocabulary.word
+        return [word(value_id) for value_id in self.values]
 
 
 class Card:
     """Representerar ett kort i spelet"""
+    # utan __dict__, en bräda kan ha tiotusentals kort
+    __slots__ = ("value", "_state", "_board", "_index")
+
     def __init__(self, value: str) -> None:
         """Skapar ett nytt kort i dolt tillstånd
         
         Args:
             Value (str): Ordet som tillhör kortet"""
         self.value:str = value
-        self.state: CardState = CardState.HIDDEN
+        self._state: CardState = CardState.HIDDEN
+        self._board: Board | None = None
+        self._index: int = -1
+
+    def _attach(self, board: Board, index: int) -> None:
+        """Kopplar kortet till en bräda så att brädan får veta om tillståndsbyten"""
+        self._board = board
+        self._index = index
+
+    @property
+    def state(self) -> CardState:
+        """Kortets nuvarande tillstånd"""
+        return self._state
+
+    @state.setter
+    def state(self, new_state: CardState) -> None:
+        old = self._state
+        self._state = new_state
+        if self._board is not None and old != new_state:
+            self._board._card_changed(self._index, old, new_state)
 
     def set_state(self, new_state: CardState) -> None:
         """Sätter ett nytt tillstånd till kortet
@@ -395,6 +994,130 @@ class Card:
         return f"Card(value={self.value!r}, state={self.state.name})"
 
 
+class CardView(Card):
+    """Lätt vy av ett kort i en CompactBoard
+
+    Har samma gränssnitt som Card (value, state, set_state) men lagrar
+    inget eget, allt läses och skrivs i brädans arrayer. _board och
+    _index är slots i Card, så en vy har ingen __dict__."""
+    __slots__ = ()
+
+    def __init__(self, board: CompactBoard, index: int) -> None:
+        """Skapar en vy för kortet med platt index på brädan"""
+        self._board: CompactBoard = board
+        self._index = index
+
+    @property
+    def value(self) -> str:  # type: ignore[override]
+        """Ordet som tillhör kortet, avkodat från ordförrådet"""
+        return self._board.vocabulary.word(self._board.values[self._index])
+
+    @property
+    def state(self) -> CardState:
+        """Kortets nuvarande tillstånd"""
+        return _CODE_STATES[self._board.states[self._index]]
+
+    @state.setter
+    def state(self, new_state: CardState) -> None:
+        old = self.state
+        if old != new_state:
+            self._board._card_changed(self._index, old, new_state)
+
+
+class Vocabulary:
+    """Tabell som översätter mellan ord och små heltals-id:n
+
+    Varje unikt ord får ett stabilt id första gången det läggs in,
+    så flera brädor kan dela samma tabell och bara lagra id:n."""
+    def __init__(self, words: list[str] | None = None) -> None:
+        """Skapar ett ordförråd, ev. förifyllt med ord
+
+        Args:
+            words: Ord som ska läggas in i given ordning"""
+        self._ids: dict[str, int] = {}
+        self._words: list[str] = []
+        for word in words or []:
+            self.intern(word)
+
+    def intern(self, word: str) -> int:
+        """Returnera id för ordet, lägg till det om det saknas"""
+        word_id = self._ids.get(word)
+        if word_id is None:
+            word_id = len(self._words)
+            self._ids[word] = word_id
+            self._words.append(word)
+        return word_id
+
+    def word(self, word_id: int) -> str:
+        """Returnera ordet för ett id"""
+        return self._words[word_id]
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def typecode(self) -> str:
+        """Minsta array-typkod som rymmer alla id:n ('H' eller 'I')"""
+        return "H" if len(self._words) <= 0xFFFF else "I"
+
+
+_STATE_CODES: dict[CardState, int] = {
+    CardState.HIDDEN: 0,
+    CardState.FLIPPED: 1,
+    CardState.MATCHED: 2,
+}
+_CODE_STATES: dict[int, CardState] = {code: state for state, code in _STATE_CODES.items()}
+
+_GAME_STATE_CODES: dict[GameState, int] = {
+    GameState.WAIT_FIRST: 0,
+    GameState.WAIT_SECOND: 1,
+    GameState.RESOLVING: 2,
+    GameState.FINISHED: 3,
+}
+_CODE_GAME_STATES: dict[int, GameState] = {code: state for state, code in _GAME_STATE_CODES.items()}
+
+# Snapshot-format för Game.snapshot/Game.restore
+# magic, version, flaggor, speltillstånd, storlek, drag, speltid (NaN = ej startat)
+_SNAPSHOT_HEADER = struct.Struct("<4sBBBHId")
+_SNAPSHOT_MAGIC = b"MEMG"
+_SNAPSHOT_VERSION = 1
+_SNAPSHOT_LOCAL_WORDS = 0x01
+_SNAPSHOT_RNG_STATE = 0x02
+
+
+def _pack_2bit(codes: bytes | bytearray) -> bytes:
+    """Packar värden 0-3 (en per byte) till 2 bitar styck, 4 per byte.
+
+    Varje fjärdedel av korten läses som ett stort heltal och skiftas på
+    plats, så ingen Python-loop per kort behövs."""
+    padded = bytes(codes) + bytes(-len(codes) % 4)
+    n_bytes = len(padded) // 4
+    packed = 0
+    for lane in range(4):
+        packed |= int.from_bytes(padded[lane::4], "little") << (2 * lane)
+    return packed.to_bytes(n_bytes, "little")
+
+
+def _unpack_2bit(packed: bytes | memoryview, n_values: int) -> bytearray:
+    """Motsatsen till _pack_2bit, returnerar n_values värden (en per byte)."""
+    n_bytes = len(packed)
+    if n_bytes * 4 < n_values:
+        raise ValueError("För få bytes för att packa upp")
+    value = int.from_bytes(packed, "little")
+    mask = int.from_bytes(b"\x03" * n_bytes, "little")
+    codes = bytearray(n_bytes * 4)
+    for lane in range(4):
+        codes[lane::4] = ((value >> (2 * lane)) & mask).to_bytes(n_bytes, "little")
+    return codes[:n_values]
+
+
+def _little_endian(values: array) -> bytes:
+    """Arrayens bytes i little-endian oavsett plattform"""
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
 class WordRepository:
     """Läser in och tillhandahåller ord som används i spelet."""
     def __init__(self,
@@ -416,6 +1139,7 @@ class WordRepository:
         self.filename = filename or settings.words_file
         self.encoding = encoding
         self._words: list[str] | None = None
+        self._vocabulary: Vocabulary | None = None
 
     def load_words(self) -> list[str]:
         """Läs in ordlistan från fil och returnera en lista med ord.
@@ -448,25 +1172,347 @@ class WordRepository:
                     pass
             fixed_words.append(s)
         self._words = fixed_words
+        self._vocabulary = Vocabulary(fixed_words)
         return self._words
 
-    def pick_words(self, n: int, rng: RandomGen) -> list[str]:
+    def vocabulary(self) -> Vocabulary:
+        """Returnera ordförrådet (ord -> id) för ordlistan.
+
+        Byggs en gång när ordlistan läses in, id:n är stabila så länge
+        ordfilen inte ändras (id = första raden ordet förekommer på)."""
+        if self._vocabulary is None:
+            self.load_words()
+        assert self._vocabulary is not None
+        return self._vocabulary
+
+    def pick_words(self, n: int, rng: RandomGen, allow_repeats: bool = False
+                   ) -> list[str]:
         """Välj ut n slumpmässiga ord från ordlistan.
 
         Args:
             n: Antal ord som ska väljas.
             rng: Slumptalsgenerator som används vid urvalet.
+            allow_repeats: Om ordlistan är för kort, återanvänd orden
+                (hela listan i ny slumpad ordning per varv) istället för att ge fel.
 
         Raises:
-            ValueError: Om ordlistan innehåller färre ord än n.
+            ValueError: Om ordlistan innehåller färre ord än n och
+                allow_repeats är False.
 
         Returns:
-            En lista med n unika ord.
+            En lista med n ord, unika om ordlistan räcker till.
         """
         words = self.load_words()
-        if len(words) < n:
+        if len(words) >= n:
+            return rng.sample(words, n)
+        if not allow_repeats or not words:
             raise ValueError("Inte tillräckligt med ord i ordlistan.")
-        return rng.sample(words, n)
+        picked: list[str] = []
+        while len(picked) < n:
+            picked.extend(rng.sample(words, min(len(words), n - len(picked))))
+        return picked
+
+
+@contextmanager
+def file_lock(fd: int) -> Iterator[None]:
+    """Exklusivt lås (flock) på en öppen fil så länge with-blocket körs.
+
+    Låset gäller mellan processer och mellan olika öppna filer i samma
+    process. Utan fcntl (Windows) görs ingen låsning."""
+    if fcntl is None:
+        yield
+        return
+    fcntl.flock(fd, fcntl.LOCK_EX)
+    try:
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+def file_stamp(path: Path) -> list[Any] | None:
+    """(namn, storlek, mtime) för score-filen och filer som hör till den.
+
+    Ändras stämpeln har filen skrivits, av det här eller ett annat program.
+
+    SQLite skriver först till <fil>-wal och segmentlagringen är en
+    katalog, så de filerna räknas med. Lås- och tmp-filer räknas inte."""
+    if path.is_dir():
+        files = sorted(p for p in path.iterdir() if p.suffix not in (".lock", ".tmp"))
+    else:
+        files = [p for p in (path, Path(f"{path}-wal")) if p.exists()]
+    if not files:
+        return None
+    stamp = []
+    for p in files:
+        st = p.stat()
+        stamp.append([p.name, st.st_size, st.st_mtime_ns])
+    return stamp
+
+
+def score_key(entry: dict[str, Any]) -> tuple[float, float]:
+    """Sorteringsnyckel för highscore: först antal drag, sedan tid."""
+    return entry.get("moves", float("inf")), entry.get("time", float("inf"))
+
+
+def record_matches(entry: dict[str, Any], difficulty: str | None = None,
+                   finished: bool | None = None) -> bool:
+    """True om posten passar filtren i iter_records (None = alla)."""
+    return ((difficulty is None or entry.get("difficulty") == difficulty) and
+            (finished is None or bool(entry.get("finished")) == finished))
+
+
+def best_scores(records: Iterable[dict[str, Any]], limit: int | None) -> list[dict[str, Any]]:
+    """Sortera poster som highscorelistan, med limit hålls bara limit poster i minnet.
+
+    heapq.nsmallest är stabil precis som sort, så lika resultat behåller
+    sin ordning."""
+    if limit is None:
+        return sorted(records, key=score_key)
+    return heapq.nsmallest(limit, records, key=score_key)
+
+
+def encode_record(entry: dict[str, Any]) -> bytes:
+    """En score-post som en rad JSON (utf-8, avslutad med radbrytning)."""
+    return (json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+SCORE_CSV_FIELDS = ["game_id", "user_name", "moves", "time", "difficulty",
+                    "finished", "timestamp", "seed", "journal"]
+"""Kolumnerna i en CSV-export, andra fält i posterna tas inte med."""
+
+
+def score_format(path: str | Path, format: str | None = None) -> str:
+    """Formatet för en import/export-fil: format, annars efter filändelsen.
+
+    Raises:
+        ValueError: Om formatet inte är "jsonl" eller "csv"."""
+    format = format or Path(path).suffix.lstrip(".").lower()
+    if format not in ("jsonl", "csv"):
+        raise ValueError(f"Okänt format: {format!r} (jsonl eller csv)")
+    return format
+
+
+def write_scores(records: Iterable[dict[str, Any]], path: str | Path,
+                 format: str | None = None) -> int:
+    """Skriver poster till en exportfil en i taget.
+
+    Skrivs till en temporär fil som byter namn när allt är klart.
+
+    Args:
+        records: Posterna, t.ex. ScoreRepository.iter_records().
+        path: Ny fil (JSON Lines eller CSV).
+        format: "jsonl" eller "csv" (default: efter filändelsen).
+
+    Returns:
+        Antal poster som skrevs.
+
+    Raises:
+        ValueError: Om formatet är okänt."""
+    format, path = score_format(path, format), Path(path)
+    count = 0
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        if format == "csv":
+            with tmp.open("w", encoding="utf-8", newline="") as f:
+                writer = csv.DictWriter(f, SCORE_CSV_FIELDS, extrasaction="ignore")
+                writer.writeheader()
+                for entry in records:
+                    writer.writerow(entry)
+                    count += 1
+        else:
+            with tmp.open("wb") as f:
+                for entry in records:
+                    f.write(encode_record(entry))
+                    count += 1
+        tmp.replace(path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return count
+
+
+_JSON_WHITESPACE = " \t\n\r"
+_JSON_DELIMITERS = _JSON_WHITESPACE + ",]"
+
+
+def _iter_json_array(f: TextIO, name: Any, chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """Läser elementen i en JSON-lista ett i taget från en öppen textfil.
+
+    Bara det element som läses och en buffert på ungefär chunk_size
+    tecken hålls i minnet, inte hela listan.
+
+    Raises:
+        ValueError: Om filen inte är giltig JSON eller inte är en lista."""
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+
+    def more() -> bool:
+        # läs nästa bit och släng det som redan är tolkat
+        nonlocal buf, pos, eof
+        chunk = f.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buf = buf[pos:] + chunk
+        pos = 0
+        return True
+
+    def skip_whitespace() -> bool:
+        # retunerar False om filen tog slut
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in _JSON_WHITESPACE:
+                pos += 1
+            if pos < len(buf):
+                return True
+            if not more():
+                return False
+
+    if not skip_whitespace():
+        return  # tom fil
+    if buf[pos] != "[":
+        raise ValueError("Score filen måste innehålla en lista")
+    pos += 1
+
+    first = True
+    while True:
+        if not skip_whitespace():
+            raise ValueError(f"Score filen är korrupt: {name}")
+        if buf[pos] == "]":
+            pos += 1
+            if skip_whitespace():
+                raise ValueError(f"Score filen är korrupt: {name}")
+            return
+        if not first:
+            if buf[pos] != ",":
+                raise ValueError(f"Score filen är korrupt: {name}")
+            pos += 1
+            if not skip_whitespace():
+                raise ValueError(f"Score filen är korrupt: {name}")
+        first = False
+
+        while True:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError as e:
+                if more():
+                    continue
+                raise ValueError(f"Score filen är korrupt: {name}") from e
+            # ett tal som slutar vid bufferten eller före något annat än ett
+            # skiljetecken kan fortsätta i nästa bit ("2.5" av "2.5e3")
+            if (not eof and (end == len(buf) or buf[end] not in _JSON_DELIMITERS)
+                    and more()):
+                continue
+            break
+        pos = end
+        yield value
+
+
+class ScoreRank:
+    """Placering för en score-post på highscorelistan.
+
+    Attribut:
+        position: Placering, 1 är bäst.
+        above: Upp till n poster närmast före (bäst först).
+        below: Upp till n poster närmast efter."""
+    def __init__(self, position: int, above: list[dict[str, Any]] | None = None,
+                 below: list[dict[str, Any]] | None = None) -> None:
+        self.position = position
+        self.above = above or []
+        self.below = below or []
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ScoreRank):
+            return NotImplemented
+        return (self.position, self.above, self.below) == (other.position, other.above, other.below)
+
+    def __repr__(self) -> str:
+        return f"ScoreRank({self.position}, above={len(self.above)}, below={len(self.below)})"
+
+    @classmethod
+    def locate(cls, records: list[dict[str, Any]], keys: list[tuple[float, float]],
+               entry: dict[str, Any], neighbours: int = 0) -> ScoreRank:
+        """Placering för entry i en redan sorterad lista, med bisect på nycklarna.
+
+        Finns entry redan i listan (samma game_id bland poster med samma
+        resultat) är det dess plats, annars platsen den skulle få om den
+        sparades nu, efter tidigare lika resultat. Ej färdiga spel hamnar
+        sist.
+
+        Args:
+            records: Färdiga spel sorterade som ScoreRepository.top.
+            keys: score_key för varje post i records.
+            entry: Posten att placera.
+            neighbours: Antal poster före och efter att ta med."""
+        if not entry.get("finished"):
+            i, saved = len(records), False
+        else:
+            key = score_key(entry)
+            lo = bisect.bisect_left(keys, key)
+            i = bisect.bisect_right(keys, key, lo)
+            saved = False
+            game_id = entry.get("game_id")
+            if game_id is not None:
+                for j in range(lo, i):
+                    if records[j].get("game_id") == game_id:
+                        i, saved = j, True
+                        break
+        if not neighbours:
+            return cls(i + 1)
+        after = i + 1 if saved else i
+        return cls(i + 1, records[max(0, i - neighbours):i], records[after:after + neighbours])
+
+    @classmethod
+    def scan(cls, records: Iterable[dict[str, Any]], entry: dict[str, Any],
+             neighbours: int = 0) -> ScoreRank:
+        """Samma placering som locate, med en genomläsning av osorterade poster.
+
+        O(n) utan att sortera: poster som är bättre än entry räknas och
+        bara de neighbours närmaste på var sida hålls i var sin heap. Poster
+        med samma resultat som entry sparas i ordning för att hitta dess
+        game_id.
+
+        Args:
+            records: Färdiga spel i sparordning.
+            entry: Posten att placera.
+            neighbours: Antal poster före och efter att ta med."""
+        key = score_key(entry) if entry.get("finished") else (math.inf, math.inf)
+        better = 0
+        # (nyckel, ordning, post): närmast före är de största, efter de minsta
+        above: list[tuple[tuple[float, float], int, dict[str, Any]]] = []
+        below: list[tuple[tuple[float, float], int, dict[str, Any]]] = []
+        ties: list[dict[str, Any]] = []
+        for seq, record in enumerate(records):
+            record_key = score_key(record)
+            if record_key < key:
+                better += 1
+                if neighbours:
+                    item = (record_key, seq, record)
+                    if len(above) < neighbours:
+                        heapq.heappush(above, item)
+                    elif item > above[0]:
+                        heapq.heapreplace(above, item)
+            elif record_key == key:
+                ties.append(record)
+            elif neighbours:
+                item = ((-record_key[0], -record_key[1]), -seq, record)
+                if len(below) < neighbours:
+                    heapq.heappush(below, item)
+                elif item > below[0]:
+                    heapq.heapreplace(below, item)
+
+        game_id = entry.get("game_id")
+        i = len(ties)
+        if game_id is not None:
+            i = next((j for j, r in enumerate(ties) if r.get("game_id") == game_id), i)
+        position = better + i + 1
+        if not neighbours:
+            return cls(position)
+        before = [r for _, _, r in sorted(above)] + ties[:i]
+        after = ties[i + 1:] + [r for _, _, r in sorted(below, reverse=True)]
+        return cls(position, before[-neighbours:], after[:neighbours])
 
 
 class ScoreRepository:
@@ -515,30 +1561,153 @@ class ScoreRepository:
                 raise ValueError("Score filen måste innehålla en lista")
         return data
 
+    def iter_records(self, difficulty: str | None = None,
+                     finished: bool | None = None) -> Iterator[dict[str, Any]]:
+        """Läs sparade resultat ett i taget utan att läsa in hela filen.
+
+        Args:
+            difficulty: Bara poster med den svårighetsgraden (None = alla).
+            finished: Bara färdiga (True) eller ej färdiga (False) spel (None = alla).
+
+        Raises:
+            ValueError: Om filen inte innehåller giltig JSON eller inte är en lista."""
+        if not self.path.exists():
+            return
+        with self.path.open("r", encoding="utf-8") as f:
+            for entry in _iter_json_array(f, self.path):
+                if record_matches(entry, difficulty, finished):
+                    yield entry
+
     def append(self, entry: dict[str, Any]) -> None:
         """Lägg till ett nytt resultat i score-filen.
 
         Skriver först till en temporär fil och ersätter sedan den
-        riktiga filen för att minska risken för korrupt data.
+        riktiga filen för att minska risken för korrupt data. Hela
+        läs-ändra-skriv görs med ett lås på en låsfil bredvid score-filen,
+        så flera program som sparar samtidigt inte tappar varandras
+        resultat, och varje skrivning får en egen temporär fil.
 
         Args:
             entry: En dict med information om resultatet (t.ex. moves, time, difficulty). """
-        data = self.load()
-        data.append(entry)
+        with open(self.path.with_name(self.path.name + ".lock"), "a") as lock:
+            with file_lock(lock.fileno()):
+                data = self.load()
+                data.append(entry)
+                self._save(data)
+
+    def _save(self, data: list[dict[str, Any]]) -> None:
+        """Skriv hela listan till en egen temporär fil och byt ut score-filen."""
+        fd, tmp = tempfile.mkstemp(dir=self.base_path, prefix=self.path.name, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=4, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    def _validate_entry(self, entry: Any) -> None:
+        """Kontrollera att en score-post har alla fält och rimliga värden.
+
+        Raises:
+            ValueError: Med en beskrivning av första felet."""
+        if not isinstance(entry, dict):
+            raise ValueError("score entry måste vara en dict")
+        missing = self.settings.required_score_fields - set(entry.keys())
+        if missing:
+            raise ValueError(f"saknar fält i score entry {', '.join(sorted(missing))}")
+
+        if entry.get("difficulty") not in self.settings.allowed_difficulties:
+            raise ValueError(f"Ogiltig svårighetsgrad: {entry.get('difficulty')}")
+
+        # bool är en int i Python, men True drag är inget antal
+        moves = entry.get("moves")
+        if not isinstance(moves, int) or isinstance(moves, bool) or moves < 0:
+            raise ValueError("moves måste vara ett heltal >= 0")
+
+        time_val = entry.get("time")
+        if not isinstance(time_val, (int, float)) or isinstance(time_val, bool) or time_val <= 0:
+            raise ValueError("time måste vara ett tal > 0 sekunder")
+
+        finished = entry.get("finished")
+        if not isinstance(finished, bool):
+            raise ValueError("finished måste vara True eller False")
 
-        tmp = self.path.with_suffix(".tmp")
+    def _prepare_batch(self, entries: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Validera alla poster innan något skrivs och ta bort dubbletter.
 
-        with tmp.open("w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
-            f.flush()
+        Av flera poster med samma game_id behålls den första.
 
-        tmp.replace(self.path)
+        Raises:
+            ValueError: Om någon post är ogiltig, med postens nummer (från 1)."""
+        batch: list[dict[str, Any]] = []
+        seen: set[Any] = set()
+        for number, entry in enumerate(entries, start=1):
+            try:
+                self._validate_entry(entry)
+            except ValueError as e:
+                raise ValueError(f"post {number}: {e}") from e
+            if entry.get("game_id") in seen:
+                continue
+            seen.add(entry.get("game_id"))
+            batch.append(entry)
+        return batch
+
+    def bulk_append(self, entries: Iterable[dict[str, Any]]) -> int:
+        """Lägg till många resultat med en enda skrivning.
+
+        Alla poster valideras först, är någon ogiltig skrivs ingenting.
+        Poster vars game_id redan finns i filen (eller tidigare i entries)
+        hoppas över.
+
+        Args:
+            entries: Score-poster, t.ex. från scores.read_scores.
+
+        Returns:
+            Antal poster som lades till.
+
+        Raises:
+            ValueError: Om en post är ogiltig eller score-filen är korrupt."""
+        batch = self._prepare_batch(entries)
+        with open(self.path.with_name(self.path.name + ".lock"), "a") as lock:
+            with file_lock(lock.fileno()):
+                data = self.load()
+                saved = {e.get("game_id") for e in data}
+                new = [e for e in batch if e.get("game_id") not in saved]
+                if new:
+                    data.extend(new)
+                    self._save(data)
+        return len(new)
+
+    def export(self, path: str | Path, format: str | None = None) -> int:
+        """Skriv alla resultat till en fil, en post i taget.
+
+        Args:
+            path: Ny fil, skrivs över om den finns.
+            format: "jsonl" eller "csv" (default: efter filändelsen).
+
+        Returns:
+            Antal poster som skrevs.
+
+        Raises:
+            ValueError: Om formatet är okänt."""
+        return write_scores(self.iter_records(), path, format)
+
+    def _check_difficulty(self, difficulty: Any) -> None:
+        """Raises:
+            ValueError: Om svårighetsgraden inte är tillåten."""
+        if (self.settings.allowed_difficulties and difficulty not in
+            self.settings.allowed_difficulties):
+            raise ValueError(f"Ogiltig svårighetsgrad: {difficulty}")
 
     def top(self, difficulty: str, limit: int | None = None) -> list[dict[str, Any]]:
         """Returnera de bästa resultaten för en viss svårighetsgrad.
 
         Resultaten filtreras på färdiga spel (finished=True) och sorteras
-        i första hand på antal drag och i andra hand på tid.
+        i första hand på antal drag och i andra hand på tid. Filen läses
+        med iter_records, så med limit hålls bara limit poster i minnet.
 
         Args:
             difficulty: Svårighetsgrad att filtrera på.
@@ -549,20 +1718,34 @@ class ScoreRepository:
 
         Returns:
             En lista med score-poster (dictar), ev. begränsad av limit. """
-        if (self.settings.allowed_difficulties and difficulty not in
-            self.settings.allowed_difficulties):
-            raise ValueError(f"Ogiltig svårighetsgrad: {difficulty}")
+        self._check_difficulty(difficulty)
+        return best_scores(self.iter_records(difficulty, finished=True), limit)
+
+    def rank_of(self, entry: dict[str, Any], neighbours: int = 0) -> ScoreRank:
+        """Placering för en post på highscorelistan för dess svårighetsgrad.
+
+        O(n) med en genomläsning av filen (ScoreRank.scan), utan att
+        sortera. Andra lagringar (se scores.py) använder färdigsorterade
+        index och bisect.
+
+        Args:
+            entry: Sparad eller ny score-post.
+            neighbours: Antal poster före och efter att returnera.
 
-        records = [
-            s for s in self.load()
-            if s.get("finished") and s.get("difficulty") == difficulty]
+        Raises:
+            ValueError: Om svårighetsgraden inte är tillåten."""
+        difficulty = str(entry.get("difficulty"))
+        self._check_difficulty(difficulty)
+        return ScoreRank.scan(self.iter_records(difficulty, finished=True), entry, neighbours)
 
-        records.sort(key=lambda x: (x.get("moves", float("inf")),
-                                    x.get("time", float("inf"))))
+    def rank_of_game_id(self, game_id: int, neighbours: int = 0) -> ScoreRank | None:
+        """Som rank_of för den sparade posten med game_id, None om den inte finns.
 
-        if limit is None:
-            return records
-        return records[:limit]
+        Filen läses med iter_records fram till första träffen."""
+        for entry in self.iter_records():
+            if entry.get("game_id") == game_id:
+                return self.rank_of(entry, neighbours)
+        return None
 
 
 # Skulle kunna vara en dataklass då den inte har några metoder
@@ -574,17 +1757,25 @@ class Settings:
         words_file: str = "memo.txt",
         score_file: str = "score.json",
         data_dir: str | Path | None = None,
+        required_score_fields: set[str] | None = None,
     ) -> None:
         """Skapa ett nytt Settings-objekt.
 
         Args:
             difficulties: Mapping från svårighetsnamn till brädstorlek (t.ex. {"easy": 4}).
             words_file: Filnamn för ordlistan.
-            score_file: Filnamn för score-filen.
-            data_dir: Katalog där datafiler ska sparas."""
+            score_file: Filnamn för score-filen. ScoreRepository skriver alltid en
+                JSON-lista, andra format väljs med scores.open_score_repository.
+            data_dir: Katalog där datafiler ska sparas.
+            required_score_fields: Fält som en score-post måste ha vid import."""
         self.difficulties = difficulties or {"easy": 4, "medium": 6, "hard": 8}
         self.allowed_difficulties = set(self.difficulties.keys())
 
+        self.required_score_fields = required_score_fields or {
+            "game_id", "user_name", "moves", "time",
+            "difficulty", "finished", "timestamp", "seed",
+        }
+
         self.words_file = words_file
         self.score_file = score_file
         self.data_dir = Path(data_dir) if data_dir else Path(__file__).parent / "data"
@@ -616,8 +1807,8 @@ class RandomGen:
         return self.rng.sample(words, n)
 
 
-def build_deck(word_repo: WordRepository, n_pairs: int, rng: RandomGen
-               ) -> list[str]:
+def build_deck(word_repo: WordRepository, n_pairs: int, rng: RandomGen,
+               allow_repeats: bool = False) -> list[str]:
     """Bygg en kortlek med ordpar för spelet.
 
     Hämtar n_pairs slumpmässiga ord från word_repo och dubblar
@@ -627,6 +1818,8 @@ def build_deck(word_repo: WordRepository, n_pairs: int, rng: RandomGen
         word_repo: WordRepository som används för att hämta ord.
         n_pairs: Antal ordpar (inte totalt antal kort).
         rng: Slumptalsgenerator som används vid urvalet av ord.
+        allow_repeats: Tillåt att samma ord används i flera par när
+            ordlistan är för kort (behövs för stora brädor).
 
     Raises:
         ValueError: Om n_pairs inte är ett heltal ≥ 1.
@@ -636,7 +1829,149 @@ def build_deck(word_repo: WordRepository, n_pairs: int, rng: RandomGen
     if not isinstance(n_pairs, int) or n_pairs < 1:
         raise ValueError("n_pairs måste vara ett heltal ≥ 1")
 
-    words = word_repo.pick_words(n_pairs, rng)
+    words = word_repo.pick_words(n_pairs, rng, allow_repeats)
     deck = [w for w in words for _ in range(2)]
     # range(2) för att skapa dubbla ord i listan
     return deck
+
+
+def build_id_deck(word_repo: WordRepository, n_pairs: int, rng: RandomGen,
+                  allow_repeats: bool = False) -> array:
+    """Bygg en kortlek med ord-id:n istället för strängar.
+
+    Väljer exakt samma ord som build_deck med samma rng (samma seed ger
+    samma spel), men returnerar en kompakt array med id:n från
+    word_repo.vocabulary(). Orden avkodas först när brädan ritas ut.
+
+    Args:
+        word_repo: WordRepository som används för att hämta ord.
+        n_pairs: Antal ordpar (inte totalt antal kort).
+        rng: Slumptalsgenerator som används vid urvalet av ord.
+        allow_repeats: Tillåt att samma ord används i flera par.
+
+    Raises:
+        ValueError: Om n_pairs inte är ett heltal ≥ 1.
+
+    Returns:
+        En array('H') eller array('I') med längden 2*n_pairs."""
+    if not isinstance(n_pairs, int) or n_pairs < 1:
+        raise ValueError("n_pairs måste vara ett heltal ≥ 1")
+
+    vocabulary = word_repo.vocabulary()
+    words = word_repo.pick_words(n_pairs, rng, allow_repeats)
+    ids = [vocabulary.intern(w) for w in words]
+    return array(vocabulary.typecode(), [i for i in ids for _ in range(2)])
+
+
+LARGE_BOARD_SIZE = 26
+"""Brädor större än detta skapas som CompactBoard av make_board."""
+
+
+def make_board(size: int, vocabulary: Vocabulary | None = None) -> Board:
+    """Skapa en bräda av lämplig typ för given storlek.
+
+    Med ett ordförråd (för kortlekar från build_id_deck) eller större än
+    LARGE_BOARD_SIZE (t.ex. 200x200 för uthållighetsspel) blir det en
+    CompactBoard, där korten lagras som id:n och flip/resolve är O(1).
+    Annars används den vanliga Board med Card-objekt.
+
+    Args:
+        size: Antal rader och kolumner.
+        vocabulary: Ordförrådet som kortlekens id:n pekar in i. Utan får
+            en stor bräda ett eget, nytt ordförråd.
+
+    Returns:
+        En Board eller CompactBoard."""
+    if vocabulary is not None or size > LARGE_BOARD_SIZE:
+        return CompactBoard(size, vocabulary if vocabulary is not None else Vocabulary())
+    return Board(size)
+
+
+def column_label(col: int) -> str:
+    """Översätt ett noll-baserat kolumnindex till bokstäver som i ett kalkylark.
+
+    t.ex 0 -> 'A', 25 -> 'Z', 26 -> 'AA', 701 -> 'ZZ', 702 -> 'AAA'"""
+    if col < 0:
+        raise CoordinateError("Kolumnindex kan inte vara negativt")
+    label = ""
+    col += 1
+    while col:
+        col, rest = divmod(col - 1, 26)
+        label = string.ascii_uppercase[rest] + label
+    return label
+
+
+def parse_column(label: str) -> int:
+    """Översätt kolumnbokstäver ('A', 'Z', 'AA', ...) till ett noll-baserat index.
+
+    Raises:
+        CoordinateError: Om label är tom eller innehåller annat än A-Z"""
+    label = label.strip().upper()
+    if not label or any(ch not in string.ascii_uppercase for ch in label):
+        raise CoordinateError(f"Ogiltig kolumn: {label!r}")
+    col = 0
+    for ch in label:
+        col = col * 26 + (ord(ch) - ord("A") + 1)
+    return col - 1
+
+
+def new_game(settings: Settings, word_repo: WordRepository, difficulty: str,
+             seed: int | None = None, journal: bool = False) -> Game:
+    """Skapa och starta ett nytt spel för en svårighetsgrad.
+
+    Samma seed och svårighetsgrad ger alltid samma bräda, eftersom både
+    ordval (build_id_deck) och blandning (start_new_game) görs med
+    RandomGen(seed). Används av CLI, GUI och simuleringarna.
+
+    Args:
+        settings: Inställningar med brädstorlek per svårighetsgrad.
+        word_repo: WordRepository som kortleken byggs från.
+        difficulty: Svårighetsgrad, t.ex. "easy".
+        seed: Seed för RandomGen (None = slumpmässigt).
+        journal: Spara alla drag i game.journal.
+
+    Raises:
+        ValueError: Om svårighetsgraden är okänd eller orden inte räcker.
+
+    Returns:
+        Ett Game som väntar på första draget."""
+    if difficulty not in settings.difficulties:
+        raise ValueError(f"Ogiltig svårighetsgrad: {difficulty}")
+    rng = RandomGen(seed)
+    size = settings.difficulties[difficulty]
+    n_pairs = (size * size) // 2
+
+    deck = build_id_deck(word_repo, n_pairs, rng, allow_repeats=size > LARGE_BOARD_SIZE)
+    game = Game(make_board(size, word_repo.vocabulary()), difficulty, rng, journal)
+    game.start_new_game(deck)
+    return game
+
+
+def replay_game(settings: Settings, word_repo: WordRepository, difficulty: str,
+                seed: int, journal: MoveJournal) -> Game:
+    """Spela om ett spel från seed, svårighetsgrad och dragjournal.
+
+    Brädan byggs om precis som när spelet startades (new_game med samma
+    seed) och alla drag i journalen körs igen i full fart.
+
+    Args:
+        settings: Inställningar med brädstorlek per svårighetsgrad.
+        word_repo: Samma ordlista som när spelet spelades.
+        difficulty: Spelets svårighetsgrad.
+        seed: Spelets seed (sparas i score-posten).
+        journal: Dragen som ska spelas om.
+
+    Raises:
+        GameError: Om ett drag i journalen är ogiltigt för brädan.
+        ValueError: Om svårighetsgraden är okänd.
+
+    Returns:
+        Spelet i tillståndet efter sista draget."""
+    game = new_game(settings, word_repo, difficulty, seed)
+    size = game.board.size
+    for cell, _ in journal:
+        if cell == MoveJournal.RESOLVE:
+            game.resolve()
+        else:
+            game.flip(*divmod(cell, size))
+    return game
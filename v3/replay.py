@@ -0,0 +1,100 @@
+"""Kontroll av sparade resultat genom omspelning.
+
+Score-poster som sparats med en dragjournal ("journal") kan spelas om
+från seed och svårighetsgrad med replay_game i main.py. Den här modulen
+jämför omspelningen med det som står i posten (antal drag, om spelet
+blev klart och ungefärlig tid) och kan kontrollera en hel score-fil.
+
+Körs från terminalen, t.ex:
+    python replay.py              (kontrollerar data/score.jsonl)
+    python replay.py --verbose
+"""
+
+from __future__ import annotations
+from typing import Any
+
+import argparse
+import time
+
+from main import (
+    GameError, MoveJournal, Settings, WordRepository, replay_game
+)
+from scores import APP_SCORE_FILE, open_score_repository
+
+TIME_TOLERANCE = 0.5
+"""Tillåten skillnad i sekunder mellan sparad tid och journalens tid."""
+
+
+def verify_entry(entry: dict[str, Any], settings: Settings,
+                 word_repo: WordRepository) -> tuple[bool | None, str]:
+    """Spela om en score-post och kontrollera att den stämmer.
+
+    Args:
+        entry: Score-post med seed, difficulty och journal.
+        settings: Inställningar (brädstorlek per svårighetsgrad).
+        word_repo: Samma ordlista som när spelet spelades.
+
+    Returns:
+        (True, "") om posten stämmer, (False, orsak) om den inte gör det
+        och (None, orsak) om den inte kan kontrolleras (t.ex. saknar journal)."""
+    text = entry.get("journal")
+    if not text:
+        return None, "saknar journal"
+    try:
+        journal = MoveJournal.from_text(text)
+        game = replay_game(settings, word_repo, entry["difficulty"], entry["seed"], journal)
+    except (GameError, ValueError, KeyError, TypeError) as e:
+        return False, f"går inte att spela om: {e}"
+
+    if game.moves != entry.get("moves"):
+        return False, f"drag {entry.get('moves')} men omspelningen gav {game.moves}"
+    if game.is_finished() != entry.get("finished"):
+        return False, "finished stämmer inte med omspelningen"
+    if game.is_finished():
+        # speltiden räknas från första vända kortet, den första händelsen
+        # i journalen är tiden innan dess
+        played = sum(journal.deltas[1:]) / 1e9
+        if abs(played - entry.get("time", 0.0)) > TIME_TOLERANCE:
+            return False, f"tid {entry.get('time')} men journalen säger {played:.2f}"
+    return True, ""
+
+
+def verify_all(records: list[dict[str, Any]], settings: Settings,
+               word_repo: WordRepository) -> dict[str, list[tuple[dict[str, Any], str]]]:
+    """Kontrollera många poster.
+
+    Returns:
+        Dict med listor av (post, orsak) under nycklarna "ok", "failed" och "skipped"."""
+    result: dict[str, list[tuple[dict[str, Any], str]]] = {"ok": [], "failed": [], "skipped": []}
+    for entry in records:
+        ok, reason = verify_entry(entry, settings, word_repo)
+        key = "skipped" if ok is None else ("ok" if ok else "failed")
+        result[key].append((entry, reason))
+    return result
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Startpunkt för kommandoraden."""
+    parser = argparse.ArgumentParser(description="Kontrollera sparade resultat genom omspelning.")
+    parser.add_argument("--verbose", action="store_true", help="Visa alla poster som inte stämmer")
+    args = parser.parse_args(argv)
+
+    settings = Settings(score_file=APP_SCORE_FILE)
+    word_repo = WordRepository(settings)
+    records = open_score_repository(settings).load()
+
+    start = time.perf_counter()
+    result = verify_all(records, settings, word_repo)
+    seconds = time.perf_counter() - start
+
+    print(f"Kontrollerade {len(records)} poster på {seconds:.2f} s")
+    print(f"  Stämmer:        {len(result['ok'])}")
+    print(f"  Stämmer inte:   {len(result['failed'])}")
+    print(f"  Utan journal:   {len(result['skipped'])}")
+    if args.verbose:
+        for entry, reason in result["failed"]:
+            print(f"  game_id {entry.get('game_id')} ({entry.get('user_name')}): {reason}")
+
+
+if __name__ == "__main__":
+    main()
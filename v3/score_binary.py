@@ -0,0 +1,433 @@
+"""Highscores i ett binärt format med poster av fast storlek.
+
+För en server som mest läser highscorelistor är JSON dyrt: varje post
+måste tolkas till en dict innan den kan jämföras. BinaryScoreRepository
+lagrar istället varje resultat som 44 byte little-endian:
+
+    game_id     int64
+    user_id     uint32   index i namntabellen
+    moves       uint32
+    time        float64
+    difficulty  uint8    index i namntabellen
+    finished    uint8    0 eller 1
+    (2 byte utfyllnad)
+    timestamp   int64    sekunder sedan epoch (lokal tid i posten)
+    seed        int64
+
+efter ett huvud på 16 byte (magiska bytes, version och poststorlek).
+Namn på spelare och svårighetsgrader ligger i en sidotabell,
+<fil>.names, med en JSON-rad per namn. Ett id är radens nummer bland
+namnen av samma sort, så tabellen växer bara.
+
+Filen läses med mmap. top och rank_of jämför moves, time och
+svårighetsgrad direkt i bufferten med struct.unpack_from på en
+memoryview, eller med numpy.frombuffer om numpy finns, och bygger dictar
+bara för de poster som returneras.
+
+Bara fälten ovan sparas, t.ex. journal från ett spel tas inte med.
+
+Append skriver först nya namn till sidotabellen och sedan posten med en
+enda write på en fil öppnad med O_APPEND, båda med fsync och under flock
+på score-filen. En halv post i slutet (avbruten skrivning) räknas
+inte och skärs bort vid nästa append.
+"""
+
+from __future__ import annotations
+from typing import Any, Iterable, Iterator
+
+import heapq
+import json
+import mmap
+import os
+import struct
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from main import ScoreRank, ScoreRepository, Settings, file_lock
+from scores import read_jsonl
+
+try:
+    import numpy
+except ImportError:  # numpy är valfritt, utan det används struct
+    numpy = None
+
+MAGIC = b"MEMSCORE"
+VERSION = 1
+HEADER = struct.Struct("<8sHH4x")
+RECORD = struct.Struct("<qIIdBB2xqq")
+# moves, time, difficulty och finished ligger efter varandra från byte 12
+KEY = struct.Struct("<IdBB")
+KEY_OFFSET = 12
+MISSING = -(1 << 63)
+"""timestamp eller seed som saknas i posten."""
+
+if numpy is not None:
+    RECORD_DTYPE = numpy.dtype([
+        ("game_id", "<i8"), ("user", "<u4"), ("moves", "<u4"), ("time", "<f8"),
+        ("difficulty", "u1"), ("finished", "u1"), ("pad", "V2"),
+        ("timestamp", "<i8"), ("seed", "<i8"),
+    ])
+    assert RECORD_DTYPE.itemsize == RECORD.size
+
+
+def _to_epoch(timestamp: Any) -> int:
+    if not isinstance(timestamp, str):
+        return MISSING
+    try:
+        return int(time.mktime(time.strptime(timestamp, "%Y-%m-%d %H:%M:%S")))
+    except ValueError:
+        return MISSING
+
+
+class _Names:
+    """Sidotabellen med spelarnamn och svårighetsgrader."""
+    KINDS = ("user", "difficulty")
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.size = -1
+        self.names: dict[str, list[str]] = {kind: [] for kind in self.KINDS}
+        self.ids: dict[str, dict[str, int]] = {kind: {} for kind in self.KINDS}
+
+    def refresh(self) -> None:
+        """Läs om tabellen om filen har vuxit sedan sist."""
+        size = self.path.stat().st_size if self.path.exists() else 0
+        if size == self.size:
+            return
+        names: dict[str, list[str]] = {kind: [] for kind in self.KINDS}
+        ids: dict[str, dict[str, int]] = {kind: {} for kind in self.KINDS}
+        for line in read_jsonl(self.path):
+            (kind, name), = line.items()
+            ids[kind][name] = len(names[kind])
+            names[kind].append(name)
+        self.names, self.ids, self.size = names, ids, size
+
+    def name(self, kind: str, number: int) -> str:
+        """Namnet med ett visst id.
+
+        Raises:
+            ValueError: Om id:t inte finns i tabellen."""
+        if number >= len(self.names[kind]):
+            # posten skrevs efter att tabellen lästes
+            self.refresh()
+        if number >= len(self.names[kind]):
+            raise ValueError(f"Namntabellen saknar {kind} {number}: {self.path}")
+        return self.names[kind][number]
+
+    def add(self, fd: int, entries: Iterable[dict[str, Any]]) -> None:
+        """Skriv de namn i entries som saknas, med en write och fsync.
+
+        Körs under låset för append, så ingen annan skriver samtidigt."""
+        self.refresh()
+        lines = []
+        for entry in entries:
+            for kind, name in (("user", entry.get("user_name")), ("difficulty", entry.get("difficulty"))):
+                name = "" if name is None else str(name)
+                if name not in self.ids[kind]:
+                    self.ids[kind][name] = len(self.names[kind])
+                    self.names[kind].append(name)
+                    lines.append(json.dumps({kind: name}, ensure_ascii=False) + "\n")
+        if not lines:
+            return
+        # en halv rad från en avbruten skrivning har aldrig använts
+        end = os.lseek(fd, 0, os.SEEK_END)
+        if end and os.pread(fd, 1, end - 1) != b"\n":
+            tail = os.pread(fd, min(end, 1 << 16), max(0, end - (1 << 16)))
+            os.ftruncate(fd, end - len(tail) + tail.rfind(b"\n") + 1)
+        data = "".join(lines).encode("utf-8")
+        if os.write(fd, data) != len(data):
+            raise OSError(f"Kunde inte skriva namn till {self.path}")
+        os.fsync(fd)
+        self.size = os.fstat(fd).st_size
+
+
+class BinaryScoreRepository(ScoreRepository):
+    """Highscores i en binär fil med poster av fast storlek, läst med mmap."""
+    def __init__(self, settings: Settings,
+                 base_path: str | Path | None = None,
+                 filename: str | None = None,
+                 use_numpy: bool = True) -> None:
+        """Args:
+            settings: Inställningsobjekt för standardfilnamn.
+            base_path: Bas-katalog där score-filen ska ligga (default: settings.data_dir).
+            filename: Namn på score-filen (default: settings.score_file).
+            use_numpy: Använd numpy för att söka i bufferten om det finns."""
+        super().__init__(settings, base_path, filename)
+        self.use_numpy = use_numpy and numpy is not None
+        self._names = _Names(self.path.with_name(self.path.name + ".names"))
+
+    # --- läsning ----------------------------------------------------------
+
+    @contextmanager
+    def _buffer(self) -> Iterator[tuple[memoryview, int]]:
+        """Filen mappad i minnet: (poster utan huvud, antal hela poster).
+
+        Raises:
+            ValueError: Om filen inte är en binär score-fil."""
+        if not self.path.exists() or self.path.stat().st_size <= HEADER.size:
+            yield memoryview(b""), 0
+            return
+        with self.path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            magic, version, size = HEADER.unpack_from(mm)
+            if magic != MAGIC or version != VERSION or size != RECORD.size:
+                raise ValueError(f"Score filen är korrupt: {self.path}")
+            with memoryview(mm) as view:
+                records = view[HEADER.size:]
+                try:
+                    yield records, len(records) // RECORD.size
+                finally:
+                    records.release()
+
+    def _entry(self, view: memoryview, i: int) -> dict[str, Any]:
+        game_id, user, moves, time_, difficulty, finished, timestamp, seed = (
+            RECORD.unpack_from(view, i * RECORD.size))
+        entry = {
+            "game_id": game_id,
+            "user_name": self._names.name("user", user),
+            "moves": moves,
+            "time": time_,
+            "difficulty": self._names.name("difficulty", difficulty),
+            "finished": bool(finished),
+        }
+        if timestamp != MISSING:
+            entry["timestamp"] = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp))
+        if seed != MISSING:
+            entry["seed"] = seed
+        return entry
+
+    def load(self) -> list[dict[str, Any]]:
+        """Läs in alla sparade resultat i den ordning de sparades."""
+        return list(self.iter_records())
+
+    def iter_records(self, difficulty: str | None = None,
+                     finished: bool | None = None) -> Iterator[dict[str, Any]]:
+        """Läs sparade resultat ett i taget, filtren görs på bufferten.
+
+        Args:
+            difficulty: Bara poster med den svårighetsgraden (None = alla).
+            finished: Bara färdiga (True) eller ej färdiga (False) spel (None = alla)."""
+        self._names.refresh()
+        code = None
+        if difficulty is not None:
+            code = self._names.ids["difficulty"].get(difficulty)
+            if code is None:
+                return
+        with self._buffer() as (view, n):
+            for i in range(n):
+                _, _, diff, fin = KEY.unpack_from(view, i * RECORD.size + KEY_OFFSET)
+                if ((code is None or diff == code) and
+                        (finished is None or bool(fin) == finished)):
+                    yield self._entry(view, i)
+
+    def _finished(self, view: memoryview, n: int, code: int) -> tuple[Any, Any, Any]:
+        """(index, moves, time) för färdiga spel med svårighetsgraden code.
+
+        numpy-arrayer om numpy används, annars listor. Index i filordning."""
+        if self.use_numpy:
+            records = numpy.frombuffer(view, RECORD_DTYPE, count=n)
+            index = numpy.flatnonzero((records["difficulty"] == code) & (records["finished"] != 0))
+            return index, records["moves"][index], records["time"][index]
+        index, moves, times = [], [], []
+        for i in range(n):
+            m, t, diff, fin = KEY.unpack_from(view, i * RECORD.size + KEY_OFFSET)
+            if diff == code and fin:
+                index.append(i)
+                moves.append(m)
+                times.append(t)
+        return index, moves, times
+
+    def _order(self, view: memoryview, n: int, code: int, limit: int | None) -> list[int]:
+        """Index för färdiga spel i highscoreordning, högst limit stycken."""
+        index, moves, times = self._finished(view, n, code)
+        if not self.use_numpy:
+            keys = zip(moves, times, index)
+            best = sorted(keys) if limit is None else heapq.nsmallest(limit, keys)
+            return [i for _, _, i in best]
+        if limit is not None and limit < len(index):
+            if limit <= 0:
+                return []
+            # bara poster med högst lika många drag som den limit:te kan komma med
+            worst = numpy.partition(moves, limit - 1)[limit - 1]
+            keep = moves <= worst
+            index, moves, times = index[keep], moves[keep], times[keep]
+        # lexsort sorterar på sista nyckeln först, index ger sparordning vid lika
+        order = numpy.lexsort((index, times, moves))
+        return index[order][:limit].tolist()
+
+    def top(self, difficulty: str, limit: int | None = None) -> list[dict[str, Any]]:
+        """Returnera de bästa resultaten för en viss svårighetsgrad.
+
+        Sorteringen görs på moves och time direkt i bufferten, dictar
+        byggs bara för de limit poster som returneras.
+
+        Args:
+            difficulty: Svårighetsgrad att filtrera på.
+            limit: Max antal resultat att returnera (None = alla).
+
+        Raises:
+            ValueError: Om svårighetsgraden inte är tillåten."""
+        self._check_difficulty(difficulty)
+        self._names.refresh()
+        code = self._names.ids["difficulty"].get(difficulty)
+        if code is None:
+            return []
+        with self._buffer() as (view, n):
+            return [self._entry(view, i) for i in self._order(view, n, code, limit)]
+
+    def rank_of(self, entry: dict[str, Any], neighbours: int = 0) -> ScoreRank:
+        """Placering på highscorelistan, räknad i bufferten.
+
+        Som ScoreRepository.rank_of: en sparad post (samma game_id bland
+        lika resultat) får sin egen plats, en ny hamnar efter lika resultat.
+
+        Args:
+            entry: Sparad eller ny score-post.
+            neighbours: Antal poster före och efter att returnera.
+
+        Raises:
+            ValueError: Om svårighetsgraden inte är tillåten."""
+        difficulty = entry.get("difficulty")
+        self._check_difficulty(difficulty)
+        self._names.refresh()
+        code = self._names.ids["difficulty"].get(difficulty)
+        if code is None:
+            # inga resultat alls för svårighetsgraden
+            return ScoreRank(1)
+        with self._buffer() as (view, n):
+            index, moves, times = self._finished(view, n, code)
+            if not entry.get("finished"):
+                position, after = len(index) + 1, len(index)
+            else:
+                key = (entry.get("moves"), entry.get("time"))
+                if self.use_numpy:
+                    before = int(numpy.count_nonzero(
+                        (moves < key[0]) | ((moves == key[0]) & (times < key[1]))))
+                    equal = index[(moves == key[0]) & (times == key[1])].tolist()
+                else:
+                    keys = list(zip(moves, times))
+                    before = sum(1 for k in keys if k < key)
+                    equal = [i for i, k in zip(index, keys) if k == key]
+                # lika resultat ligger i sparordning, leta efter posten bland dem
+                game_id = entry.get("game_id")
+                offset = next((j for j, i in enumerate(equal)
+                               if RECORD.unpack_from(view, i * RECORD.size)[0] == game_id), None)
+                if offset is None:
+                    position = before + len(equal) + 1
+                    after = position - 1
+                else:
+                    position = before + offset + 1
+                    after = position
+            if not neighbours:
+                return ScoreRank(position)
+            order = self._order(view, n, code, after + neighbours)
+            above = order[max(0, position - 1 - neighbours):position - 1]
+            return ScoreRank(position, [self._entry(view, i) for i in above],
+                             [self._entry(view, i) for i in order[after:after + neighbours]])
+
+    def rank_of_game_id(self, game_id: int, neighbours: int = 0) -> ScoreRank | None:
+        """Som rank_of för den sparade posten med game_id, None om den inte finns."""
+        with self._buffer() as (view, n):
+            if self.use_numpy:
+                found = numpy.flatnonzero(
+                    numpy.frombuffer(view, RECORD_DTYPE, count=n)["game_id"] == game_id)
+                i = int(found[0]) if len(found) else None
+            else:
+                i = next((i for i in range(n)
+                          if RECORD.unpack_from(view, i * RECORD.size)[0] == game_id), None)
+            entry = None if i is None else self._entry(view, i)
+        if entry is None:
+            return None
+        return self.rank_of(entry, neighbours)
+
+    def _game_ids(self) -> set[int]:
+        with self._buffer() as (view, n):
+            if self.use_numpy:
+                return set(numpy.frombuffer(view, RECORD_DTYPE, count=n)["game_id"].tolist())
+            return {RECORD.unpack_from(view, i * RECORD.size)[0] for i in range(n)}
+
+    # --- skrivning --------------------------------------------------------
+
+    def _encode(self, entry: dict[str, Any]) -> bytes:
+        """En post som binär rad, namnen måste redan finnas i tabellen.
+
+        Raises:
+            ValueError: Om ett fält inte går att lagra (t.ex. moves < 0)."""
+        try:
+            return RECORD.pack(
+                entry.get("game_id"),
+                self._names.ids["user"]["" if entry.get("user_name") is None else str(entry["user_name"])],
+                entry.get("moves"),
+                entry.get("time"),
+                self._names.ids["difficulty"][str(entry.get("difficulty"))],
+                1 if entry.get("finished") else 0,
+                _to_epoch(entry.get("timestamp")),
+                MISSING if entry.get("seed") is None else entry["seed"],
+            )
+        except struct.error as e:
+            raise ValueError(f"Posten går inte att lagra binärt: {e}") from e
+
+    def _write(self, entries: list[dict[str, Any]]) -> None:
+        """Skriv namn och poster med en write var, under låset."""
+        fd = os.open(self.path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        names_fd = os.open(self._names.path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            with file_lock(fd):
+                self._names.add(names_fd, entries)
+                data = b"".join(self._encode(e) for e in entries)
+                end = os.lseek(fd, 0, os.SEEK_END)
+                if end < HEADER.size:
+                    os.ftruncate(fd, 0)
+                    data = HEADER.pack(MAGIC, VERSION, RECORD.size) + data
+                elif (end - HEADER.size) % RECORD.size:
+                    # en halv post från en avbruten skrivning
+                    os.ftruncate(fd, end - (end - HEADER.size) % RECORD.size)
+                written = os.write(fd, data)
+                if written != len(data):
+                    raise OSError(f"Kunde bara skriva {written} av {len(data)} byte till {self.path}")
+                os.fsync(fd)
+        finally:
+            os.close(names_fd)
+            os.close(fd)
+
+    def append(self, entry: dict[str, Any]) -> None:
+        """Lägg till ett nytt resultat sist i filen.
+
+        Args:
+            entry: En dict med information om resultatet (t.ex. moves, time, difficulty).
+
+        Raises:
+            ValueError: Om ett fält inte går att lagra binärt."""
+        self._write([entry])
+
+    def bulk_append(self, entries: Iterable[dict[str, Any]]) -> int:
+        """Lägg till många resultat med en enda skrivning.
+
+        Som ScoreRepository.bulk_append, dubbletter letas upp i bufferten.
+
+        Returns:
+            Antal poster som lades till.
+
+        Raises:
+            ValueError: Om en post är ogiltig."""
+        batch = self._prepare_batch(entries)
+        saved = self._game_ids()
+        new = [e for e in batch if e.get("game_id") not in saved]
+        if new:
+            self._write(new)
+        return len(new)
+
+
+def migrate_to_binary(records: Iterable[dict[str, Any]], target: str | Path) -> int:
+    """Skriv poster till en ny binär score-fil (och dess namntabell).
+
+    Raises:
+        ValueError: Om target redan finns eller en post inte går att lagra."""
+    target = Path(target)
+    if target.exists():
+        raise ValueError(f"{target} finns redan")
+    repo = BinaryScoreRepository(Settings(), target.parent, target.name)
+    records = list(records)
+    if records:
+        repo._write(records)
+    return len(records)
@@ -0,0 +1,429 @@
+"""Score-logg uppdelad i segment, med komprimering i bakgrunden.
+
+En vanlig JSONL-fil (scores.JsonlScoreRepository) växer för evigt och den
+som läser den betalar för varje gammalt resultat. SegmentedScoreRepository
+lagrar istället posterna i en katalog:
+
+    manifest.json           vilka filer som gäller just nu
+    seg-000012.jsonl ...    nya poster i sparordning (delta-segment), det
+                            sista är aktivt och tar emot append
+    base-000011-0.jsonl ... komprimerad bas, en fil per svårighetsgrad
+
+Ett segment som blivit större än segment_bytes stängs och ett nytt blir
+aktivt. När compact_after stängda segment har samlats startas en
+komprimering i en bakgrundstråd. Den slår ihop basen och de stängda
+segmenten till nya basfiler, sorterade som highscorelistan (färdiga spel
+efter (moves, time), sedan ej färdiga) och utan dubbletter av game_id.
+
+Läsare öppnar bara basen och de få delta-segmenten. top(limit=n) läser de
+n första raderna i basfilen och slår ihop dem med deltat, så tiden är
+densamma oavsett hur lång historiken är.
+
+Manifestet byts ut atomärt (tmp + rename). Append och byte av manifest
+görs med flock på manifest.lock. Stängda segment och basfiler ändras
+aldrig, så komprimeringen kan läsa dem utan lås. Gamla filer tas bort
+efter att det nya manifestet skrivits; en läsare som inte hittar en fil
+läser om manifestet och försöker igen.
+"""
+
+from __future__ import annotations
+from typing import Any, Iterable, Iterator
+
+import heapq
+import itertools
+import json
+import os
+import threading
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+
+from main import ScoreRank, ScoreRepository, Settings, file_lock, record_matches, score_key
+from scores import JsonlScoreRepository, encode_record, parse_jsonl, read_jsonl
+
+SEGMENT_BYTES = 1 << 20
+"""Storlek då det aktiva segmentet stängs (default 1 MiB)."""
+
+COMPACT_AFTER = 4
+"""Antal stängda segment som startar en komprimering."""
+
+MANIFEST_VERSION = 1
+
+
+@contextmanager
+def _locked(path: Path) -> Iterator[None]:
+    """Håll flock på en låsfil så länge with-blocket körs."""
+    with open(path, "a") as f, file_lock(f.fileno()):
+        yield
+
+
+def _bucket(entry: dict[str, Any]) -> str:
+    """Namnet på basfilen posten hamnar i (svårighetsgraden)."""
+    difficulty = entry.get("difficulty")
+    return difficulty if isinstance(difficulty, str) else ""
+
+
+def _base_order(entry: dict[str, Any]) -> tuple[int, float, float]:
+    """Ordningen i en basfil: färdiga spel som top, sedan ej färdiga."""
+    return (0 if entry.get("finished") else 1, *score_key(entry))
+
+
+class SegmentedScoreRepository(ScoreRepository):
+    """Highscores i en katalog med basfiler och delta-segment."""
+    def __init__(self, settings: Settings,
+                 base_path: str | Path | None = None,
+                 filename: str | None = None,
+                 segment_bytes: int = SEGMENT_BYTES,
+                 compact_after: int = COMPACT_AFTER,
+                 background: bool = True
+                 ) -> None:
+        """Öppna (eller skapa) en segmenterad score-katalog.
+
+        Args:
+            settings, base_path, filename: Se ScoreRepository. Sökvägen är
+                en katalog (t.ex. data/score.segments).
+            segment_bytes: Storlek då aktivt segment stängs.
+            compact_after: Antal stängda segment som startar komprimering.
+            background: Starta komprimeringen i en tråd (annars bara via compact())."""
+        super().__init__(settings, base_path, filename)
+        self.segment_bytes = segment_bytes
+        self.compact_after = compact_after
+        self.background = background
+        self._compaction: threading.Thread | None = None
+        self.path.mkdir(exist_ok=True)
+        if not self._manifest_path.exists():
+            with self._manifest_lock():
+                if not self._manifest_path.exists():
+                    self._write_manifest({"version": MANIFEST_VERSION, "generation": 1,
+                                          "base": {}, "segments": ["seg-000001.jsonl"]})
+
+    # --- manifest ---------------------------------------------------------
+
+    @property
+    def _manifest_path(self) -> Path:
+        return self.path / "manifest.json"
+
+    def _manifest_lock(self):
+        """Lås för append och byte av manifest (mellan processer)."""
+        return _locked(self.path / "manifest.lock")
+
+    def manifest(self) -> dict[str, Any]:
+        """Det aktuella manifestet.
+
+        Raises:
+            ValueError: Om manifestet är korrupt eller har okänd version."""
+        try:
+            manifest = json.loads(self._manifest_path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Manifestet är korrupt: {self._manifest_path}") from e
+        if manifest.get("version") != MANIFEST_VERSION:
+            raise ValueError(f"Okänd manifestversion: {manifest.get('version')}")
+        return manifest
+
+    def _write_manifest(self, manifest: dict[str, Any]) -> None:
+        tmp = self._manifest_path.with_suffix(".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=4, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        tmp.replace(self._manifest_path)
+
+    def _next_name(self, manifest: dict[str, Any], prefix: str) -> str:
+        manifest["generation"] += 1
+        return f"{prefix}-{manifest['generation']:06d}"
+
+    # --- läsning ----------------------------------------------------------
+
+    def _read(self, read):
+        """Kör read(manifest), med nytt manifest om en fil hann tas bort."""
+        for _ in range(10):
+            try:
+                return read(self.manifest())
+            except FileNotFoundError:
+                continue
+        return read(self.manifest())
+
+    def _open_lines(self, name: str) -> Iterator[dict[str, Any]]:
+        """Öppna filen direkt och läs posterna efterhand.
+
+        Saknas filen (borttagen av en komprimering) kommer FileNotFoundError
+        här och inte mitt i läsningen. En öppen fil går att läsa klart
+        även om den tas bort."""
+        f = (self.path / name).open("rb")
+
+        def lines() -> Iterator[dict[str, Any]]:
+            with f:
+                yield from parse_jsonl(f, self.path / name)
+        return lines()
+
+    def _delta(self, manifest: dict[str, Any]) -> list[dict[str, Any]]:
+        """Alla poster i delta-segmenten, i sparordning."""
+        records: list[dict[str, Any]] = []
+        *sealed, active = manifest["segments"]
+        for name in sealed:
+            records.extend(self._open_lines(name))
+        try:
+            records.extend(self._open_lines(active))
+        except FileNotFoundError:
+            # ett aktivt segment skapas först vid första append, men är det
+            # inte längre aktivt har det hunnit komprimeras bort
+            if self.manifest()["segments"][-1] != active:
+                raise
+        return records
+
+    def load(self) -> list[dict[str, Any]]:
+        """Läs in alla sparade resultat.
+
+        Poster i basen kommer per svårighetsgrad i highscoreordning, sedan
+        kommer de nyare posterna i sparordning.
+
+        Raises:
+            ValueError: Om en fil är korrupt."""
+        def read(manifest):
+            records: list[dict[str, Any]] = []
+            for name in manifest["base"].values():
+                records.extend(self._open_lines(name))
+            records.extend(self._delta(manifest))
+            return records
+        return self._read(read)
+
+    def iter_records(self, difficulty: str | None = None,
+                     finished: bool | None = None) -> Iterator[dict[str, Any]]:
+        """Läs sparade resultat ett i taget, i samma ordning som load.
+
+        Med difficulty öppnas bara den basfilen. Alla filer öppnas innan
+        första posten lämnas ut, så en komprimering mitt i läsningen gör
+        inget.
+
+        Args:
+            difficulty: Bara poster med den svårighetsgraden (None = alla).
+            finished: Bara färdiga (True) eller ej färdiga (False) spel (None = alla).
+
+        Raises:
+            ValueError: Om en fil är korrupt."""
+        def read(manifest):
+            bases = [self._open_lines(name) for bucket, name in manifest["base"].items()
+                     if difficulty is None or bucket == difficulty]
+            return itertools.chain(*bases, self._delta(manifest))
+        for entry in self._read(read):
+            if record_matches(entry, difficulty, finished):
+                yield entry
+
+    def _ranked(self, manifest: dict[str, Any], difficulty: str) -> Iterator[dict[str, Any]]:
+        """Färdiga spel för en svårighetsgrad i highscoreordning.
+
+        Basfilen är redan sorterad och läses bara så långt som behövs,
+        deltat sorteras i minnet. Vid lika resultat kommer basen (äldre) först."""
+        base_name = manifest["base"].get(difficulty)
+        base = self._open_lines(base_name) if base_name else iter(())
+        base = itertools.takewhile(lambda e: bool(e.get("finished")), base)
+        delta = sorted((e for e in self._delta(manifest)
+                        if e.get("finished") and e.get("difficulty") == difficulty),
+                       key=score_key)
+        return heapq.merge(base, delta, key=score_key)
+
+    def top(self, difficulty: str, limit: int | None = None) -> list[dict[str, Any]]:
+        """Returnera de bästa resultaten för en viss svårighetsgrad.
+
+        Args:
+            difficulty: Svårighetsgrad att filtrera på.
+            limit: Max antal resultat att returnera (None = alla).
+
+        Raises:
+            ValueError: Om svårighetsgraden inte är tillåten."""
+        self._check_difficulty(difficulty)
+        return self._read(lambda manifest: list(
+            itertools.islice(self._ranked(manifest, difficulty), limit)))
+
+    def rank_of(self, entry: dict[str, Any], neighbours: int = 0) -> ScoreRank:
+        """Placering på highscorelistan, läser bara fram till postens plats.
+
+        Args:
+            entry: Sparad eller ny score-post.
+            neighbours: Antal poster före och efter att returnera.
+
+        Raises:
+            ValueError: Om svårighetsgraden inte är tillåten."""
+        self._check_difficulty(entry.get("difficulty"))
+        return self._read(lambda manifest: self._rank(manifest, entry, neighbours))
+
+    def _rank(self, manifest: dict[str, Any], entry: dict[str, Any],
+              neighbours: int) -> ScoreRank:
+        ranked = self._ranked(manifest, entry["difficulty"])
+        above: deque[dict[str, Any]] = deque(maxlen=neighbours or None)
+        key = score_key(entry)
+        game_id = entry.get("game_id")
+        position = 0
+        saved = False
+        for record in ranked:
+            record_key = score_key(record)
+            if entry.get("finished"):
+                if record_key == key and game_id is not None and record.get("game_id") == game_id:
+                    saved = True
+                    break
+                if record_key > key:
+                    ranked = itertools.chain([record], ranked)
+                    break
+            position += 1
+            if neighbours:
+                above.append(record)
+        if not neighbours:
+            return ScoreRank(position + 1)
+        below = list(itertools.islice(ranked, neighbours))
+        return ScoreRank(position + 1, list(above), below)
+
+    # --- skrivning --------------------------------------------------------
+
+    def append(self, entry: dict[str, Any]) -> None:
+        """Lägg till ett resultat i det aktiva segmentet.
+
+        Stänger segmentet om det blivit för stort och startar en
+        komprimering när tillräckligt många segment har stängts.
+
+        Args:
+            entry: En dict med information om resultatet (t.ex. moves, time, difficulty)."""
+        with self._manifest_lock():
+            manifest = self.manifest()
+            active = manifest["segments"][-1]
+            segment = JsonlScoreRepository(self.settings, self.path, active)
+            segment.append(entry)
+            if segment.path.stat().st_size < self.segment_bytes:
+                return
+            manifest["segments"].append(self._next_name(manifest, "seg") + ".jsonl")
+            self._write_manifest(manifest)
+            sealed = len(manifest["segments"]) - 1
+        if sealed >= self.compact_after and self.background:
+            self.start_compaction()
+
+    def bulk_append(self, entries: Iterable[dict[str, Any]]) -> int:
+        """Lägg till många resultat med en enda skrivning i det aktiva segmentet.
+
+        Som ScoreRepository.bulk_append. Segmentet stängs efteråt om det
+        blivit för stort, även om hela satsen hamnade i ett segment.
+
+        Returns:
+            Antal poster som lades till.
+
+        Raises:
+            ValueError: Om en post är ogiltig eller en fil är korrupt."""
+        batch = self._prepare_batch(entries)
+        with self._manifest_lock():
+            saved = {e.get("game_id") for e in self.iter_records()}
+            new = [e for e in batch if e.get("game_id") not in saved]
+            if not new:
+                return 0
+            manifest = self.manifest()
+            segment = JsonlScoreRepository(self.settings, self.path, manifest["segments"][-1])
+            segment._write_batch(new)
+            if segment.path.stat().st_size < self.segment_bytes:
+                return len(new)
+            manifest["segments"].append(self._next_name(manifest, "seg") + ".jsonl")
+            self._write_manifest(manifest)
+            sealed = len(manifest["segments"]) - 1
+        if sealed >= self.compact_after and self.background:
+            self.start_compaction()
+        return len(new)
+
+    def start_compaction(self) -> threading.Thread:
+        """Starta compact() i en bakgrundstråd (om ingen redan körs)."""
+        if self._compaction is None or not self._compaction.is_alive():
+            self._compaction = threading.Thread(target=self.compact, name="score-compaction",
+                                                daemon=True)
+            self._compaction.start()
+        return self._compaction
+
+    def compact(self) -> int:
+        """Slå ihop basen och alla stängda segment till nya basfiler.
+
+        Det aktiva segmentet lämnas kvar. Poster med ett game_id som redan
+        finns (äldst vinner) tas bort.
+
+        Returns:
+            Antal segment som slogs ihop."""
+        with _locked(self.path / "compact.lock"):
+            manifest = self.manifest()
+            sealed = manifest["segments"][:-1]
+            if not sealed:
+                return 0
+            old_base = dict(manifest["base"])
+
+            buckets: dict[str, list[dict[str, Any]]] = {}
+            seen: set[Any] = set()
+            sources = [self.path / name for name in old_base.values()]
+            sources += [self.path / name for name in sealed]
+            for path in sources:
+                for entry in read_jsonl(path):
+                    game_id = entry.get("game_id")
+                    if game_id is not None:
+                        if game_id in seen:
+                            continue
+                        seen.add(game_id)
+                    buckets.setdefault(_bucket(entry), []).append(entry)
+
+            # reservera ett generationsnummer så filnamnen blir unika
+            with self._manifest_lock():
+                current = self.manifest()
+                prefix = self._next_name(current, "base")
+                self._write_manifest(current)
+            new_base = {}
+            for i, (difficulty, records) in enumerate(sorted(buckets.items())):
+                records.sort(key=_base_order)
+                name = f"{prefix}-{i}.jsonl"
+                _write_lines(self.path / name, records)
+                new_base[difficulty] = name
+
+            with self._manifest_lock():
+                current = self.manifest()
+                current["base"] = new_base
+                current["segments"] = [s for s in current["segments"] if s not in sealed]
+                self._write_manifest(current)
+
+            for name in [*old_base.values(), *sealed]:
+                (self.path / name).unlink(missing_ok=True)
+            return len(sealed)
+
+    def wait_for_compaction(self, timeout: float | None = None) -> None:
+        """Vänta tills en pågående bakgrundskomprimering är klar."""
+        if self._compaction is not None:
+            self._compaction.join(timeout)
+
+
+def _write_lines(path: Path, records: Iterable[dict[str, Any]]) -> None:
+    """Skriv en hel JSONL-fil via en temporär fil."""
+    tmp = path.with_suffix(".tmp")
+    with tmp.open("wb") as f:
+        for entry in records:
+            f.write(encode_record(entry))
+        f.flush()
+        os.fsync(f.fileno())
+    tmp.replace(path)
+
+
+def migrate_to_segments(records: Iterable[dict[str, Any]], target: str | Path) -> int:
+    """Skapa en segmenterad katalog av befintliga poster och komprimera den.
+
+    Args:
+        records: Alla poster, t.ex. från en gammal score.json/.jsonl.
+        target: Ny katalog (får inte finnas).
+
+    Returns:
+        Antal poster.
+
+    Raises:
+        ValueError: Om target redan finns."""
+    target = Path(target)
+    if target.exists():
+        raise ValueError(f"{target} finns redan")
+    repo = SegmentedScoreRepository(Settings(), target.parent, target.name, background=False)
+    count = 0
+    with repo._manifest_lock():
+        manifest = repo.manifest()
+        first = manifest["segments"][-1]
+        with (repo.path / first).open("wb") as f:
+            for entry in records:
+                f.write(encode_record(entry))
+                count += 1
+        manifest["segments"].append(repo._next_name(manifest, "seg") + ".jsonl")
+        repo._write_manifest(manifest)
+    repo.compact()
+    return count
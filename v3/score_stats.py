@@ -0,0 +1,248 @@
+"""Statistik per spelare, uppdaterad vid varje sparat resultat.
+
+En profilsida vill visa bästa resultat, snitt antal drag, hur stor del
+av spelen som klarats och antal spel per svårighetsgrad. Att räkna fram
+det med ScoreRepository.load för varje sida läser hela historiken.
+
+ScoreStats håller istället en PlayerStats per user_name. append(entry)
+sparar resultatet i score-filen och uppdaterar bara den spelarens
+räknare (O(1)). Var save_every:e resultat, och i close, sparas en
+ögonblicksbild bredvid score-filen, t.ex. data/score.jsonl.stats. Bilden
+är lika stor som antalet spelare, inte antalet resultat.
+
+Bilden har med en stämpel (storlek och mtime) för score-filen som den
+gäller för. append jämför stämpeln före skrivningen med den statistiken
+motsvarar, under ett lås som alla ScoreStats för filen delar. Har filen
+ändrats på annat sätt (ett annat program, en migrering) räknas
+ingenting in och statistiken byggs om med en enda genomläsning av
+ScoreRepository.iter_records, men först när den efterfrågas.
+"""
+
+from __future__ import annotations
+from typing import Any, Iterator
+
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+from main import ScoreRepository, file_lock, file_stamp, score_key
+
+STATS_VERSION = 1
+
+
+class PlayerStats:
+    """Sammanställning av alla resultat för en spelare.
+
+    Attribut:
+        games: Antal sparade spel.
+        finished: Antal klarade spel.
+        moves_total: Summan av antal drag i de klarade spelen.
+        difficulties: Per svårighetsgrad en dict med games, finished och
+            best (moves, time och game_id för bästa klarade spel, eller None)."""
+    def __init__(self) -> None:
+        self.games = 0
+        self.finished = 0
+        self.moves_total = 0
+        self.difficulties: dict[str, dict[str, Any]] = {}
+
+    def __repr__(self) -> str:
+        return f"PlayerStats(games={self.games}, finished={self.finished})"
+
+    def add(self, entry: dict[str, Any]) -> None:
+        """Räkna in ett resultat, O(1)."""
+        stats = self.difficulties.setdefault(
+            entry.get("difficulty"), {"games": 0, "finished": 0, "best": None})
+        self.games += 1
+        stats["games"] += 1
+        if not entry.get("finished"):
+            return
+        self.finished += 1
+        self.moves_total += entry.get("moves", 0)
+        stats["finished"] += 1
+        best = stats["best"]
+        # strikt mindre: vid lika resultat står det äldsta kvar, som i top
+        if best is None or score_key(entry) < score_key(best):
+            stats["best"] = {"moves": entry.get("moves"), "time": entry.get("time"),
+                             "game_id": entry.get("game_id")}
+
+    @property
+    def average_moves(self) -> float | None:
+        """Snitt antal drag för klarade spel, None om inget är klarat."""
+        return self.moves_total / self.finished if self.finished else None
+
+    @property
+    def completion_rate(self) -> float:
+        """Andel av spelen som klarats (0.0 - 1.0)."""
+        return self.finished / self.games if self.games else 0.0
+
+    def best(self, difficulty: str) -> dict[str, Any] | None:
+        """Bästa klarade spelet (moves, time, game_id) för en svårighetsgrad."""
+        stats = self.difficulties.get(difficulty)
+        return stats["best"] if stats else None
+
+    def games_per_difficulty(self) -> dict[str, int]:
+        """Antal spel per svårighetsgrad."""
+        return {difficulty: stats["games"] for difficulty, stats in self.difficulties.items()}
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"games": self.games, "finished": self.finished,
+                "moves_total": self.moves_total, "difficulties": self.difficulties}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> PlayerStats:
+        stats = cls()
+        stats.games = data["games"]
+        stats.finished = data["finished"]
+        stats.moves_total = data["moves_total"]
+        stats.difficulties = data["difficulties"]
+        return stats
+
+
+class ScoreStats:
+    """Statistik per spelare för ett ScoreRepository."""
+    def __init__(self, score_repo: ScoreRepository, path: str | Path | None = None,
+                 save_every: int = 20) -> None:
+        """Läser den sparade statistiken om den gäller för score-filen.
+
+        Args:
+            score_repo: Repository som resultaten sparas i.
+            path: Fil för statistiken (default: score-filen + ".stats").
+            save_every: Spara statistiken efter så här många resultat (och i close)."""
+        self.score_repo = score_repo
+        self.path = Path(path) if path is not None else Path(f"{score_repo.path}.stats")
+        self.save_every = save_every
+        self._players: dict[str, PlayerStats] = {}
+        # stämpeln för score-filen som _players motsvarar
+        self._stamp: list[Any] | None = None
+        self._unsaved = 0
+        with self._locked():
+            self._stale = not self._load()
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """flock på <statistikfil>.lock, mellan trådar och program."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(f"{self.path}.lock", "a") as f, file_lock(f.fileno()):
+            yield
+
+    @property
+    def players(self) -> dict[str, PlayerStats]:
+        """Alla spelare, byggs om från score-filen först om det behövs.
+
+        Raises:
+            ValueError: Om score-filen är korrupt (vid ombyggnad)."""
+        with self._locked():
+            if self._stale or file_stamp(self.score_repo.path) != self._stamp:
+                self._rebuild()
+            return self._players
+
+    def get(self, user_name: str) -> PlayerStats | None:
+        """Statistiken för en spelare, None om spelaren inte har några resultat.
+
+        Raises:
+            ValueError: Om score-filen är korrupt (vid ombyggnad)."""
+        return self.players.get(user_name)
+
+    def _add(self, entry: dict[str, Any]) -> None:
+        user_name = entry.get("user_name")
+        stats = self._players.get(user_name)
+        if stats is None:
+            stats = self._players[user_name] = PlayerStats()
+        stats.add(entry)
+
+    def append(self, entry: dict[str, Any]) -> tuple[list[Any] | None, list[Any] | None]:
+        """Spara ett resultat med score_repo.append och räkna in det, O(1).
+
+        Stämpeln tas före och efter append under låset. Har score-filen
+        ändrats sedan statistiken lästes eller sparades (ett annat program
+        som inte går via ScoreStats) räknas ingenting in, statistiken
+        byggs då om nästa gång den efterfrågas.
+
+        Returns:
+            Stämplarna (file_stamp) före och efter skrivningen, så andra
+            cachar (WindowedLeaderboards.add) kan göra samma jämförelse.
+
+        Raises:
+            OSError, ValueError: Från score_repo.append."""
+        with self._locked():
+            before = file_stamp(self.score_repo.path)
+            if before != self._stamp:
+                self._stale = True
+            self.score_repo.append(entry)
+            after = file_stamp(self.score_repo.path)
+            if self._stale:
+                return before, after
+            self._add(entry)
+            self._stamp = after
+            self._unsaved += 1
+            if self._unsaved >= self.save_every:
+                self._save()
+            return before, after
+
+    def rebuild(self) -> None:
+        """Räkna om allt med en genomläsning av score-filen och spara.
+
+        Raises:
+            ValueError: Om score-filen är korrupt."""
+        with self._locked():
+            self._rebuild()
+
+    def _rebuild(self) -> None:
+        # stämpeln före läsningen: ändras filen under tiden byggs det om igen
+        stamp = file_stamp(self.score_repo.path)
+        self._players = {}
+        for entry in self.score_repo.iter_records():
+            self._add(entry)
+        self._stamp, self._stale = stamp, False
+        self._save()
+
+    def _load(self) -> bool:
+        """Läs sparad statistik, False om den saknas eller inte gäller längre."""
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return False
+        stamp = file_stamp(self.score_repo.path)
+        if (not isinstance(data, dict) or data.get("version") != STATS_VERSION
+                or data.get("stamp") != stamp):
+            return False
+        try:
+            self._players = {name: PlayerStats.from_dict(p) for name, p in data["players"].items()}
+        except (KeyError, TypeError, AttributeError):
+            return False
+        self._stamp = stamp
+        return True
+
+    def save(self) -> None:
+        """Spara statistiken nu, om den gäller för score-filen."""
+        with self._locked():
+            self._save()
+
+    def close(self) -> None:
+        """Spara resultat som inte sparats än."""
+        if self._unsaved:
+            self.save()
+
+    def _save(self) -> None:
+        """Skriv statistiken atomärt (tmp + rename) med stämpeln den gäller för.
+
+        Är statistiken inaktuell skrivs ingenting, en gammal fil med fel
+        stämpel byggs ändå om av nästa läsare."""
+        if self._stale:
+            return
+        data = {
+            "version": STATS_VERSION,
+            "stamp": self._stamp,
+            "players": {name: p.to_dict() for name, p in self._players.items()},
+        }
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self._unsaved = 0
@@ -0,0 +1,179 @@
+"""Highscorelistor för dagens, veckans och månadens resultat.
+
+ScoreRepository.top rankar bara över all tid. Att filtrera på datum vid
+varje anrop skulle betyda att tolka timestamp för varje sparat resultat.
+
+WindowedLeaderboards håller istället en färdigsorterad lista per
+(svårighetsgrad, fönster), där fönstret är "day", "week" (ISO-vecka)
+eller "month". Ett nytt resultat sorteras in i sin dag, vecka och månad
+när det sparas (add), och top("easy", "day", 10) är bara ett uppslag
+och en slice, oavsett hur lång historiken är. Varje lista hålls till de
+size bästa, så minnet växer inte heller.
+
+När dagen (veckan, månaden) är slut kastas dess lista vid nästa anrop.
+Resultaten finns kvar i veckans och månadens listor och i listan för all
+tid, som fortfarande kommer från ScoreRepository.top.
+
+Listorna byggs första gången de behövs med en genomläsning av
+iter_records. Bara timestamp-strängens datumdel jämförs, som text, så
+gamla resultat kostar nästan ingenting. Som i ScoreStats sparas score-
+filens stämpel (file_stamp) med listorna. top jämför den med filen och
+bygger om allt om någon annan har skrivit till den, t.ex. ett annat
+program eller en import.
+"""
+
+from __future__ import annotations
+from typing import Any, Callable
+
+import bisect
+import threading
+from datetime import date, timedelta
+
+from main import ScoreRepository, file_stamp, score_key
+
+WINDOWS = ("day", "week", "month")
+
+
+def window_key(window: str, day: date) -> str:
+    """Namnet på fönstret som day ligger i, t.ex. "2025-11-18", "2025-W47" eller "2025-11"."""
+    if window == "day":
+        return day.isoformat()
+    if window == "week":
+        year, week, _ = day.isocalendar()
+        return f"{year}-W{week:02d}"
+    if window == "month":
+        return f"{day.year}-{day.month:02d}"
+    raise ValueError(f"Okänt fönster: {window!r} ({', '.join(WINDOWS)})")
+
+
+def _entry_day(entry: dict[str, Any]) -> date | None:
+    """Datumet i postens timestamp ("YYYY-MM-DD HH:MM:SS"), None om det saknas."""
+    timestamp = entry.get("timestamp")
+    if not isinstance(timestamp, str):
+        return None
+    try:
+        return date.fromisoformat(timestamp[:10])
+    except ValueError:
+        return None
+
+
+class WindowedLeaderboards:
+    """Färdigsorterade highscorelistor per svårighetsgrad och tidsfönster."""
+    def __init__(self, score_repo: ScoreRepository, size: int = 100,
+                 today: Callable[[], date] = date.today) -> None:
+        """Args:
+            score_repo: Repository som resultaten sparas i.
+            size: Antal resultat som sparas per lista (största möjliga limit).
+            today: Ger dagens datum, går att byta ut i tester."""
+        self.score_repo = score_repo
+        self.size = size
+        self.today = today
+        self._day: date | None = None
+        self._current: dict[str, str] = {}
+        # (svårighetsgrad, fönster) -> (nycklar, poster), sorterade som top
+        self._boards: dict[tuple[str, str], tuple[list[tuple[float, float]], list[dict[str, Any]]]] = {}
+        self._built = False
+        # stämpeln för score-filen som listorna motsvarar
+        self._stamp: list[Any] | None = None
+        # add körs i ScoreWriters tråd, top i gränssnittets
+        self._lock = threading.Lock()
+
+    def _roll(self) -> None:
+        """Byt till nya fönster om dagen har gått, de gamla listorna kastas."""
+        day = self.today()
+        if day == self._day:
+            return
+        current = {window: window_key(window, day) for window in WINDOWS}
+        expired = {window for window in WINDOWS if current[window] != self._current.get(window)}
+        self._boards = {k: v for k, v in self._boards.items() if k[1] not in expired}
+        self._day, self._current = day, current
+
+    def _insert(self, entry: dict[str, Any], day: date) -> None:
+        for window in WINDOWS:
+            if window_key(window, day) != self._current[window]:
+                continue
+            keys, records = self._boards.setdefault((entry.get("difficulty"), window), ([], []))
+            key = score_key(entry)
+            # bisect_right: nyare poster sorteras efter äldre med samma resultat
+            pos = bisect.bisect_right(keys, key)
+            if pos >= self.size:
+                continue
+            keys.insert(pos, key)
+            records.insert(pos, entry)
+            if len(records) > self.size:
+                keys.pop()
+                records.pop()
+
+    def add(self, entry: dict[str, Any],
+            stamps: tuple[list[Any] | None, list[Any] | None] | None = None) -> None:
+        """Sortera in ett resultat som just sparats med score_repo.append.
+
+        Ej färdiga spel och resultat utanför de aktuella fönstren hoppas
+        över. Innan listorna byggts gör add ingenting, genomläsningen får
+        med resultatet ändå.
+
+        Args:
+            entry: Det sparade resultatet.
+            stamps: Score-filens stämpel före och efter append, som
+                ScoreStats.append returnerar. Var filen oförändrad sedan
+                listorna byggdes gäller de fortfarande efter append. Utan
+                stämplar byggs listorna om vid nästa top om filen ändrats."""
+        with self._lock:
+            if not self._built:
+                return
+            if stamps is not None and stamps[0] == self._stamp:
+                self._stamp = stamps[1]
+            day = _entry_day(entry)
+            if not entry.get("finished") or day is None:
+                return
+            self._roll()
+            self._insert(entry, day)
+
+    def rebuild(self) -> None:
+        """Bygg alla listor med en genomläsning av score-filen.
+
+        Raises:
+            ValueError: Om score-filen är korrupt."""
+        with self._lock:
+            self._rebuild()
+
+    def _rebuild(self) -> None:
+        # stämpeln före läsningen: ändras filen under tiden byggs det om igen
+        self._stamp = file_stamp(self.score_repo.path)
+        self._day = None
+        self._roll()
+        day = self._day
+        # tidigaste dagen som kan ligga i något aktuellt fönster
+        first = min(day - timedelta(days=day.weekday()), day.replace(day=1)).isoformat()
+        self._boards = {}
+        for entry in self.score_repo.iter_records(finished=True):
+            timestamp = entry.get("timestamp")
+            if not isinstance(timestamp, str) or timestamp[:10] < first:
+                continue
+            entry_day = _entry_day(entry)
+            if entry_day is not None:
+                self._insert(entry, entry_day)
+        self._built = True
+
+    def top(self, difficulty: str, window: str = "day", limit: int | None = 10) -> list[dict[str, Any]]:
+        """De bästa resultaten i det aktuella fönstret, O(limit).
+
+        Args:
+            difficulty: Svårighetsgrad att filtrera på.
+            window: "day", "week" eller "month".
+            limit: Max antal resultat (högst size, None = size).
+
+        Raises:
+            ValueError: Om svårighetsgraden eller fönstret inte finns, eller
+                limit är större än size."""
+        self.score_repo._check_difficulty(difficulty)
+        if window not in WINDOWS:
+            raise ValueError(f"Okänt fönster: {window!r} ({', '.join(WINDOWS)})")
+        if limit is not None and limit > self.size:
+            raise ValueError(f"limit får vara högst {self.size}")
+        with self._lock:
+            if not self._built or file_stamp(self.score_repo.path) != self._stamp:
+                self._rebuild()
+            self._roll()
+            _, records = self._boards.get((difficulty, window), ((), []))
+            return records[:limit]
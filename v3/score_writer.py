@@ -0,0 +1,110 @@
+"""Sparar score-poster i en bakgrundstråd.
+
+ScoreRepository.append läser om och skriver hela score-filen, vilket tar
+tid när historiken är stor. ScoreWriter lägger skrivningarna i en kö som
+en egen tråd betar av, så att gränssnittet aldrig väntar på disken.
+
+Placeringen på highscorelistan räknas ut i tråden med
+ScoreRepository.rank_of, som för JSONL och SQLite använder färdiga index
+istället för att läsa hela filen igen.
+
+Med en ScoreStats räknas varje sparad post också in i statistiken per
+spelare, och med WindowedLeaderboards i dagens, veckans och månadens
+listor, i samma tråd.
+
+Callbacks körs aldrig i skrivtråden. De samlas i en kö och körs när
+poll() anropas, t.ex. från Tk med after(), så de alltid körs i samma
+tråd som gränssnittet.
+"""
+
+from __future__ import annotations
+from typing import Any, Callable
+
+import queue
+import threading
+
+from main import ScoreRepository, file_stamp
+from score_stats import ScoreStats
+from score_windows import WindowedLeaderboards
+
+ScoreCallback = Callable[[dict[str, Any], int | None, Exception | None], None]
+"""Anropas med (post, placering, fel). Vid fel är placering None."""
+
+
+class ScoreWriter:
+    """Skrivtråd för ett ScoreRepository."""
+    def __init__(self, score_repo: ScoreRepository, stats: ScoreStats | None = None,
+                 leaderboards: WindowedLeaderboards | None = None) -> None:
+        """Startar skrivtråden.
+
+        Args:
+            score_repo: Repository som posterna sparas i.
+            stats: Statistik per spelare som uppdateras efter varje post.
+            leaderboards: Listor per dag/vecka/månad som uppdateras efter varje post."""
+        self.score_repo = score_repo
+        self.stats = stats
+        self.leaderboards = leaderboards
+        self._jobs: queue.Queue = queue.Queue()
+        self._done: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="score-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, entry: dict[str, Any], on_done: ScoreCallback | None = None) -> None:
+        """Lägg en post i skrivkön, returnerar direkt.
+
+        Args:
+            entry: Score-posten som ska sparas.
+            on_done: Körs från poll() när posten är sparad (eller misslyckades).
+
+        Raises:
+            ValueError: Om skrivaren redan är stängd."""
+        if not self._thread.is_alive():
+            raise ValueError("ScoreWriter är stängd")
+        self._jobs.put((entry, on_done))
+
+    def _run(self) -> None:
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            entry, on_done = job
+            try:
+                if self.stats is not None:
+                    # sparar via statistiken så den kan jämföra filen före och efter
+                    stamps = self.stats.append(entry)
+                else:
+                    before = file_stamp(self.score_repo.path)
+                    self.score_repo.append(entry)
+                    stamps = before, file_stamp(self.score_repo.path)
+                if self.leaderboards is not None:
+                    self.leaderboards.add(entry, stamps)
+                rank = self.score_repo.rank_of(entry).position
+                self._done.put((on_done, entry, rank, None))
+            except Exception as e:
+                # alla fel går tillbaka till den som skickade posten, tråden
+                # måste leva vidare så nästa submit fungerar
+                self._done.put((on_done, entry, None, e))
+
+    def poll(self) -> int:
+        """Kör callbacks för färdiga jobb i den anropande tråden.
+
+        Returns:
+            Antal jobb som blev klara sedan förra anropet."""
+        count = 0
+        while True:
+            try:
+                on_done, entry, rank, error = self._done.get_nowait()
+            except queue.Empty:
+                return count
+            count += 1
+            if on_done is not None:
+                on_done(entry, rank, error)
+
+    def close(self, timeout: float | None = None) -> None:
+        """Skriv klart det som ligger i kön och stoppa tråden.
+
+        Callbacks för de sista jobben körs inte, anropa poll() efteråt
+        om de behövs."""
+        if self._thread.is_alive():
+            self._jobs.put(None)
+            self._thread.join(timeout)
@@ -0,0 +1,817 @@
+"""Andra sätt att lagra highscores än JSON-listan i main.py.
+
+JsonlScoreRepository
+    En loggfil med en JSON-post per rad (JSON Lines).
+SqliteScoreRepository
+    En SQLite-databas, för historik med hundratusentals resultat.
+
+ScoreRepository i main.py sparar allt som en JSON-lista och skriver om
+hela filen vid varje nytt resultat. JsonlScoreRepository har samma
+gränssnitt (load/append/top) men append skriver bara en rad i slutet av
+filen med O_APPEND, och load läser filen rad för rad.
+
+Om programmet dör mitt i en skrivning kan sista raden bli halv. En sådan
+rad (utan radbrytning på slutet) hoppas över vid läsning och skärs bort
+vid nästa append.
+
+Skrivningar låses med flock (main.file_lock) så flera program kan dela
+samma fil, och varje append väntar på fsync innan den returnerar. Med
+group_commit samlas append från flera trådar som kommer inom ett kort
+fönster ihop till en write och en fsync.
+
+Posterna hålls också i ett index i minnet (ScoreIndex) med färdiga spel
+sorterade per svårighetsgrad. Indexet gäller så länge filens (mtime,
+storlek, inode) är oförändrad, append via repositoryt uppdaterar det
+direkt och ändrar någon annan filen läses den om vid nästa anrop.
+
+SqliteScoreRepository lagrar varje post som JSON i en tabell, med de
+fält som sorteras och filtreras på som egna indexerade kolumner.
+Databasen körs i WAL-läge så läsare inte blockeras av en skrivning, och
+top skickar med limit till SQL.
+
+open_score_repository väljer lagring efter filändelsen på
+Settings.score_file och flyttar över gamla resultat från score.json
+första gången en ny fil används. Spelet använder APP_SCORE_FILE
+(score.jsonl), Settings själv har kvar score.json eftersom den vanliga
+ScoreRepository alltid skriver en JSON-lista.
+
+Resultat flyttas mellan installationer med ScoreRepository.export och
+bulk_append, som läser och skriver JSON Lines eller CSV en post i taget
+(read_scores här, write_scores i main så att export inte behöver den här
+modulen).
+
+Körs från terminalen för att flytta över resultat manuellt, formatet
+väljs efter filändelsen på målfilen:
+    python scores.py data/score.json data/score.jsonl
+    python scores.py data/score.jsonl data/score.sqlite
+    python scores.py data/score.json data/score.bin
+    python scores.py data/score.json data/score.segments
+    python scores.py data/score.jsonl export.csv
+    python scores.py --merge export.csv data/score.jsonl
+"""
+
+from __future__ import annotations
+from typing import IO, Any, Iterable, Iterator
+
+import argparse
+import bisect
+import csv
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from main import (
+    SCORE_CSV_FIELDS, ScoreRank, ScoreRepository, Settings, encode_record, file_lock,
+    record_matches, score_format, score_key, write_scores,
+)
+
+
+_decode = json.JSONDecoder().decode
+
+
+def read_jsonl(path: str | Path) -> Iterator[dict[str, Any]]:
+    """Läser posterna i en JSON Lines-fil en i taget.
+
+    En halv sista rad (utan radbrytning) från en avbruten skrivning
+    hoppas över. Saknas filen blir det inga poster.
+
+    Raises:
+        ValueError: Om en hel rad inte är ett giltigt JSON-objekt."""
+    path = Path(path)
+    if not path.exists():
+        return
+    with path.open("rb") as f:
+        yield from parse_jsonl(f, path)
+
+
+def parse_jsonl(f: IO[bytes], name: Any = "") -> Iterator[dict[str, Any]]:
+    """Som read_jsonl men från en redan öppnad fil (binärt läge)."""
+    for number, line in enumerate(f, start=1):
+        if not line.strip():
+            continue
+        try:
+            # str direkt till decodern är snabbare än json.loads(bytes)
+            entry = _decode(line.decode("utf-8"))
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            if not line.endswith(b"\n"):
+                return
+            raise ValueError(f"Score filen är korrupt: {name} rad {number}") from e
+        if not isinstance(entry, dict):
+            raise ValueError(f"Score filen är korrupt: {name} rad {number}")
+        yield entry
+
+
+_CSV_TYPES = {"game_id": int, "moves": int, "seed": int, "time": float}
+
+
+def _csv_value(field: str, value: str) -> Any:
+    """Ett CSV-fält tillbaka till rätt typ, går det inte lämnas texten kvar
+    så att valideringen i bulk_append säger vad som är fel."""
+    if field == "finished":
+        return {"true": True, "false": False}.get(value.lower(), value)
+    convert = _CSV_TYPES.get(field)
+    if convert is None:
+        return value
+    try:
+        return convert(value)
+    except ValueError:
+        return value
+
+
+def read_csv(path: str | Path) -> Iterator[dict[str, Any]]:
+    """Läser poster från en CSV-fil med rubrikrad, en i taget.
+
+    Tomma fält tas inte med i posten."""
+    with Path(path).open("r", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            yield {k: _csv_value(k, v) for k, v in row.items() if k and v not in (None, "")}
+
+
+def read_scores(path: str | Path, format: str | None = None) -> Iterator[dict[str, Any]]:
+    """Läser en exportfil (JSON Lines eller CSV) en post i taget.
+
+    Raises:
+        ValueError: Om formatet är okänt eller en rad är korrupt."""
+    if score_format(path, format) == "csv":
+        return read_csv(path)
+    return read_jsonl(path)
+
+
+class ScoreIndex:
+    """Alla poster i minnet, med färdiga spel sorterade per svårighetsgrad.
+
+    Varje bucket har en lista med nycklar (moves, time) och en lista med
+    poster i samma ordning. Lika resultat ligger i den ordning de
+    sparades, som med den stabila sorteringen i ScoreRepository.top."""
+    def __init__(self) -> None:
+        self.records: list[dict[str, Any]] = []
+        self.keys: dict[str, list[tuple[float, float]]] = {}
+        self.buckets: dict[str, list[dict[str, Any]]] = {}
+        self.by_game_id: dict[Any, dict[str, Any]] = {}
+
+    @classmethod
+    def build(cls, records: Iterable[dict[str, Any]]) -> ScoreIndex:
+        """Bygg ett index av många poster på en gång.
+
+        Sorterar varje bucket en gång istället för att sortera in posterna
+        en och en, som vore O(n²) för en stor fil."""
+        index = cls()
+        index.records = list(records)
+        for entry in index.records:
+            index.by_game_id[entry.get("game_id")] = entry
+            if entry.get("finished"):
+                index.buckets.setdefault(entry.get("difficulty"), []).append(entry)
+        for difficulty, bucket in index.buckets.items():
+            bucket.sort(key=score_key)
+            index.keys[difficulty] = list(map(score_key, bucket))
+        return index
+
+    def add(self, entry: dict[str, Any]) -> None:
+        """Lägg till en post (sist i filordning)."""
+        self.records.append(entry)
+        self.by_game_id[entry.get("game_id")] = entry
+        if not entry.get("finished"):
+            return
+        difficulty = entry.get("difficulty")
+        keys = self.keys.setdefault(difficulty, [])
+        key = score_key(entry)
+        # bisect_right: nyare poster sorteras efter äldre med samma resultat
+        pos = bisect.bisect_right(keys, key)
+        keys.insert(pos, key)
+        self.buckets.setdefault(difficulty, []).insert(pos, entry)
+
+    def top(self, difficulty: str, limit: int | None = None) -> list[dict[str, Any]]:
+        """De bästa färdiga spelen för en svårighetsgrad, redan sorterade."""
+        bucket = self.buckets.get(difficulty, [])
+        return bucket[:] if limit is None else bucket[:limit]
+
+    def rank(self, entry: dict[str, Any], neighbours: int = 0) -> ScoreRank:
+        """Placering för entry med bisect i dess bucket, se ScoreRank.locate."""
+        difficulty = entry.get("difficulty")
+        return ScoreRank.locate(self.buckets.get(difficulty, []),
+                                self.keys.get(difficulty, []), entry, neighbours)
+
+
+class _Batch:
+    """Poster som väntar på samma skrivning i group commit."""
+    def __init__(self) -> None:
+        self.entries: list[dict[str, Any]] = []
+        self.done = False
+        self.error: BaseException | None = None
+
+
+class JsonlScoreRepository(ScoreRepository):
+    """Lagrar highscores som JSON Lines, en post per rad."""
+    def __init__(self, settings: Settings,
+                 base_path: str | Path | None = None,
+                 filename: str | None = None,
+                 fsync: bool = True,
+                 group_commit: float = 0.0
+                 ) -> None:
+        """Se ScoreRepository.
+
+        Args:
+            fsync: Vänta tills posten ligger på disken innan append returnerar.
+            group_commit: Fönster i sekunder. Är det > 0 väntar första
+                append så länge och skriver sedan alla poster som kommit
+                under tiden (från andra trådar) med en write och en fsync."""
+        super().__init__(settings, base_path, filename)
+        self.fsync = fsync
+        self.group_commit = group_commit
+        self._index: ScoreIndex | None = None
+        self._stamp: tuple[int, int, int] | None = None
+        # skyddar _index/_stamp när flera trådar använder repositoryt
+        self._lock = threading.Lock()
+        self._batch_cond = threading.Condition()
+        self._batch: _Batch | None = None
+
+    def _file_stamp(self) -> tuple[int, int, int] | None:
+        """(mtime i ns, storlek, inode) för filen, None om den saknas."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def index(self) -> ScoreIndex:
+        """Index över filen, läses om bara om filen har ändrats sedan sist.
+
+        Raises:
+            ValueError: Om en rad i filen inte är giltig JSON."""
+        with self._lock:
+            stamp = self._file_stamp()
+            if self._index is None or stamp != self._stamp:
+                self._index, self._stamp = ScoreIndex.build(read_jsonl(self.path)), stamp
+            return self._index
+
+    def load(self) -> list[dict[str, Any]]:
+        """Läs in alla sparade resultat.
+
+        Returns:
+            En lista med dictar, tom om filen saknas eller är tom.
+
+        Raises:
+            ValueError: Om en rad i filen inte är giltig JSON."""
+        return list(self.index().records)
+
+    def iter_records(self, difficulty: str | None = None,
+                     finished: bool | None = None) -> Iterator[dict[str, Any]]:
+        """Läs sparade resultat ett i taget direkt från filen.
+
+        Indexet byggs inte, så minnet är detsamma oavsett filens storlek.
+
+        Args:
+            difficulty: Bara poster med den svårighetsgraden (None = alla).
+            finished: Bara färdiga (True) eller ej färdiga (False) spel (None = alla).
+
+        Raises:
+            ValueError: Om en rad i filen inte är giltig JSON."""
+        for entry in read_jsonl(self.path):
+            if record_matches(entry, difficulty, finished):
+                yield entry
+
+    def append(self, entry: dict[str, Any]) -> None:
+        """Lägg till ett nytt resultat sist i filen.
+
+        Posten skrivs med ett enda write-anrop på en fil öppnad med
+        O_APPEND, så filen skrivs aldrig om. Med group_commit kan posten
+        skrivas ihop med andra trådars poster, append returnerar först
+        när den gemensamma skrivningen är klar.
+
+        Args:
+            entry: En dict med information om resultatet (t.ex. moves, time, difficulty).
+
+        Raises:
+            OSError: Om raden inte kunde skrivas hel."""
+        if self.group_commit <= 0:
+            self._write_batch([entry])
+            return
+
+        with self._batch_cond:
+            batch = self._batch
+            leader = batch is None
+            if leader:
+                batch = self._batch = _Batch()
+            batch.entries.append(entry)
+            if not leader:
+                while not batch.done:
+                    self._batch_cond.wait()
+                if batch.error is not None:
+                    raise batch.error
+                return
+
+        # första tråden i fönstret väntar in de andra och skriver allt
+        time.sleep(self.group_commit)
+        with self._batch_cond:
+            self._batch = None
+        try:
+            self._write_batch(batch.entries)
+        except BaseException as e:
+            batch.error = e
+            raise
+        finally:
+            with self._batch_cond:
+                batch.done = True
+                self._batch_cond.notify_all()
+
+    def bulk_append(self, entries: Iterable[dict[str, Any]]) -> int:
+        """Lägg till många resultat med en enda write och fsync.
+
+        Som ScoreRepository.bulk_append, dubbletter letas upp i indexet.
+
+        Returns:
+            Antal poster som lades till.
+
+        Raises:
+            ValueError: Om en post är ogiltig eller filen är korrupt."""
+        batch = self._prepare_batch(entries)
+        saved = self.index().by_game_id
+        new = [e for e in batch if e.get("game_id") not in saved]
+        if new:
+            self._write_batch(new)
+        return len(new)
+
+    def _write_batch(self, entries: list[dict[str, Any]]) -> None:
+        """Skriv poster med en write (och en fsync) under fillåset."""
+        data = b"".join(encode_record(entry) for entry in entries)
+        fd = os.open(self.path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            with file_lock(fd):
+                before = os.fstat(fd)
+                repaired = self._drop_torn_tail(fd)
+                written = os.write(fd, data)
+                if written != len(data):
+                    raise OSError(f"Kunde bara skriva {written} av {len(data)} byte till {self.path}")
+                if self.fsync:
+                    os.fsync(fd)
+                after = os.fstat(fd)
+        finally:
+            os.close(fd)
+
+        # Uppdatera indexet direkt om det motsvarade filen precis före
+        # skrivningen, annars läses filen om vid nästa anrop
+        with self._lock:
+            if (self._index is not None and not repaired and
+                    self._stamp == (before.st_mtime_ns, before.st_size, before.st_ino)):
+                for entry in entries:
+                    self._index.add(entry)
+                self._stamp = (after.st_mtime_ns, after.st_size, after.st_ino)
+            else:
+                self._index = None
+
+    def top(self, difficulty: str, limit: int | None = None) -> list[dict[str, Any]]:
+        """Returnera de bästa resultaten för en viss svårighetsgrad.
+
+        Samma resultat som ScoreRepository.top, men från indexet i minnet.
+
+        Args:
+            difficulty: Svårighetsgrad att filtrera på.
+            limit: Max antal resultat att returnera (None = alla).
+
+        Raises:
+            ValueError: Om svårighetsgraden inte är tillåten."""
+        self._check_difficulty(difficulty)
+        return self.index().top(difficulty, limit)
+
+    def rank_of(self, entry: dict[str, Any], neighbours: int = 0) -> ScoreRank:
+        """Placering på highscorelistan, O(log n) med bisect i indexet.
+
+        Args:
+            entry: Sparad eller ny score-post.
+            neighbours: Antal poster före och efter att returnera.
+
+        Raises:
+            ValueError: Om svårighetsgraden inte är tillåten."""
+        self._check_difficulty(entry.get("difficulty"))
+        return self.index().rank(entry, neighbours)
+
+    def rank_of_game_id(self, game_id: int, neighbours: int = 0) -> ScoreRank | None:
+        """Som rank_of för den sparade posten med game_id, None om den inte finns."""
+        index = self.index()
+        entry = index.by_game_id.get(game_id)
+        if entry is None:
+            return None
+        return index.rank(entry, neighbours)
+
+    def _drop_torn_tail(self, fd: int) -> bool:
+        """Skär bort en halv sista rad så nästa post hamnar på en egen rad.
+
+        Är sista raden hel men saknar bara radbrytning (t.ex. handredigerad)
+        läggs radbrytningen till istället.
+
+        Returns:
+            True om filen behövde lagas."""
+        end = os.lseek(fd, 0, os.SEEK_END)
+        if end == 0 or os.pread(fd, 1, end - 1) == b"\n":
+            return False
+        # leta bakåt efter början på sista raden
+        line_start = 0
+        pos = end
+        while pos > 0:
+            start = max(0, pos - 4096)
+            newline = os.pread(fd, pos - start, start).rfind(b"\n")
+            if newline != -1:
+                line_start = start + newline + 1
+                break
+            pos = start
+
+        try:
+            json.loads(os.pread(fd, end - line_start, line_start))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            os.ftruncate(fd, line_start)
+        else:
+            os.write(fd, b"\n")
+        return True
+
+
+class SqliteScoreRepository(ScoreRepository):
+    """Lagrar highscores i en SQLite-databas.
+
+    Varje tråd får en egen anslutning, så repositoryt kan användas från
+    t.ex. ScoreWriter och gränssnittet samtidigt."""
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS scores (
+            id INTEGER PRIMARY KEY,
+            game_id INTEGER,
+            user_name TEXT,
+            difficulty TEXT,
+            finished INTEGER NOT NULL,
+            moves INTEGER,
+            time REAL,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS scores_top
+            ON scores (difficulty, finished, moves, time);
+        CREATE INDEX IF NOT EXISTS scores_game_id ON scores (game_id);
+        CREATE INDEX IF NOT EXISTS scores_user_name ON scores (user_name);
+    """
+    INSERT = ("INSERT INTO scores (game_id, user_name, difficulty, finished, moves, time, data) "
+              "VALUES (?, ?, ?, ?, ?, ?, ?)")
+
+    def __init__(self, settings: Settings,
+                 base_path: str | Path | None = None,
+                 filename: str | None = None
+                 ) -> None:
+        """Se ScoreRepository. Skapar databasen och tabellen om de saknas."""
+        super().__init__(settings, base_path, filename)
+        self._local = threading.local()
+        self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Anslutningen för den här tråden."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # i WAL-läge räcker NORMAL för att databasen aldrig blir korrupt
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(self.SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _row(entry: dict[str, Any]) -> tuple:
+        return (entry.get("game_id"), entry.get("user_name"), entry.get("difficulty"),
+                1 if entry.get("finished") else 0, entry.get("moves"), entry.get("time"),
+                json.dumps(entry, ensure_ascii=False))
+
+    def load(self) -> list[dict[str, Any]]:
+        """Läs in alla sparade resultat i den ordning de sparades."""
+        rows = self._connect().execute("SELECT data FROM scores ORDER BY id")
+        return [json.loads(data) for (data,) in rows]
+
+    def iter_records(self, difficulty: str | None = None,
+                     finished: bool | None = None) -> Iterator[dict[str, Any]]:
+        """Läs sparade resultat ett i taget, filtren görs i SQL.
+
+        Args:
+            difficulty: Bara poster med den svårighetsgraden (None = alla).
+            finished: Bara färdiga (True) eller ej färdiga (False) spel (None = alla)."""
+        where, params = [], []
+        if difficulty is not None:
+            where.append("difficulty = ?")
+            params.append(difficulty)
+        if finished is not None:
+            where.append("finished = ?")
+            params.append(1 if finished else 0)
+        sql = "SELECT data FROM scores"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        for (data,) in self._connect().execute(sql + " ORDER BY id", params):
+            yield json.loads(data)
+
+    def append(self, entry: dict[str, Any]) -> None:
+        """Lägg till ett nytt resultat.
+
+        Args:
+            entry: En dict med information om resultatet (t.ex. moves, time, difficulty)."""
+        with self._connect() as conn:
+            conn.execute(self.INSERT, self._row(entry))
+
+    def bulk_append(self, entries: Iterable[dict[str, Any]]) -> int:
+        """Lägg till många resultat i en enda transaktion.
+
+        Som ScoreRepository.bulk_append, dubbletter letas upp med indexet
+        på game_id inom samma transaktion.
+
+        Returns:
+            Antal poster som lades till.
+
+        Raises:
+            ValueError: Om en post är ogiltig."""
+        batch = self._prepare_batch(entries)
+        conn = self._connect()
+        with conn:
+            # IMMEDIATE: ingen annan hinner spara samma game_id mellan koll och insert
+            conn.execute("BEGIN IMMEDIATE")
+            new = [e for e in batch if conn.execute(
+                "SELECT 1 FROM scores WHERE game_id = ? LIMIT 1", (e.get("game_id"),)).fetchone() is None]
+            conn.executemany(self.INSERT, (self._row(e) for e in new))
+        return len(new)
+
+    def _insert_many(self, records: Iterable[dict[str, Any]]) -> int:
+        """Lägg till många poster i en enda transaktion.
+
+        Returns:
+            Antal poster som lades till."""
+        with self._connect() as conn:
+            cursor = conn.executemany(self.INSERT, (self._row(e) for e in records))
+        return cursor.rowcount
+
+    def top(self, difficulty: str, limit: int | None = None) -> list[dict[str, Any]]:
+        """Returnera de bästa resultaten för en viss svårighetsgrad.
+
+        Sorteringen och limit görs i SQL med indexet på
+        (difficulty, finished, moves, time).
+
+        Args:
+            difficulty: Svårighetsgrad att filtrera på.
+            limit: Max antal resultat att returnera (None = alla).
+
+        Raises:
+            ValueError: Om svårighetsgraden inte är tillåten."""
+        self._check_difficulty(difficulty)
+        rows = self._connect().execute(
+            "SELECT data FROM scores WHERE difficulty = ? AND finished = 1 "
+            "ORDER BY moves, time, id LIMIT ?",
+            (difficulty, -1 if limit is None else limit))
+        return [json.loads(data) for (data,) in rows]
+
+    def rank_of(self, entry: dict[str, Any], neighbours: int = 0) -> ScoreRank:
+        """Placering på highscorelistan, räknad i SQL med indexet.
+
+        Hittas entry i databasen (samma game_id) räknas dess egen plats,
+        annars platsen den skulle få om den sparades nu.
+
+        Args:
+            entry: Sparad eller ny score-post.
+            neighbours: Antal poster före och efter att returnera.
+
+        Raises:
+            ValueError: Om svårighetsgraden inte är tillåten."""
+        difficulty = entry.get("difficulty")
+        self._check_difficulty(difficulty)
+        conn = self._connect()
+        finished = "SELECT {} FROM scores WHERE difficulty = ? AND finished = 1"
+
+        if not entry.get("finished"):
+            (count,) = conn.execute(finished.format("COUNT(*)"), (difficulty,)).fetchone()
+            above = []
+            if neighbours:
+                rows = conn.execute(finished.format("data") + " ORDER BY moves DESC, time DESC, id DESC"
+                                    " LIMIT ?", (difficulty, neighbours))
+                above = [json.loads(data) for (data,) in rows][::-1]
+            return ScoreRank(count + 1, above)
+
+        row = None
+        if entry.get("game_id") is not None:
+            row = conn.execute(
+                "SELECT moves, time, id FROM scores WHERE game_id = ? AND difficulty = ? "
+                "AND finished = 1 ORDER BY id LIMIT 1",
+                (entry["game_id"], difficulty)).fetchone()
+        if row is not None:
+            # sparad post: allt som sorteras före den, lika resultat i id-ordning
+            before, after = "(moves, time, id) < (?, ?, ?)", "(moves, time, id) > (?, ?, ?)"
+            params: tuple = row
+        else:
+            before, after = "(moves, time) <= (?, ?)", "(moves, time) > (?, ?)"
+            params = (entry.get("moves"), entry.get("time"))
+
+        (count,) = conn.execute(finished.format("COUNT(*)") + f" AND {before}",
+                                (difficulty, *params)).fetchone()
+        if not neighbours:
+            return ScoreRank(count + 1)
+        rows = conn.execute(finished.format("data") + f" AND {before} "
+                            "ORDER BY moves DESC, time DESC, id DESC LIMIT ?",
+                            (difficulty, *params, neighbours))
+        above = [json.loads(data) for (data,) in rows][::-1]
+        rows = conn.execute(finished.format("data") + f" AND {after} "
+                            "ORDER BY moves, time, id LIMIT ?",
+                            (difficulty, *params, neighbours))
+        below = [json.loads(data) for (data,) in rows]
+        return ScoreRank(count + 1, above, below)
+
+    def rank_of_game_id(self, game_id: int, neighbours: int = 0) -> ScoreRank | None:
+        """Som rank_of för den sparade posten med game_id, None om den inte finns."""
+        row = self._connect().execute(
+            "SELECT data FROM scores WHERE game_id = ? ORDER BY id LIMIT 1", (game_id,)).fetchone()
+        if row is None:
+            return None
+        return self.rank_of(json.loads(row[0]), neighbours)
+
+    def close(self) -> None:
+        """Stäng anslutningen för den här tråden."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def _read_any(path: Path) -> list[dict[str, Any]]:
+    """Läs alla poster från en score-fil, formatet väljs efter filändelsen."""
+    if path.suffix == ".jsonl":
+        return JsonlScoreRepository(Settings(), path.parent, path.name).load()
+    if path.suffix in SQLITE_SUFFIXES:
+        return SqliteScoreRepository(Settings(), path.parent, path.name).load()
+    return ScoreRepository(Settings(), path.parent, path.name).load()
+
+
+def migrate_json_to_jsonl(source: str | Path, target: str | Path) -> int:
+    """Flytta över resultat från en score.json (lista) till en .jsonl-fil.
+
+    Skriver först till en temporär fil och byter sedan namn, så target
+    antingen saknas eller är komplett. Källfilen lämnas orörd.
+
+    Args:
+        source: Gammal score-fil med en JSON-lista.
+        target: Ny JSON Lines-fil.
+
+    Returns:
+        Antal poster som flyttades.
+
+    Raises:
+        ValueError: Om target redan finns eller source är korrupt."""
+    source, target = Path(source), Path(target)
+    if target.exists():
+        raise ValueError(f"{target} finns redan")
+    records = ScoreRepository(Settings(), source.parent, source.name).load()
+
+    # en egen temporär fil, två program som migrerar samtidigt krockar inte
+    fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=target.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for entry in records:
+                f.write(encode_record(entry))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, target)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    return len(records)
+
+
+def migrate_to_sqlite(source: str | Path, target: str | Path) -> int:
+    """Flytta över resultat från score.json eller .jsonl till en SQLite-databas.
+
+    Alla poster läggs in i en enda transaktion. Databasen byggs under ett
+    temporärt namn och byter namn först när den är klar.
+
+    Args:
+        source: Score-fil (.json, .jsonl eller en annan databas).
+        target: Ny databasfil.
+
+    Returns:
+        Antal poster som flyttades.
+
+    Raises:
+        ValueError: Om target redan finns eller source är korrupt."""
+    source, target = Path(source), Path(target)
+    if target.exists():
+        raise ValueError(f"{target} finns redan")
+    records = _read_any(source)
+
+    fd, name = tempfile.mkstemp(dir=target.parent, prefix=target.name, suffix=".tmp")
+    os.close(fd)
+    tmp = Path(name)
+    repo = SqliteScoreRepository(Settings(), tmp.parent, tmp.name)
+    try:
+        count = repo._insert_many(records)
+        # lämna WAL-läget en kort stund så allt hamnar i själva databasfilen
+        repo._connect().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        repo.close()
+        tmp.replace(target)
+    finally:
+        repo.close()
+        for path in (tmp, Path(f"{tmp}-wal"), Path(f"{tmp}-shm")):
+            path.unlink(missing_ok=True)
+    return count
+
+
+SQLITE_SUFFIXES = {".sqlite", ".sqlite3", ".db"}
+
+APP_SCORE_FILE = "score.jsonl"
+"""Score-filen som spelet använder (Settings har score.json för ScoreRepository)."""
+
+
+@contextmanager
+def _migration_lock(path: Path) -> Iterator[None]:
+    """flock på <path>.migrate.lock medan en ny score-fil skapas.
+
+    Två program som startar samtidigt ser då antingen ingen fil (och
+    migrerar själva) eller en färdig."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(f"{path}.migrate.lock", "a") as f, file_lock(f.fileno()):
+        yield
+
+
+def _migrate_if_missing(path: Path, migrate) -> None:
+    """Kör migrate(gammal fil, path) under låset om path saknas men en äldre fil finns.
+
+    Äldre filer är .jsonl och .json med samma namn, i den ordningen."""
+    with _migration_lock(path):
+        if path.exists():
+            return
+        for old in (path.with_suffix(".jsonl"), path.with_suffix(".json")):
+            if old != path and old.exists():
+                migrate(old, path)
+                return
+
+
+def open_score_repository(settings: Settings) -> ScoreRepository:
+    """Skapa rätt repository för Settings.score_file.
+
+    En fil som slutar på .jsonl ger JsonlScoreRepository, .sqlite/.db
+    ger SqliteScoreRepository, .segments en katalog med
+    SegmentedScoreRepository (se score_segments.py) och .bin en binär
+    fil med BinaryScoreRepository (se score_binary.py). Finns filen inte
+    men en äldre score-fil med samma namn gör det (.json, eller .jsonl
+    för databaser, segment och binärt), flyttas resultaten över först,
+    under ett lås så att två program som startar samtidigt inte båda
+    migrerar. Andra filändelser ger den vanliga ScoreRepository."""
+    path = Path(settings.data_dir) / settings.score_file
+    suffix = path.suffix
+    if suffix == ".jsonl":
+        _migrate_if_missing(path, migrate_json_to_jsonl)
+        return JsonlScoreRepository(settings)
+
+    if suffix == ".segments":
+        # importeras här, score_segments bygger på den här modulen
+        from score_segments import SegmentedScoreRepository, migrate_to_segments
+        _migrate_if_missing(path, lambda old, new: migrate_to_segments(_read_any(old), new))
+        return SegmentedScoreRepository(settings)
+
+    if suffix == ".bin":
+        # importeras här, score_binary bygger på den här modulen
+        from score_binary import BinaryScoreRepository, migrate_to_binary
+        _migrate_if_missing(path, lambda old, new: migrate_to_binary(_read_any(old), new))
+        return BinaryScoreRepository(settings)
+
+    if suffix in SQLITE_SUFFIXES:
+        _migrate_if_missing(path, migrate_to_sqlite)
+        return SqliteScoreRepository(settings)
+
+    return ScoreRepository(settings)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Startpunkt för kommandoraden."""
+    parser = argparse.ArgumentParser(description="Flytta över resultat till ett annat lagringsformat.")
+    parser.add_argument("source", type=Path, help="Gammal score-fil (.json eller .jsonl)")
+    parser.add_argument("target", type=Path,
+                        help="Ny fil, .jsonl, .sqlite/.db, .segments (katalog), .bin eller .csv (export)")
+    parser.add_argument("--merge", action="store_true",
+                        help="Lägg till source (.jsonl eller .csv) i en befintlig score-fil, "
+                             "dubbletter av game_id hoppas över")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.merge:
+            settings = Settings(data_dir=args.target.parent, score_file=args.target.name)
+            count = open_score_repository(settings).bulk_append(read_scores(args.source))
+        elif args.target.suffix == ".csv":
+            count = write_scores(_read_any(args.source), args.target)
+        elif args.target.suffix in SQLITE_SUFFIXES:
+            count = migrate_to_sqlite(args.source, args.target)
+        elif args.target.suffix == ".bin":
+            from score_binary import migrate_to_binary
+            count = migrate_to_binary(_read_any(args.source), args.target)
+        elif args.target.suffix == ".segments":
+            from score_segments import migrate_to_segments
+            count = migrate_to_segments(_read_any(args.source), args.target)
+        elif args.target.suffix == ".jsonl":
+            count = migrate_json_to_jsonl(args.source, args.target)
+        else:
+            parser.error(f"Okänt format för {args.target}, använd .jsonl, .sqlite/.db, .segments, .bin eller .csv")
+    except (OSError, ValueError) as e:
+        parser.exit(1, f"Fel: {e}\n")
+    print(f"Flyttade {count} poster till {args.target}")
+
+
+if __name__ == "__main__":
+    main()
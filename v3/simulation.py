@@ -0,0 +1,598 @@
+"""Headless simulering av Memory-spel med datorspelare.
+
+Modulen låter olika spelarstrategier spela Game utan input() eller Tk,
+genom att anropa Game.flip/Game.resolve direkt. Den används för att mäta
+hur snabb spelmotorn är och hur många drag olika svårighetsgrader kräver.
+
+Strategier:
+    - RandomPlayer: vänder slumpmässiga dolda kort, minns ingenting
+    - PerfectMemoryPlayer: minns alla kort den har sett
+    - ForgetfulPlayer: som ovan men glömmer kort med tiden (avklingande minne)
+
+Körs från terminalen, t.ex:
+    python simulation.py bench --games 500 --strategy perfect
+    python simulation.py simulate --games 1000000 --seed 42 --workers 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+
+from main import (
+    Game, CardState, WordRepository, Settings, new_game
+)
+
+Position = tuple[int, int]
+
+
+class _PositionPool:
+    """Mängd med positioner som stödjer slumpmässigt val i O(1)."""
+    def __init__(self, positions: list[Position] | None = None) -> None:
+        self._items: list[Position] = []
+        self._index: dict[Position, int] = {}
+        for pos in positions or []:
+            self.add(pos)
+
+    def add(self, pos: Position) -> None:
+        if pos not in self._index:
+            self._index[pos] = len(self._items)
+            self._items.append(pos)
+
+    def discard(self, pos: Position) -> None:
+        i = self._index.pop(pos, None)
+        if i is None:
+            return
+        last = self._items.pop()
+        if i < len(self._items):
+            # flytta sista elementet till hålet så att listan förblir tät
+            self._items[i] = last
+            self._index[last] = i
+
+    def choice(self, rng: random.Random, exclude: Position | None = None) -> Position:
+        pos = self._items[rng.randrange(len(self._items))]
+        while pos == exclude:
+            pos = self._items[rng.randrange(len(self._items))]
+        return pos
+
+    def __contains__(self, pos: object) -> bool:
+        return pos in self._index
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class Player:
+    """Basklass för datorspelare.
+
+    Spelaren väljer två kort per drag (pick_first, pick_second), får se
+    värdet på varje kort som vänds (observe) och får veta om draget blev
+    ett par (resolved). Alla val görs bland kort som fortfarande är dolda."""
+    name = "player"
+
+    def __init__(self, seed: int | None = None) -> None:
+        """Args:
+            seed: Seed för spelarens egna slumpval (None = slumpmässigt)."""
+        self.rng = random.Random(seed)
+        self._unseen = _PositionPool()
+
+    def reset(self, game: Game) -> None:
+        """Förbered spelaren för ett nytt spel."""
+        self._unseen = _PositionPool(game.board.hidden_positions())
+
+    def pick_first(self, game: Game) -> Position:
+        """Välj första kortet i ett drag."""
+        return self._unseen.choice(self.rng)
+
+    def pick_second(self, game: Game, first: Position) -> Position:
+        """Välj andra kortet i ett drag, givet det första."""
+        return self._unseen.choice(self.rng, exclude=first)
+
+    def observe(self, pos: Position, value: str) -> None:
+        """Spelaren får se värdet på ett vänt kort."""
+
+    def resolved(self, first: Position, second: Position, matched: bool) -> None:
+        """Spelaren får veta resultatet av ett drag."""
+        if matched:
+            self._unseen.discard(first)
+            self._unseen.discard(second)
+
+
+class RandomPlayer(Player):
+    """Vänder slumpmässiga dolda kort och minns ingenting."""
+    name = "random"
+
+
+class PerfectMemoryPlayer(Player):
+    """Minns värdet på varje kort den har sett.
+
+    Vänder ett känt par om det finns ett, annars ett okänt kort. Andra
+    kortet blir det kända paret till första kortet om det finns, annars
+    ytterligare ett okänt kort."""
+    name = "perfect"
+
+    def __init__(self, seed: int | None = None) -> None:
+        super().__init__(seed)
+        self._known: dict[Position, str] = {}
+        self._by_value: dict[str, set[Position]] = {}
+        self._turn = 0
+
+    def reset(self, game: Game) -> None:
+        super().reset(game)
+        self._known = {}
+        self._by_value = {}
+        self._turn = 0
+
+    def _recall(self, pos: Position) -> bool:
+        """Retunerar True om spelaren fortfarande minns kortet på pos."""
+        return True
+
+    def _forget(self, pos: Position) -> None:
+        value = self._known.pop(pos)
+        positions = self._by_value[value]
+        positions.discard(pos)
+        if not positions:
+            del self._by_value[value]
+        self._unseen.add(pos)
+
+    def _known_partner(self, pos: Position, value: str) -> Position | None:
+        for other in list(self._by_value.get(value, ())):
+            if other != pos and self._recall(other) and self._recall(pos):
+                return other
+        return None
+
+    def pick_first(self, game: Game) -> Position:
+        self._turn += 1
+        for value, positions in list(self._by_value.items()):
+            if len(positions) >= 2:
+                first, *rest = positions
+                for other in rest:
+                    if self._recall(first) and self._recall(other):
+                        return first
+        if len(self._unseen):
+            return self._unseen.choice(self.rng)
+        return next(iter(self._known))
+
+    def pick_second(self, game: Game, first: Position) -> Position:
+        value = self._known.get(first)
+        if value is not None:
+            partner = self._known_partner(first, value)
+            if partner is not None:
+                return partner
+        candidates = len(self._unseen) - (first in self._unseen)
+        if candidates > 0:
+            return self._unseen.choice(self.rng, exclude=first)
+        # alla dolda kort är kända men minnet svek, ta något annat känt kort
+        return next(pos for pos in self._known if pos != first)
+
+    def observe(self, pos: Position, value: str) -> None:
+        if pos not in self._known:
+            self._known[pos] = value
+            self._by_value.setdefault(value, set()).add(pos)
+        self._seen_at(pos)
+        self._unseen.discard(pos)
+
+    def _seen_at(self, pos: Position) -> None:
+        """Kallas när ett kort ses, används av ForgetfulPlayer."""
+
+    def resolved(self, first: Position, second: Position, matched: bool) -> None:
+        super().resolved(first, second, matched)
+        if matched:
+            for pos in (first, second):
+                if pos in self._known:
+                    self._forget(pos)
+                self._unseen.discard(pos)
+
+
+class ForgetfulPlayer(PerfectMemoryPlayer):
+    """Som PerfectMemoryPlayer men minnet klingar av med tiden.
+
+    Sannolikheten att minnas ett kort som sågs för t drag sedan är
+    exp(-decay * t). Ett kort som glöms bort räknas som osett igen.
+    decay=0 ger perfekt minne, stora värden ger nästan ett slumpspel."""
+    name = "forgetful"
+
+    def __init__(self, seed: int | None = None, decay: float = 0.1) -> None:
+        """Args:
+            seed: Seed för spelarens slumpval.
+            decay: Hur snabbt minnet klingar av per drag (≥ 0).
+
+        Raises:
+            ValueError: Om decay är negativ."""
+        if decay < 0:
+            raise ValueError("decay måste vara ≥ 0")
+        super().__init__(seed)
+        self.decay = decay
+        self._last_seen: dict[Position, int] = {}
+
+    def reset(self, game: Game) -> None:
+        super().reset(game)
+        self._last_seen = {}
+
+    def _seen_at(self, pos: Position) -> None:
+        self._last_seen[pos] = self._turn
+
+    def _recall(self, pos: Position) -> bool:
+        if pos not in self._known:
+            return False
+        age = self._turn - self._last_seen.get(pos, self._turn)
+        if age == 0 or self.decay == 0:
+            # inget att glömma, dra inget slumptal så att decay=0 spelar som perfekt minne
+            return True
+        if self.rng.random() < math.exp(-self.decay * age):
+            return True
+        self._forget(pos)
+        return False
+
+
+STRATEGIES: dict[str, type[Player]] = {
+    RandomPlayer.name: RandomPlayer,
+    PerfectMemoryPlayer.name: PerfectMemoryPlayer,
+    ForgetfulPlayer.name: ForgetfulPlayer,
+}
+
+
+def make_player(strategy: str, seed: int | None = None, decay: float = 0.1) -> Player:
+    """Skapa en spelare utifrån strateginamn ('random', 'perfect', 'forgetful').
+
+    Raises:
+        ValueError: Om strategin är okänd."""
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Okänd strategi: {strategy}")
+    if strategy == ForgetfulPlayer.name:
+        return ForgetfulPlayer(seed, decay)
+    return STRATEGIES[strategy](seed)
+
+
+def play(game: Game, player: Player, max_moves: int | None = None,
+         bot_latencies: list[int] | None = None) -> list[int]:
+    """Låt en spelare spela ett startat spel tills det är klart.
+
+    Bara anropen till Game (flip + flip + resolve) tas med i tiden per
+    drag, spelarens val och minne räknas för sig.
+
+    Args:
+        game: Ett Game som väntar på första draget.
+        player: Spelaren som väljer korten.
+        max_moves: Avbryt efter så många drag (None = spela klart).
+        bot_latencies: Fylls med spelarens tid i nanosekunder per drag.
+
+    Returns:
+        Tiden i nanosekunder i Game för varje drag."""
+    board = game.board
+    player.reset(game)
+    latencies: list[int] = []
+    clock = time.perf_counter_ns
+    while not game.is_finished():
+        if max_moves is not None and game.moves >= max_moves:
+            break
+        t0 = clock()
+        first = player.pick_first(game)
+        t1 = clock()
+        game.flip(*first)
+        t2 = clock()
+        player.observe(first, board.get_card(*first).value)
+        second = player.pick_second(game, first)
+        t3 = clock()
+        game.flip(*second)
+        t4 = clock()
+        player.observe(second, board.get_card(*second).value)
+        t5 = clock()
+        game.resolve()
+        t6 = clock()
+        matched = board.get_card(*first).state == CardState.MATCHED
+        player.resolved(first, second, matched)
+        engine = (t2 - t1) + (t4 - t3) + (t6 - t5)
+        latencies.append(engine)
+        if bot_latencies is not None:
+            bot_latencies.append(clock() - t0 - engine)
+    return latencies
+
+
+def percentile(sorted_values: list[int] | list[float], q: float) -> float:
+    """Percentil (närmaste rang) ur en redan sorterad lista, q i [0, 100]."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, math.ceil(q / 100 * len(sorted_values)) - 1)
+    return float(sorted_values[rank])
+
+
+class Histogram:
+    """Strömmande histogram med fasta fack, för miljontals värden.
+
+    Sparar bara antal per fack (plus summa och antal) istället för alla
+    värden, och två histogram med samma fackbredd kan slås ihop. Eftersom
+    sammanslagning bara summerar räknare blir resultatet detsamma oavsett
+    i vilken ordning delresultaten kommer."""
+    def __init__(self, bin_width: float = 1) -> None:
+        """Args:
+            bin_width: Fackbredd, värdet v hamnar i fack floor(v / bin_width)."""
+        self.bin_width = bin_width
+        self.counts: dict[int, int] = {}
+        self.total = 0
+        self.sum = 0.0
+
+    def add(self, value: float) -> None:
+        """Lägg till ett värde."""
+        b = int(value // self.bin_width)
+        self.counts[b] = self.counts.get(b, 0) + 1
+        self.total += 1
+        self.sum += value
+
+    def merge(self, other: Histogram) -> None:
+        """Lägg till alla värden från ett annat histogram (samma fackbredd).
+
+        Raises:
+            ValueError: Om fackbredderna skiljer sig."""
+        if other.bin_width != self.bin_width:
+            raise ValueError("Histogrammen har olika fackbredd")
+        for b, count in other.counts.items():
+            self.counts[b] = self.counts.get(b, 0) + count
+        self.total += other.total
+        self.sum += other.sum
+
+    def mean(self) -> float:
+        return self.sum / self.total if self.total else 0.0
+
+    def percentile(self, q: float) -> float:
+        """Percentil (närmaste rang), som facket värdet ligger i (nedre kant)."""
+        if not self.total:
+            return 0.0
+        rank = max(1, math.ceil(q / 100 * self.total))
+        seen = 0
+        for b in sorted(self.counts):
+            seen += self.counts[b]
+            if seen >= rank:
+                return b * self.bin_width
+        return max(self.counts) * self.bin_width
+
+    def render(self, width: int = 30, fmt: str = ">5") -> list[str]:
+        """Textrader med en stapel per fack."""
+        if not self.counts:
+            return []
+        top = max(self.counts.values())
+        return [f"  {b * self.bin_width:{fmt}} {self.counts[b]:>9} "
+                + "#" * max(1, round(width * self.counts[b] / top))
+                for b in sorted(self.counts)]
+
+
+@dataclass
+class BenchResult:
+    """Resultat från en benchmark för en svårighetsgrad."""
+    difficulty: str
+    games: int
+    seconds: float
+    moves: list[int] = field(default_factory=list)
+    latencies: list[int] = field(default_factory=list)
+    bot_latencies: list[int] = field(default_factory=list)
+
+    @property
+    def games_per_second(self) -> float:
+        return self.games / self.seconds if self.seconds else 0.0
+
+
+def bench(settings: Settings, word_repo: WordRepository, difficulty: str,
+          n_games: int, strategy: str = "perfect", seed: int = 0,
+          decay: float = 0.1) -> BenchResult:
+    """Spela n_games spel med en strategi och mät tid, drag och latens.
+
+    Latensen per drag är tiden i Game, spelarens tid redovisas för sig
+    (bot_latencies). seconds är väggklocka för allt, även new_game.
+    Spel nummer i använder seed + i, så samma argument ger samma spel.
+    Spelaren seedas med player_seed(seed), inte samma ström som spel 0."""
+    player = make_player(strategy, player_seed(seed), decay)
+    result = BenchResult(difficulty, n_games, 0.0)
+    start = time.perf_counter()
+    for i in range(n_games):
+        game = new_game(settings, word_repo, difficulty, seed + i)
+        result.latencies.extend(play(game, player, bot_latencies=result.bot_latencies))
+        result.moves.append(game.moves)
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def print_bench(result: BenchResult) -> None:
+    """Skriv ut ett benchmark-resultat som en liten tabell."""
+    moves = sorted(result.moves)
+    latencies = sorted(result.latencies)
+    bot_latencies = sorted(result.bot_latencies)
+    print(f"\n{result.difficulty.upper():-^48}")
+    print(f"{'Spel':<24}{result.games:>12}")
+    print(f"{'Spel/s':<24}{result.games_per_second:>12.1f}")
+    if not moves:
+        return
+    print(f"{'Drag min/p50/max':<24}{moves[0]:>6}{percentile(moves, 50):>6.0f}{moves[-1]:>6}")
+    print(f"{'Drag medel':<24}{sum(moves) / len(moves):>12.2f}")
+    print(f"{'Latens/drag p50 (µs)':<24}{percentile(latencies, 50) / 1000:>12.2f}")
+    print(f"{'Latens/drag p99 (µs)':<24}{percentile(latencies, 99) / 1000:>12.2f}")
+    print(f"{'Spelare/drag p50 (µs)':<24}{percentile(bot_latencies, 50) / 1000:>12.2f}")
+    print("Dragfördelning:")
+    histogram = Histogram()
+    for m in moves:
+        histogram.add(m)
+    print("\n".join(histogram.render()))
+
+
+def game_seed(master_seed: int, index: int) -> int:
+    """Seed för spel nummer index i en simulering med ett visst huvudseed.
+
+    Beror bara på (master_seed, index), inte på hur spelen delas upp i
+    block eller processer, så en simulering är reproducerbar."""
+    return (master_seed << 32) | index
+
+
+def player_seed(seed: int) -> int:
+    """Seed för spelarens slumpval, härlett från spelets seed.
+
+    Samma seed till spelaren som till new_game skulle ge två identiska
+    Mersenne Twister-strömmar, så spelarens val och kortlekens blandning
+    hänger ihop. Hashen ger en oberoende ström som ändå är reproducerbar."""
+    digest = hashlib.blake2b(f"{seed}:player".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+@dataclass
+class SimulationResult:
+    """Sammanslagna histogram från en simulering av en svårighetsgrad."""
+    difficulty: str
+    moves: Histogram = field(default_factory=Histogram)
+    engine_us: Histogram = field(default_factory=lambda: Histogram(50))
+    seconds: float = 0.0
+
+    def merge(self, other: SimulationResult) -> None:
+        self.moves.merge(other.moves)
+        self.engine_us.merge(other.engine_us)
+
+
+_worker_repos: dict[tuple[str, str], WordRepository] = {}
+
+
+def _worker_word_repo(settings: Settings) -> WordRepository:
+    """WordRepository per process, så ordlistan bara läses in en gång per arbetare."""
+    key = (str(settings.data_dir), settings.words_file)
+    if key not in _worker_repos:
+        _worker_repos[key] = WordRepository(settings)
+    return _worker_repos[key]
+
+
+def simulate_chunk(settings: Settings, difficulty: str, strategy: str, decay: float,
+                   master_seed: int, start: int, count: int) -> SimulationResult:
+    """Spela spelen start .. start+count-1 och returnera deras histogram.
+
+    Körs i en arbetsprocess. Varje spel seedas med game_seed(master_seed, i)
+    och spelarens slumpval med player_seed av det, så resultatet beror inte
+    på blockindelningen."""
+    word_repo = _worker_word_repo(settings)
+    player = make_player(strategy, None, decay)
+    result = SimulationResult(difficulty)
+    for i in range(start, start + count):
+        seed = game_seed(master_seed, i)
+        player.rng.seed(player_seed(seed))
+        game = new_game(settings, word_repo, difficulty, seed)
+        # bara tiden i Game, inte spelarens val
+        result.engine_us.add(sum(play(game, player)) / 1000)
+        result.moves.add(game.moves)
+    return result
+
+
+def simulate(settings: Settings, difficulty: str, n_games: int,
+             strategy: str = "perfect", master_seed: int = 0, decay: float = 0.1,
+             workers: int | None = None, chunk_size: int = 1000) -> SimulationResult:
+    """Monte Carlo-skattning av dragfördelningen för en svårighetsgrad.
+
+    Spelen delas upp i block om chunk_size som körs i en ProcessPoolExecutor.
+    Varje block returnerar bara histogram, som slås ihop allteftersom
+    blocken blir klara. Dragfördelningen är deterministisk för ett givet
+    master_seed oavsett antal processer; motortiden (engine_us) är väggklocka.
+
+    Args:
+        settings: Inställningar (skickas till arbetsprocesserna).
+        difficulty: Svårighetsgrad att simulera.
+        n_games: Totalt antal spel.
+        strategy: Spelarstrategi, se STRATEGIES.
+        master_seed: Huvudseed som alla spelseeds härleds från.
+        decay: Avklingning för 'forgetful'.
+        workers: Antal processer (None = antal kärnor, 0 = kör i denna process).
+        chunk_size: Antal spel per block.
+
+    Raises:
+        ValueError: Om svårighetsgraden eller strategin är okänd."""
+    if difficulty not in settings.difficulties:
+        raise ValueError(f"Ogiltig svårighetsgrad: {difficulty}")
+    make_player(strategy, None, decay)  # validerar strategin innan processerna startas
+
+    chunks = [(start, min(chunk_size, n_games - start))
+              for start in range(0, n_games, chunk_size)]
+    result = SimulationResult(difficulty)
+    t0 = time.perf_counter()
+    if workers == 0:
+        for start, count in chunks:
+            result.merge(simulate_chunk(settings, difficulty, strategy, decay,
+                                        master_seed, start, count))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(simulate_chunk, settings, difficulty, strategy,
+                                   decay, master_seed, start, count)
+                       for start, count in chunks]
+            for future in as_completed(futures):
+                result.merge(future.result())
+    result.seconds = time.perf_counter() - t0
+    return result
+
+
+def print_simulation(result: SimulationResult) -> None:
+    """Skriv ut resultatet från en simulering."""
+    moves = result.moves
+    games_per_second = moves.total / result.seconds if result.seconds else 0.0
+    print(f"\n{result.difficulty.upper():-^48}")
+    print(f"{'Spel':<24}{moves.total:>12}")
+    print(f"{'Spel/s':<24}{games_per_second:>12.1f}")
+    print(f"{'Förväntade drag':<24}{moves.mean():>12.3f}")
+    print(f"{'Drag p50/p90/p99':<24}{moves.percentile(50):>6.0f}"
+          f"{moves.percentile(90):>6.0f}{moves.percentile(99):>6.0f}")
+    print(f"{'Motortid/spel p50 (µs)':<24}{result.engine_us.percentile(50):>12.0f}")
+    print(f"{'Motortid/spel p99 (µs)':<24}{result.engine_us.percentile(99):>12.0f}")
+    print("Dragfördelning:")
+    print("\n".join(moves.render()))
+
+
+def positive_int(text: str) -> int:
+    """argparse-typ för heltal större än noll."""
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"måste vara minst 1: {text}")
+    return value
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Bygg argumentparsern för kommandoraden."""
+    parser = argparse.ArgumentParser(description="Headless simulering av Memory.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    bench_parser = sub.add_parser("bench", help="Mät spel/s och latens per drag")
+    bench_parser.add_argument("--games", type=positive_int, default=200, help="Antal spel per svårighetsgrad")
+    bench_parser.add_argument("--strategy", choices=sorted(STRATEGIES), default="perfect")
+    bench_parser.add_argument("--decay", type=float, default=0.1, help="Avklingning för 'forgetful'")
+    bench_parser.add_argument("--seed", type=int, default=0)
+    bench_parser.add_argument("--difficulty", nargs="*", help="Svårighetsgrader (default: alla)")
+
+    sim_parser = sub.add_parser("simulate", help="Monte Carlo över många spel i flera processer")
+    sim_parser.add_argument("--games", type=positive_int, default=100_000, help="Antal spel per svårighetsgrad")
+    sim_parser.add_argument("--strategy", choices=sorted(STRATEGIES), default="perfect")
+    sim_parser.add_argument("--decay", type=float, default=0.1, help="Avklingning för 'forgetful'")
+    sim_parser.add_argument("--seed", type=int, default=0, help="Huvudseed")
+    sim_parser.add_argument("--workers", type=int, default=None, help="Antal processer (default: alla kärnor)")
+    sim_parser.add_argument("--chunk", type=positive_int, default=1000, help="Spel per block")
+    sim_parser.add_argument("--difficulty", nargs="*", help="Svårighetsgrader (default: alla)")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Startpunkt för kommandoraden."""
+    args = build_parser().parse_args(argv)
+    settings = Settings()
+    word_repo = WordRepository(settings)
+    difficulties = args.difficulty or list(settings.difficulties)
+
+    if args.command == "bench":
+        print(f"Strategi: {args.strategy}, {args.games} spel per svårighetsgrad")
+        for difficulty in difficulties:
+            result = bench(settings, word_repo, difficulty, args.games,
+                           args.strategy, args.seed, args.decay)
+            print_bench(result)
+
+    elif args.command == "simulate":
+        print(f"Strategi: {args.strategy}, {args.games} spel per svårighetsgrad, seed {args.seed}")
+        for difficulty in difficulties:
+            sim = simulate(settings, difficulty, args.games, args.strategy, args.seed,
+                           args.decay, args.workers, args.chunk)
+            print_simulation(sim)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Differentiell utskrift av brädet i terminalen med ANSI-koder.
+
+Istället för att rensa skärmen med ett skalkommando (os.system("clear"))
+och skriva ut hela brädet efter varje drag ritar TerminalRenderer brädet
+en gång och flyttar sedan bara markören till de kort som har ändrats.
+Under brädet finns ett område för frågor och meddelanden som töms vid
+varje uppdatering.
+
+Om stdout inte är en terminal (t.ex. omdirigerad till fil eller pipe)
+skrivs hela brädet ut som vanlig text varje gång, utan escape-koder.
+Samma sak gäller när brädet inte får plats i terminalfönstret: då skulle
+markörpositionerna hamna fel när terminalen radbryter eller rullar.
+Meddelanden som skrivs med message kan också få terminalen att rulla,
+så efter ett meddelande ritas hela brädet om vid nästa draw.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import sys
+from typing import Callable, TextIO
+
+from main import Board
+
+CLEAR_SCREEN = "\x1b[H\x1b[2J"
+CLEAR_BELOW = "\x1b[J"
+
+
+def move_to(line: int, column: int) -> str:
+    """ANSI-kod som flyttar markören till (line, column), båda 0-baserade."""
+    return f"\x1b[{line + 1};{column + 1}H"
+
+
+def supports_ansi(stream: TextIO) -> bool:
+    """Retunerar True om stream är en terminal som förstår ANSI-koder.
+
+    På Windows krävs en terminal som säger att den klarar det
+    (Windows Terminal eller ANSICON), annars används vanlig utskrift."""
+    if not hasattr(stream, "isatty") or not stream.isatty():
+        return False
+    if os.environ.get("TERM") == "dumb":
+        return False
+    if os.name == "nt":
+        return "WT_SESSION" in os.environ or "ANSICON" in os.environ
+    return True
+
+
+class TerminalRenderer:
+    """Ritar ett Board i terminalen och uppdaterar bara ändrade kort.
+
+    Första draw för en bräda (eller efter create_board) rensar skärmen och
+    skriver hela brädet. Senare anrop frågar brädan vilka kort som bytt
+    tillstånd (Board.changes_since) och skriver bara om de cellerna."""
+    def __init__(self, stream: TextIO | None = None, ansi: bool | None = None,
+                 terminal_size: Callable[[], os.terminal_size] = shutil.get_terminal_size) -> None:
+        """Args:
+            stream: Var utskriften hamnar (default: sys.stdout).
+            ansi: Tvinga på/av ANSI-läge (default: supports_ansi(stream)).
+            terminal_size: Ger terminalens storlek, går att byta ut i tester."""
+        self.stream = stream or sys.stdout
+        self.ansi = supports_ansi(self.stream) if ansi is None else ansi
+        self.terminal_size = terminal_size
+        self._board: Board | None = None
+        self._generation = -1
+        self._cursor = 0
+        # bredden på brädet som det ritades senast
+        self._width = 0
+
+    def clear(self) -> None:
+        """Rensa skärmen, nästa draw ritar hela brädet igen."""
+        self._board = None
+        if self.ansi:
+            self.stream.write(CLEAR_SCREEN)
+            self.stream.flush()
+
+    def draw(self, board: Board) -> None:
+        """Visa brädet och töm meddelandeområdet under det.
+
+        Efter anropet står markören på första raden under brädet, så
+        input() och print() hamnar där. Får brädet inte plats i
+        terminalen skrivs det ut som vanlig text, som utan ANSI."""
+        if not self.ansi:
+            print(board, file=self.stream)
+            return
+
+        if board is not self._board or board.generation != self._generation:
+            text = str(board)
+            self._width = max(map(len, text.splitlines()), default=0)
+            if not self._fits(board):
+                self._plain(text)
+                return
+            self._full_redraw(board, text)
+        elif not self._fits(board):
+            self._plain(str(board))
+            return
+        else:
+            changed, self._cursor = board.changes_since(self._cursor)
+            parts = []
+            for row, col in changed:
+                line, column, text = board.render_cell(row, col)
+                parts.append(move_to(line, column) + text)
+            parts.append(move_to(board.size + 1, 0) + CLEAR_BELOW)
+            self.stream.write("".join(parts))
+        self.stream.flush()
+
+    def _fits(self, board: Board) -> bool:
+        """True om brädet plus meddelandeområdet ryms i terminalen."""
+        columns, lines = self.terminal_size()
+        # rubrikraden, size rader, frågeraden och raden som Enter efter
+        # input() flyttar till, annars rullar terminalen ett steg
+        return self._width <= columns and board.size + 3 <= lines
+
+    def _plain(self, text: str) -> None:
+        # nästa draw som får plats ritar om allt med CLEAR_SCREEN
+        self._board = None
+        print(text, file=self.stream)
+        self.stream.flush()
+
+    def _full_redraw(self, board: Board, text: str) -> None:
+        self._board = board
+        self._generation = board.generation
+        self._cursor = board.change_cursor()
+        self.stream.write(f"{CLEAR_SCREEN}{text}\n")
+
+    def message(self, text: str) -> None:
+        """Skriv en rad i meddelandeområdet under brädet.
+
+        Raden (och frågan som ofta följer) kan rulla terminalen, så nästa
+        draw ritar om hela brädet istället för att flytta markören."""
+        self._board = None
+        print(text, file=self.stream)
+        self.stream.flush()
+
+    def close(self) -> None:
+        """Sluta följa brädet, markören lämnas under brädet."""
+        self._board = None
@@ -0,0 +1,34 @@
+import pytest
+from main import RandomGen, Settings
+from scores import SqliteScoreRepository, open_score_repository
+
+SCORE_FILES = ["score.json", "score.jsonl", "score.sqlite", "score.segments", "score.bin"]
+
+
+def entry(game_id, moves=10, time=5.0, difficulty="easy", finished=True, user="Åsa", day=None):
+    """Ett resultat som ScoreRepository.append tar emot, med timestamp om day anges."""
+    e = {"game_id": game_id, "user_name": user, "moves": moves, "time": time,
+         "difficulty": difficulty, "finished": finished}
+    if day is not None:
+        e["timestamp"] = f"{day} 12:00:00"
+    return e
+
+
+def make_entries(n, seed=1):
+    """n slumpade resultat. time är hela halvsekunder, så värdena går fram och
+    tillbaka genom CSV och den binära lagringen utan avrundning och
+    likhetsjämförelserna i testerna håller."""
+    rng = RandomGen(seed)
+    return [{"game_id": i, "user_name": f"u{i % 7}", "moves": rng.get(8, 30),
+             "time": rng.get(1, 50) / 2, "difficulty": ("easy", "medium", "hard")[rng.get(0, 2)],
+             "finished": rng.get(0, 4) > 0, "timestamp": "2025-11-18 14:17:36", "seed": rng.get()}
+            for i in range(n)]
+
+
+@pytest.fixture(params=SCORE_FILES)
+def any_repo(request, tmp_path):
+    """Samma test mot alla lagringsformat som open_score_repository väljer mellan."""
+    repo = open_score_repository(Settings(data_dir=tmp_path, score_file=request.param))
+    yield repo
+    if isinstance(repo, SqliteScoreRepository):
+        repo.close()
@@ -0,0 +1,104 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from batch import (  # noqa: E402
+    GameBatch, OK, STATE_ERROR, COORD_ERROR, INVALID_MOVE, RESOLVE, NOOP,
+    HIDDEN, FLIPPED, MATCHED, FINISHED
+)
+from main import (  # noqa: E402
+    Game, GameError, GameStateError, CoordinateError, InvalidMove, CardState,
+    RandomGen, WordRepository, Settings, make_board, build_id_deck
+)
+
+CODES = {GameStateError: STATE_ERROR, CoordinateError: COORD_ERROR, InvalidMove: INVALID_MOVE}
+STATES = {CardState.HIDDEN: HIDDEN, CardState.FLIPPED: FLIPPED, CardState.MATCHED: MATCHED}
+
+
+@pytest.fixture
+def word_repo(tmp_path):
+    (tmp_path / "memo.txt").write_text("\n".join(f"ord{i}" for i in range(40)), encoding="utf-8")
+    return WordRepository(Settings(data_dir=tmp_path))
+
+
+def scalar_games(word_repo, size, seeds):
+    games = []
+    for seed in seeds:
+        rng = RandomGen(seed)
+        deck = build_id_deck(word_repo, size * size // 2, rng)
+        game = Game(make_board(size, word_repo.vocabulary()), "easy", rng)
+        game.start_new_game(deck)
+        games.append(game)
+    return games
+
+
+def scalar_step(game, action, size):
+    try:
+        if action == RESOLVE:
+            game.resolve()
+        elif action != NOOP:
+            row, col = divmod(action, size)
+            game.flip(row, col)
+    except GameError as e:
+        return CODES[type(e)]
+    return OK
+
+
+def assert_same(batch, games, size):
+    for i, game in enumerate(games):
+        board_states = [STATES[game.board.get_card(r, c).state]
+                        for r in range(size) for c in range(size)]
+        assert batch.states[i].tolist() == board_states
+        assert batch.moves[i] == game.moves
+        assert bool(batch.is_finished()[i]) == game.is_finished()
+
+
+def test_from_seeds_deals_like_game(word_repo):
+    seeds = [1, 2, 3]
+    batch = GameBatch.from_seeds(word_repo, 4, seeds)
+    for i, game in enumerate(scalar_games(word_repo, 4, seeds)):
+        assert batch.values[i].tolist() == list(game.board.values)
+
+
+def test_batch_matches_scalar_engine_random_actions(word_repo):
+    size = 4
+    seeds = list(range(20))
+    games = scalar_games(word_repo, size, seeds)
+    batch = GameBatch.from_seeds(word_repo, size, seeds)
+    rnd = random.Random(0)
+    choices = list(range(-2, size * size + 2))
+    for _ in range(3000):
+        actions = np.array([rnd.choice(choices) for _ in seeds])
+        codes = batch.step(actions)
+        expected = [scalar_step(game, int(a), size) for game, a in zip(games, actions)]
+        assert codes.tolist() == expected
+    assert_same(batch, games, size)
+
+
+def test_batch_plays_to_finish(word_repo):
+    size = 4
+    batch = GameBatch.from_seeds(word_repo, size, [7, 8])
+    for i in range(2):
+        by_value = {}
+        for cell, value in enumerate(batch.values[i].tolist()):
+            by_value.setdefault(value, []).append(cell)
+        for first, second in by_value.values():
+            actions = np.full(2, NOOP)
+            for cell in (first, second):
+                actions[i] = cell
+                assert batch.step(actions)[i] == OK
+            actions[i] = RESOLVE
+            assert batch.step(actions)[i] == OK
+    assert batch.all_finished()
+    assert batch.moves.tolist() == [8, 8]
+    assert (batch.game_states == FINISHED).all()
+
+
+def test_from_games_copies_state(word_repo):
+    games = scalar_games(word_repo, 4, [11, 12])
+    games[0].flip(0, 0)
+    batch = GameBatch.from_games(games)
+    assert batch.flipped[0].tolist() == [0, -1]
+    assert batch.step(np.array([0, 0])).tolist() == [INVALID_MOVE, OK]
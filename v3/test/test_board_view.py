@@ -0,0 +1,154 @@
+import pytest
+from types import SimpleNamespace
+
+import board_view
+from main import Board, CardState
+from board_view import (
+    ButtonBoardView, CanvasBoardView, CANVAS_MIN_SIZE, board_view_class
+)
+
+
+def test_board_view_class_by_name():
+    assert board_view_class("buttons", 30) is ButtonBoardView
+    assert board_view_class("canvas", 4) is CanvasBoardView
+
+
+def test_board_view_class_auto_picks_canvas_for_large_boards():
+    assert board_view_class("auto", CANVAS_MIN_SIZE - 1) is ButtonBoardView
+    assert board_view_class("auto", CANVAS_MIN_SIZE) is CanvasBoardView
+
+
+def test_board_view_class_unknown():
+    with pytest.raises(ValueError):
+        board_view_class("ascii", 4)
+
+
+class StubCanvas:
+    """Minimal tk.Canvas som sparar items och räknar itemconfigure-anrop."""
+    def __init__(self, parent, **kwargs):
+        self.items: dict[int, dict] = {}
+        self.calls = 0
+
+    def _create(self, tags, **options):
+        item = len(self.items) + 1
+        self.items[item] = dict(options, tags=set(tags))
+        return item
+
+    def create_rectangle(self, *coords, tags=(), **options):
+        return self._create(tags, **options)
+
+    def create_text(self, *coords, tags=(), **options):
+        return self._create(tags, **options)
+
+    def _find(self, tag_or_id):
+        if isinstance(tag_or_id, int):
+            return [tag_or_id]
+        return [i for i, item in self.items.items() if tag_or_id in item["tags"]]
+
+    def itemconfigure(self, tag_or_id, **options):
+        self.calls += 1
+        for item in self._find(tag_or_id):
+            self.items[item].update(options)
+
+    def addtag_withtag(self, new_tag, tag_or_id):
+        for item in self._find(tag_or_id):
+            self.items[item]["tags"].add(new_tag)
+
+    def dtag(self, tag_or_id, tag):
+        for item in self._find(tag_or_id):
+            self.items[item]["tags"].discard(tag)
+
+    def bind(self, sequence, func):
+        pass
+
+
+class StubParent:
+    def winfo_screenwidth(self):
+        return 10_000
+
+    def winfo_screenheight(self):
+        return 10_000
+
+
+@pytest.fixture
+def canvas_view(monkeypatch):
+    monkeypatch.setattr(board_view.tk, "Canvas", StubCanvas)
+    board = Board(4)
+    board.create_board([str(i // 2) for i in range(16)])
+    clicks = []
+    view = CanvasBoardView(StubParent(), board, lambda r, c: clicks.append((r, c)))
+    return view, clicks
+
+
+def fill(view, row, col):
+    return view.widget.items[view.rects[row * view.board.size + col]]["fill"]
+
+
+def test_cell_at_inside_cards(canvas_view):
+    view, _ = canvas_view
+    w, h, gap = view.cell_width, view.cell_height, view.GAP
+    assert view.cell_at(gap, gap) == (0, 0)
+    assert view.cell_at(w + w // 2, 2 * h + h // 2) == (2, 1)
+    # sista pixeln i sista kortet
+    assert view.cell_at(4 * w - gap - 1, 4 * h - gap - 1) == (3, 3)
+
+
+def test_cell_at_outside_board(canvas_view):
+    view, _ = canvas_view
+    w, h = view.cell_width, view.cell_height
+    assert view.cell_at(-1, 10) is None
+    assert view.cell_at(10, -1) is None
+    assert view.cell_at(4 * w, 10) is None
+    assert view.cell_at(10, 4 * h) is None
+
+
+def test_cell_at_gap_between_cards(canvas_view):
+    view, _ = canvas_view
+    w, h, gap = view.cell_width, view.cell_height, view.GAP
+    assert view.cell_at(0, h // 2) is None
+    assert view.cell_at(w - 1, h // 2) is None
+    assert view.cell_at(w + gap - 1, h // 2) is None
+    assert view.cell_at(w // 2, h - gap) is None
+
+
+def test_click_only_hidden_unlocked_cards(canvas_view):
+    view, clicks = canvas_view
+    w, h = view.cell_width, view.cell_height
+    click = lambda r, c: view._clicked(SimpleNamespace(x=c * w + w // 2, y=r * h + h // 2))
+    view.board.get_card(0, 0).state = CardState.FLIPPED
+    click(0, 0)
+    click(0, 1)
+    view.update(None, locked=True)
+    click(0, 2)
+    assert clicks == [(0, 1)]
+
+
+def test_update_changed_cards(canvas_view):
+    view, _ = canvas_view
+    view.board.get_card(1, 2).state = CardState.FLIPPED
+    view.widget.calls = 0
+    view.update([(1, 2)], locked=False)
+    assert view.widget.calls == 2
+    assert fill(view, 1, 2) == view.COLORS[CardState.FLIPPED]
+    assert view.widget.items[view.texts[6]]["text"] == view.board.get_card(1, 2).value
+    assert fill(view, 0, 0) == view.COLORS[CardState.HIDDEN]
+
+
+def test_update_lock_toggle_is_one_call(canvas_view):
+    view, _ = canvas_view
+    view.board.get_card(0, 0).state = CardState.FLIPPED
+    view.update([(0, 0)], locked=False)
+
+    view.widget.calls = 0
+    view.update([], locked=True)
+    assert view.widget.calls == 1
+    assert fill(view, 0, 1) == view.LOCKED_COLOR
+    assert fill(view, 0, 0) == view.COLORS[CardState.FLIPPED]
+
+    # kortet döljs igen medan brädet är låst och får låsfärgen direkt
+    view.board.get_card(0, 0).state = CardState.HIDDEN
+    view.update([(0, 0)], locked=True)
+    assert fill(view, 0, 0) == view.LOCKED_COLOR
+
+    view.update([], locked=False)
+    assert {fill(view, r, c) for r in range(4) for c in range(4)} == {view.COLORS[CardState.HIDDEN]}
@@ -0,0 +1,362 @@
+import pytest
+from array import array
+from main import (
+    Game, Board, CompactBoard, Card, CardState, GameState,
+    GameError, InvalidMove, GameStateError, CoordinateError, RandomGen,
+    Vocabulary, WordRepository, Settings, make_board, column_label,
+    parse_column, build_deck, build_id_deck, LARGE_BOARD_SIZE
+)
+
+
+def make_deck(size):
+    n_pairs = size * size // 2
+    return [f"w{i}" for i in range(n_pairs) for _ in range(2)]
+
+
+@pytest.fixture(params=[Board, CompactBoard])
+def board_cls(request):
+    if request.param is CompactBoard:
+        # en CompactBoard behöver ett ordförråd, här ett eget per bräda
+        return lambda size: CompactBoard(size, Vocabulary())
+    return request.param
+
+
+@pytest.fixture
+def board(board_cls):
+    b = board_cls(4)
+    b.create_board(make_deck(4))
+    return b
+
+
+@pytest.fixture
+def game(board_cls):
+    g = Game(board_cls(4), "easy", RandomGen(42))
+    g.start_new_game(make_deck(4))
+    return g
+
+
+def find_pair(board):
+    seen = {}
+    for row, col in board.hidden_positions():
+        value = board.get_card(row, col).value
+        if value in seen:
+            return seen[value], (row, col)
+        seen[value] = (row, col)
+    raise AssertionError("inget par hittat")
+
+
+def find_mismatch(board):
+    positions = board.hidden_positions()
+    first = positions[0]
+    value = board.get_card(*first).value
+    for pos in positions[1:]:
+        if board.get_card(*pos).value != value:
+            return first, pos
+    raise AssertionError("inget ickepar hittat")
+
+
+def test_new_board_all_hidden(board):
+    assert board.hidden_count() == 16
+    assert board.flipped_count() == 0
+    assert board.matched_count() == 0
+    assert board.hidden_positions() == [(r, c) for r in range(4) for c in range(4)]
+
+
+def test_card_state_change_updates_board(board):
+    card = board.get_card(1, 2)
+    card.set_state(CardState.FLIPPED)
+    assert not board.is_hidden(1, 2)
+    assert board.flipped_positions() == [(1, 2)]
+    assert (1, 2) not in board.hidden_positions()
+
+    card.set_state(CardState.MATCHED)
+    assert board.matched_positions() == [(1, 2)]
+    assert board.flipped_count() == 0
+
+
+def test_reset_flipped(board):
+    board.get_card(0, 0).set_state(CardState.FLIPPED)
+    board.get_card(3, 3).set_state(CardState.FLIPPED)
+    board.reset_flipped()
+    assert board.flipped_count() == 0
+    assert board.hidden_count() == 16
+
+
+def test_unattached_card_works_alone():
+    card = Card("ord")
+    card.set_state(CardState.FLIPPED)
+    assert card.state == CardState.FLIPPED
+
+
+def test_flip_and_match(game):
+    first, second = find_pair(game.board)
+    game.flip(*first)
+    assert game.state() == GameState.WAIT_SECOND
+    assert not game.can_flip(*first)
+    game.flip(*second)
+    assert game.state() == GameState.RESOLVING
+    assert not game.can_flip(0, 0)
+    game.resolve()
+    assert game.moves == 1
+    assert game.board.matched_count() == 2
+    assert game.state() == GameState.WAIT_FIRST
+
+
+def test_flip_mismatch_flips_back(game):
+    first, second = find_mismatch(game.board)
+    game.flip(*first)
+    game.flip(*second)
+    game.resolve()
+    assert game.board.hidden_count() == 16
+    assert game.board.is_hidden(*first)
+
+
+def test_flip_and_resolve_return_changed_positions(game):
+    first, second = find_mismatch(game.board)
+    assert game.flip(*first) == [first]
+    assert game.flip(*second) == [second]
+    assert sorted(game.resolve()) == sorted([first, second])
+
+
+def test_flip_invalid(game):
+    first, _ = find_pair(game.board)
+    game.flip(*first)
+    with pytest.raises(InvalidMove):
+        game.flip(*first)
+    with pytest.raises(GameError):
+        game.flip(10, 10)
+    with pytest.raises(GameStateError):
+        game.resolve()
+
+
+def test_play_to_finish(game):
+    while not game.is_finished():
+        first, second = find_pair(game.board)
+        game.flip(*first)
+        game.flip(*second)
+        game.resolve()
+    assert game.moves == 8
+    assert game.board.matched_count() == 16
+    assert game.allowed_moves() == []
+
+
+def test_compact_board_matches_board_str():
+    deck = make_deck(4)
+    plain, compact = Board(4), CompactBoard(4, Vocabulary())
+    plain.create_board(deck)
+    compact.create_board(deck)
+    for b in (plain, compact):
+        b.get_card(0, 1).set_state(CardState.FLIPPED)
+        b.get_card(2, 3).set_state(CardState.MATCHED)
+    assert str(plain) == str(compact)
+    assert compact.get_card(0, 1).value == plain.get_card(0, 1).value
+    assert compact.hidden_positions() == plain.hidden_positions()
+
+
+def test_compact_boards_share_vocabulary():
+    vocab = Vocabulary()
+    first, second = CompactBoard(4, vocab), CompactBoard(4, vocab)
+    first.create_board(make_deck(4))
+    second.create_board(list(reversed(make_deck(4))))
+    assert len(vocab) == 8
+    assert first.values[0] == second.values[-1]
+    assert len(first.states) == 16
+
+
+def test_compact_card_view_writes_through():
+    b = CompactBoard(4, Vocabulary())
+    b.create_board(make_deck(4))
+    b.get_card(1, 1).set_state(CardState.MATCHED)
+    assert b.get_card(1, 1).state == CardState.MATCHED
+    assert b.matched_count() == 1
+    with pytest.raises(GameStateError):
+        b.get_card(1, 1).set_state(CardState.HIDDEN)
+
+
+@pytest.mark.parametrize("col, label", [(0, "A"), (25, "Z"), (26, "AA"), (51, "AZ"), (701, "ZZ"), (702, "AAA")])
+def test_column_label_roundtrip(col, label):
+    assert column_label(col) == label
+    assert parse_column(label) == col
+
+
+@pytest.mark.parametrize("coord, expected", [("A1", (0, 0)), ("b3", (2, 1)), ("AA10", (9, 26)), ("gr200", (199, 199))])
+def test_parse_coord_multi_letter(coord, expected):
+    board = Board(200)
+    assert board.parse_coord(coord) == expected
+
+
+@pytest.mark.parametrize("coord", ["", "A", "1A", "A0", "AA1", "A5", "Ä1"])
+def test_parse_coord_invalid(coord):
+    with pytest.raises(CoordinateError):
+        Board(4).parse_coord(coord)
+
+
+def test_make_board_large_is_compact():
+    assert type(make_board(8)) is Board
+    assert isinstance(make_board(200), CompactBoard)
+
+
+def test_large_board_game_and_render():
+    size = 200
+    g = Game(make_board(size), "stress", RandomGen(1))
+    g.start_new_game(make_deck(size))
+    first, second = find_mismatch(g.board)
+    g.flip(*first)
+    g.flip(*second)
+    g.resolve()
+    assert g.board.hidden_count() == size * size
+    lines = str(g.board).splitlines()
+    assert len(lines) == size + 1
+    assert lines[0].split()[-1] == "GR"
+    assert lines[-1].startswith("200 | ")
+
+
+@pytest.fixture
+def word_repo(tmp_path):
+    words = [f"ord{i}" for i in range(40)]
+    (tmp_path / "memo.txt").write_text("\n".join(words), encoding="utf-8")
+    return WordRepository(Settings(data_dir=tmp_path))
+
+
+def test_vocabulary_is_stable(word_repo):
+    vocab = word_repo.vocabulary()
+    assert vocab is word_repo.vocabulary()
+    assert len(vocab) == 40
+    assert vocab.word(vocab.intern("ord7")) == "ord7"
+    assert vocab.intern("ord7") == 7
+
+
+def test_build_id_deck_matches_build_deck(word_repo):
+    ids = build_id_deck(word_repo, 8, RandomGen(5))
+    words = build_deck(word_repo, 8, RandomGen(5))
+    vocab = word_repo.vocabulary()
+    assert isinstance(ids, array)
+    assert ids.typecode == "H"
+    assert [vocab.word(i) for i in ids] == words
+
+
+def test_build_deck_allow_repeats(word_repo):
+    with pytest.raises(ValueError):
+        build_deck(word_repo, 50, RandomGen(1))
+    deck = build_id_deck(word_repo, 50, RandomGen(1), allow_repeats=True)
+    assert len(deck) == 100
+
+
+def test_id_deck_game_same_as_word_game(word_repo):
+    vocab = word_repo.vocabulary()
+    word_game = Game(Board(4), "easy", RandomGen(3))
+    word_game.start_new_game(build_deck(word_repo, 8, RandomGen(3)))
+    id_game = Game(make_board(4, vocab), "easy", RandomGen(3))
+    id_game.start_new_game(build_id_deck(word_repo, 8, RandomGen(3)))
+    assert str(word_game.board) == str(id_game.board)
+
+    while not id_game.is_finished():
+        first, second = find_pair(id_game.board)
+        id_game.flip(*first)
+        id_game.flip(*second)
+        id_game.resolve()
+    assert id_game.moves == 8
+
+
+def test_compact_board_rejects_unknown_id():
+    board = CompactBoard(2, Vocabulary(["a"]))
+    with pytest.raises(GameError):
+        board.create_board([0, 0, 5, 5])
+
+
+def play_some(game, pairs=2):
+    for _ in range(pairs):
+        first, second = find_pair(game.board)
+        game.flip(*first)
+        game.flip(*second)
+        game.resolve()
+    first, _ = find_mismatch(game.board)
+    game.flip(*first)
+
+
+def test_snapshot_roundtrip_plain_board():
+    game = Game(Board(4), "easy", RandomGen(42))
+    game.start_new_game(make_deck(4))
+    play_some(game)
+    data = game.snapshot()
+    clone = Game.restore(data)
+    assert str(clone.board) == str(game.board)
+    assert clone.board.flipped_positions() == game.board.flipped_positions()
+    assert clone.moves == game.moves == 2
+    assert clone.state() == GameState.WAIT_SECOND
+    assert clone.difficulty == "easy"
+    assert clone.rng.seed == 42
+    assert clone.rng.get() == game.rng.get()
+    assert clone.time_elapsed() == pytest.approx(game.time_elapsed(), abs=0.1)
+
+
+def test_snapshot_compact_board_needs_vocabulary(word_repo):
+    vocab = word_repo.vocabulary()
+    game = Game(make_board(4, vocab), "easy", RandomGen(1))
+    game.start_new_game(build_id_deck(word_repo, 8, RandomGen(1)))
+    play_some(game, pairs=1)
+    data = game.snapshot(include_rng=False)
+    with pytest.raises(GameError):
+        Game.restore(data)
+    clone = Game.restore(data, vocab)
+    assert clone.board.values == game.board.values
+    assert clone.board.states == game.board.states
+    assert clone.board.matched_count() == 2
+    # state 2 bitar/kort + id:n (2 bytes/kort) + liten header
+    assert len(data) < 4 + 16 * 2 + 4 + 40
+    clone.flip(*find_pair(clone.board)[0])
+
+
+def test_snapshot_finished_game_and_clone_independent():
+    game = Game(Board(2), "easy", RandomGen(3))
+    game.start_new_game(["a", "a", "b", "b"])
+    clone = Game.restore(game.snapshot())
+    while not clone.is_finished():
+        first, second = find_pair(clone.board)
+        clone.flip(*first)
+        clone.flip(*second)
+        clone.resolve()
+    assert game.moves == 0
+    finished = Game.restore(clone.snapshot())
+    assert finished.is_finished()
+    assert finished.allowed_moves() == []
+
+
+@pytest.mark.parametrize("data", [b"", b"XXXX" + bytes(40), b"MEMG\x01"])
+def test_restore_invalid(data):
+    with pytest.raises(GameError):
+        Game.restore(data)
+
+
+def test_render_cache_only_rebuilds_changed_rows(board):
+    before = str(board)
+    rows = before.splitlines()
+    board.get_card(2, 1).set_state(CardState.FLIPPED)
+    after = str(board).splitlines()
+    assert after[0] == rows[0]
+    assert after[1:3] == rows[1:3]
+    assert after[4] == rows[4]
+    assert after[3] != rows[3]
+    assert str(board) is str(board)
+
+
+def test_render_cache_reset_on_new_board(board):
+    str(board)
+    board.create_board([f"lång{i}" for i in range(8) for _ in range(2)])
+    board.get_card(0, 0).set_state(CardState.FLIPPED)
+    assert "lång0" in str(board)
+    assert str(board).splitlines()[1].split(" | ")[1].startswith("lång0 ")
+
+
+def test_cards_have_no_instance_dict():
+    compact = CompactBoard(2, Vocabulary())
+    compact.create_board(["a", "a", "b", "b"])
+    plain = Board(2)
+    plain.create_board(["a", "a", "b", "b"])
+    for card in (compact.get_card(0, 0), plain.get_card(0, 0)):
+        assert not hasattr(card, "__dict__")
+
+
+def test_large_boards_do_not_share_a_vocabulary():
+    first, second = make_board(LARGE_BOARD_SIZE + 2), make_board(LARGE_BOARD_SIZE + 2)
+    assert first.vocabulary is not second.vocabulary
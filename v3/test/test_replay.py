@@ -0,0 +1,83 @@
+import pytest
+
+from main import (
+    GameError, MoveJournal, Settings, WordRepository, new_game, replay_game
+)
+from replay import verify_entry, verify_all
+from simulation import PerfectMemoryPlayer, play
+
+
+@pytest.fixture
+def settings(tmp_path):
+    (tmp_path / "memo.txt").write_text("\n".join(f"ord{i}" for i in range(40)), encoding="utf-8")
+    return Settings(data_dir=tmp_path)
+
+
+@pytest.fixture
+def word_repo(settings):
+    return WordRepository(settings)
+
+
+def played_entry(settings, word_repo, seed=5, max_moves=None):
+    game = new_game(settings, word_repo, "easy", seed, journal=True)
+    play(game, PerfectMemoryPlayer(seed), max_moves)
+    return game, {
+        "game_id": seed,
+        "user_name": "bot",
+        "moves": game.moves,
+        "time": game.time_elapsed(),
+        "difficulty": "easy",
+        "finished": game.is_finished(),
+        "seed": seed,
+        "journal": game.journal.to_text(),
+    }
+
+
+def test_journal_records_flips_and_resolves(settings, word_repo):
+    game, _ = played_entry(settings, word_repo)
+    cells = list(game.journal.cells)
+    assert len(cells) == 3 * game.moves
+    assert cells.count(MoveJournal.RESOLVE) == game.moves
+    assert len(game.journal.deltas) == len(cells)
+
+
+def test_journal_bytes_roundtrip(settings, word_repo):
+    game, _ = played_entry(settings, word_repo)
+    copy = MoveJournal.from_text(game.journal.to_text())
+    assert list(copy) == list(game.journal)
+    with pytest.raises(GameError):
+        MoveJournal.from_bytes(game.journal.to_bytes()[:-1])
+    with pytest.raises(GameError):
+        MoveJournal.from_text("inte base64!")
+
+
+def test_replay_rebuilds_same_game(settings, word_repo):
+    game, entry = played_entry(settings, word_repo)
+    replayed = replay_game(settings, word_repo, "easy", entry["seed"], game.journal)
+    assert replayed.is_finished()
+    assert replayed.moves == game.moves
+    assert str(replayed.board) == str(game.board)
+
+
+def test_verify_entry(settings, word_repo):
+    _, entry = played_entry(settings, word_repo)
+    assert verify_entry(entry, settings, word_repo) == (True, "")
+
+    cheated = dict(entry, moves=entry["moves"] - 1)
+    ok, reason = verify_entry(cheated, settings, word_repo)
+    assert ok is False and "drag" in reason
+
+    wrong_seed = dict(entry, seed=entry["seed"] + 1)
+    assert verify_entry(wrong_seed, settings, word_repo)[0] is False
+
+    no_journal = {k: v for k, v in entry.items() if k != "journal"}
+    assert verify_entry(no_journal, settings, word_repo)[0] is None
+
+
+def test_verify_unfinished_and_all(settings, word_repo):
+    _, aborted = played_entry(settings, word_repo, seed=6, max_moves=3)
+    assert aborted["finished"] is False
+    _, done = played_entry(settings, word_repo, seed=7)
+    result = verify_all([aborted, done, {"moves": 1}], settings, word_repo)
+    assert len(result["ok"]) == 2
+    assert len(result["skipped"]) == 1
@@ -0,0 +1,72 @@
+import pytest
+from conftest import make_entries
+from main import ScoreRepository, Settings
+from score_binary import HEADER, RECORD, BinaryScoreRepository, migrate_to_binary
+from scores import open_score_repository
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "struct"])
+def binary(request, tmp_path):
+    return BinaryScoreRepository(Settings(), base_path=tmp_path, filename="score.bin",
+                                 use_numpy=request.param)
+
+
+def test_matches_plain_repository(binary, tmp_path):
+    entries = make_entries(300)
+    plain = ScoreRepository(Settings(), base_path=tmp_path, filename="score.json")
+    plain._save(entries)
+    binary.bulk_append(entries)
+    assert binary.load() == entries
+    for difficulty in ("easy", "medium", "hard"):
+        for limit in (None, 0, 1, 7, 1000):
+            assert binary.top(difficulty, limit) == plain.top(difficulty, limit)
+    for e in entries[:40]:
+        assert binary.rank_of(e, neighbours=2) == plain.rank_of(e, neighbours=2)
+    new = {**entries[0], "game_id": -1, "finished": True}
+    assert binary.rank_of(new, neighbours=3) == plain.rank_of(new, neighbours=3)
+    assert binary.rank_of_game_id(5, neighbours=1) == plain.rank_of_game_id(5, neighbours=1)
+    assert binary.rank_of_game_id(999) is None
+
+
+def test_record_layout(binary):
+    binary.append(make_entries(1)[0])
+    data = binary.path.read_bytes()
+    assert len(data) == HEADER.size + RECORD.size == 16 + 44
+    assert data[:8] == b"MEMSCORE"
+
+
+def test_only_fixed_fields_are_stored(binary):
+    binary.append({"game_id": 1, "user_name": "Åsa", "moves": 3, "time": 1.5,
+                   "difficulty": "easy", "finished": True, "journal": "A1 B2"})
+    assert binary.load() == [{"game_id": 1, "user_name": "Åsa", "moves": 3, "time": 1.5,
+                              "difficulty": "easy", "finished": True}]
+
+
+def test_torn_record_is_skipped_and_dropped_on_append(binary):
+    entries = make_entries(3)
+    binary.bulk_append(entries[:2])
+    with binary.path.open("ab") as f:
+        f.write(b"\x01" * 10)
+    assert binary.load() == entries[:2]
+    binary.append(entries[2])
+    assert binary.load() == entries
+    assert (binary.path.stat().st_size - HEADER.size) % RECORD.size == 0
+
+
+def test_unstorable_and_corrupt(binary):
+    with pytest.raises(ValueError):
+        binary.append({"game_id": 1, "user_name": "a", "moves": -1, "time": 1.0,
+                       "difficulty": "easy", "finished": True})
+    binary.path.write_bytes(b"NOTSCORE" + bytes(60))
+    with pytest.raises(ValueError, match="korrupt"):
+        binary.load()
+
+
+def test_open_score_repository_migrates(tmp_path):
+    entries = make_entries(20)
+    ScoreRepository(Settings(), base_path=tmp_path, filename="score.json")._save(entries)
+    repo = open_score_repository(Settings(data_dir=tmp_path, score_file="score.bin"))
+    assert isinstance(repo, BinaryScoreRepository)
+    assert repo.load() == entries
+    with pytest.raises(ValueError, match="finns redan"):
+        migrate_to_binary(entries, repo.path)
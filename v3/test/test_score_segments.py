@@ -0,0 +1,71 @@
+import pytest
+from conftest import make_entries
+from main import ScoreRepository, Settings
+from score_segments import SegmentedScoreRepository, migrate_to_segments
+
+
+@pytest.fixture
+def segmented(tmp_path):
+    return SegmentedScoreRepository(Settings(), base_path=tmp_path, filename="score.segments",
+                                    segment_bytes=2000, compact_after=3)
+
+
+def by_id(records):
+    return sorted(records, key=lambda e: e["game_id"])
+
+
+def test_rolls_segments_and_compacts_in_background(tmp_path, segmented):
+    plain = ScoreRepository(Settings(), base_path=tmp_path, filename="score.json")
+    entries = make_entries(150)
+    for e in entries:
+        segmented.append(e)
+        plain.append(e)
+    segmented.wait_for_compaction()
+
+    manifest = segmented.manifest()
+    assert manifest["base"]
+    assert len(manifest["segments"]) <= 3
+    assert by_id(segmented.load()) == entries
+    for difficulty in ("easy", "medium", "hard"):
+        assert segmented.top(difficulty) == plain.top(difficulty)
+        assert segmented.top(difficulty, limit=5) == plain.top(difficulty, limit=5)
+
+    # bara filerna i manifestet finns kvar
+    files = {p.name for p in segmented.path.glob("*.jsonl")}
+    assert files <= set(manifest["base"].values()) | set(manifest["segments"])
+
+
+def test_compact_merges_everything_but_active_segment(segmented):
+    for e in make_entries(60):
+        segmented.append(e)
+    segmented.wait_for_compaction()
+    segmented.compact()
+    assert len(segmented.manifest()["segments"]) == 1
+    assert segmented.compact() == 0
+    assert len(segmented.load()) == 60
+
+
+def test_compaction_removes_duplicate_game_ids(segmented):
+    entries = make_entries(40)
+    for e in entries + entries[:10]:
+        segmented.append(e)
+    segmented.wait_for_compaction()
+    # det aktiva segmentet komprimeras inte, stäng det först
+    active = segmented.manifest()["segments"][-1]
+    while segmented.manifest()["segments"][-1] == active:
+        segmented.append({**entries[0], "game_id": None})
+    segmented.wait_for_compaction()
+    segmented.compact()
+    ids = [e["game_id"] for e in segmented.load() if e["game_id"] is not None]
+    assert sorted(ids) == list(range(40))
+
+
+def test_migrate_to_segments(tmp_path):
+    entries = make_entries(30)
+    target = tmp_path / "score.segments"
+    assert migrate_to_segments(entries, target) == 30
+    repo = SegmentedScoreRepository(Settings(), base_path=tmp_path, filename="score.segments")
+    assert repo.manifest()["segments"] == repo.manifest()["segments"][-1:]
+    assert by_id(repo.load()) == entries
+    with pytest.raises(ValueError):
+        migrate_to_segments(entries, target)
@@ -0,0 +1,96 @@
+from conftest import entry
+from main import ScoreRepository, Settings
+from score_stats import ScoreStats
+from score_writer import ScoreWriter
+
+
+RECORDS = [entry(1, moves=12), entry(2, moves=8, time=9.0), entry(3, moves=8, time=9.0),
+           entry(4, moves=20, difficulty="hard"), entry(5, moves=3, finished=False),
+           entry(6, user="Bo", moves=30)]
+
+
+def check_asa(stats):
+    asa = stats.get("Åsa")
+    assert (asa.games, asa.finished) == (5, 4)
+    assert asa.average_moves == (12 + 8 + 8 + 20) / 4
+    assert asa.completion_rate == 0.8
+    # lika resultat: det först sparade är bäst
+    assert asa.best("easy") == {"moves": 8, "time": 9.0, "game_id": 2}
+    assert asa.best("hard")["game_id"] == 4
+    assert asa.best("medium") is None
+    assert asa.games_per_difficulty() == {"easy": 4, "hard": 1}
+    assert stats.get("Bo").games == 1
+    assert stats.get("Ingen") is None
+
+
+def test_add_updates_and_persists(any_repo):
+    stats = ScoreStats(any_repo)
+    assert stats.players == {}
+    # härifrån ska score-filen inte läsas om
+    iter_records, any_repo.iter_records = any_repo.iter_records, None
+    for e in RECORDS:
+        stats.append(e)
+    check_asa(stats)
+    stats.close()
+    check_asa(ScoreStats(any_repo))
+    # en ombyggnad ger samma sak
+    any_repo.iter_records = iter_records
+    stats.rebuild()
+    check_asa(stats)
+
+
+def test_rebuild_after_external_change(tmp_path):
+    repo = ScoreRepository(Settings(), base_path=tmp_path, filename="score.json")
+    stats = ScoreStats(repo, save_every=1)
+    for e in RECORDS[:3]:
+        stats.append(e)
+    # sparat utan att statistiken fick veta
+    for e in RECORDS[3:]:
+        repo.append(e)
+    check_asa(ScoreStats(repo))
+    check_asa(stats)
+
+
+def test_two_instances_do_not_lose_results(tmp_path):
+    repo = ScoreRepository(Settings(), base_path=tmp_path, filename="score.json")
+    a, b = ScoreStats(repo, save_every=1), ScoreStats(repo, save_every=1)
+    assert a.players == b.players == {}
+    b.append(entry(1, user="B"))
+    a.append(entry(2, user="A"))
+    # a:s räknare gällde inte längre, så filen får inte stämplas som aktuell
+    for stats in (ScoreStats(repo), a, b):
+        assert {name: p.games for name, p in stats.players.items()} == {"A": 1, "B": 1}
+
+
+def test_saves_in_batches(tmp_path, monkeypatch):
+    repo = ScoreRepository(Settings(), base_path=tmp_path, filename="score.json")
+    stats = ScoreStats(repo, save_every=4)
+    assert stats.players == {}
+    saves = []
+    real_save = stats._save
+    monkeypatch.setattr(stats, "_save", lambda: saves.append(1) or real_save())
+    for e in RECORDS:
+        stats.append(e)
+    assert len(saves) == 1
+    stats.close()
+    assert len(saves) == 2
+    check_asa(ScoreStats(repo))
+
+
+def test_corrupt_stats_file_is_rebuilt(tmp_path):
+    repo = ScoreRepository(Settings(), base_path=tmp_path, filename="score.json")
+    for e in RECORDS:
+        repo.append(e)
+    stats = ScoreStats(repo)
+    stats.path.write_text("{inte json", encoding="utf-8")
+    check_asa(ScoreStats(repo))
+
+
+def test_score_writer_updates_stats(tmp_path):
+    repo = ScoreRepository(Settings(), base_path=tmp_path, filename="score.json")
+    stats = ScoreStats(repo)
+    writer = ScoreWriter(repo, stats)
+    for e in RECORDS:
+        writer.submit(e)
+    writer.close()
+    check_asa(stats)
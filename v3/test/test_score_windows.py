@@ -0,0 +1,117 @@
+from datetime import date
+import pytest
+from conftest import entry
+from main import ScoreRepository, Settings, file_stamp
+from score_windows import WindowedLeaderboards, window_key
+from score_writer import ScoreWriter
+
+
+class Clock:
+    def __init__(self, day):
+        self.day = day
+
+    def __call__(self):
+        return self.day
+
+
+@pytest.fixture
+def repo(tmp_path):
+    return ScoreRepository(Settings(), base_path=tmp_path, filename="score.json")
+
+
+def ids(records):
+    return [e["game_id"] for e in records]
+
+
+@pytest.mark.parametrize("window, day, key", [
+    ("day", date(2025, 11, 18), "2025-11-18"),
+    ("week", date(2025, 11, 18), "2025-W47"),
+    ("week", date(2027, 1, 1), "2026-W53"),
+    ("month", date(2025, 1, 5), "2025-01"),
+])
+def test_window_key(window, day, key):
+    assert window_key(window, day) == key
+
+
+def test_rebuild_only_current_windows(repo):
+    # tisdag 2025-11-18, veckan började måndag 17:e
+    for e in [entry(1, 9, day="2025-11-18"), entry(2, 5, day="2025-11-17"), entry(3, 3, day="2025-11-03"),
+              entry(4, 1, day="2025-10-31"), entry(5, 7, day="2025-11-18"), entry(6, 1, day="2025-11-18", finished=False),
+              entry(7, 2, day="2025-11-18", difficulty="hard")]:
+        repo.append(e)
+    boards = WindowedLeaderboards(repo, today=Clock(date(2025, 11, 18)))
+    assert ids(boards.top("easy", "day")) == [5, 1]
+    assert ids(boards.top("easy", "week")) == [2, 5, 1]
+    assert ids(boards.top("easy", "month", limit=2)) == [3, 2]
+    assert ids(boards.top("hard")) == [7]
+    assert boards.top("medium") == []
+
+
+def test_add_and_roll_over(repo):
+    clock = Clock(date(2025, 11, 30))
+    boards = WindowedLeaderboards(repo, size=3, today=clock)
+    assert boards.top("easy", limit=None) == []
+    for i, moves in enumerate([8, 6, 9, 7, 6]):
+        e = entry(i, moves, day="2025-11-30")
+        repo.append(e)
+        boards.add(e)
+    # bara de 3 bästa sparas, lika resultat i sparordning
+    assert ids(boards.top("easy", limit=None)) == [1, 4, 3]
+
+    # ny dag, ny vecka och ny månad: alla gamla listor kastas
+    clock.day = date(2025, 12, 1)
+    assert boards.top("easy", "day", None) == []
+    assert boards.top("easy", "month", None) == []
+    e = entry(10, 20, day="2025-12-01")
+    boards.add(e)
+    assert ids(boards.top("easy", "week", None)) == [10]
+
+    # ny dag i samma vecka: veckans lista finns kvar
+    clock.day = date(2025, 12, 2)
+    assert boards.top("easy", "day", None) == []
+    assert ids(boards.top("easy", "week", None)) == [10]
+
+
+def test_top_invalid(repo):
+    boards = WindowedLeaderboards(repo, size=5)
+    with pytest.raises(ValueError, match="fönster"):
+        boards.top("easy", "year")
+    with pytest.raises(ValueError):
+        boards.top("omöjlig")
+    with pytest.raises(ValueError, match="limit"):
+        boards.top("easy", limit=6)
+
+
+def test_score_writer_updates_leaderboards(repo):
+    today = date.today().isoformat()
+    boards = WindowedLeaderboards(repo)
+    boards.rebuild()
+    writer = ScoreWriter(repo, leaderboards=boards)
+    for i, moves in enumerate([9, 4]):
+        writer.submit(entry(i, moves, day=today))
+    writer.close()
+    # listan ska inte byggas om, add har redan sorterat in posterna
+    repo.iter_records = None
+    assert ids(boards.top("easy")) == [1, 0]
+
+
+def test_rebuilds_when_score_file_changes(repo):
+    today = date.today().isoformat()
+    boards = WindowedLeaderboards(repo)
+    writer = ScoreWriter(repo, leaderboards=boards)
+    writer.submit(entry(1, 9, day=today))
+    writer.close()
+    assert ids(boards.top("easy")) == [1]
+
+    # ett annat program sparar ett resultat utan att gå via boards
+    ScoreRepository(repo.settings, base_path=repo.path.parent, filename=repo.path.name).append(
+        entry(2, 4, day=today))
+    assert ids(boards.top("easy")) == [2, 1]
+
+    # och ett till precis före vårt eget: stämpeln före vår append är
+    # inte den som listorna byggdes för, så add räcker inte
+    repo.append(entry(3, 5, day=today))
+    before = file_stamp(repo.path)
+    repo.append(entry(4, 8, day=today))
+    boards.add(entry(4, 8, day=today), (before, file_stamp(repo.path)))
+    assert ids(boards.top("easy")) == [2, 3, 4, 1]
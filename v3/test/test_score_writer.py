@@ -0,0 +1,58 @@
+import sqlite3
+import pytest
+from conftest import entry
+from main import ScoreRepository, Settings
+from score_writer import ScoreWriter
+
+
+@pytest.fixture
+def repo(tmp_path):
+    return ScoreRepository(Settings(), base_path=tmp_path, filename="score.json")
+
+
+def test_writer_saves_and_reports_rank(repo):
+    repo.append(entry(1, 10, 5.0))
+    writer = ScoreWriter(repo)
+    results = []
+    writer.submit(entry(2, 12, 3.0), lambda e, rank, err: results.append((e["game_id"], rank, err)))
+    writer.submit(entry(3, 4, 3.0), lambda e, rank, err: results.append((e["game_id"], rank, err)))
+    writer.close()
+    assert results == []  # callbacks körs bara från poll
+    assert writer.poll() == 2
+    assert results == [(2, 2, None), (3, 1, None)]
+    assert [s["game_id"] for s in repo.top("easy")] == [3, 1, 2]
+
+
+def test_writer_reports_errors(repo):
+    repo.path.write_text("{inte json", encoding="utf-8")
+    writer = ScoreWriter(repo)
+    results = []
+    writer.submit(entry(1, 10, 5.0), lambda e, rank, err: results.append((rank, err)))
+    writer.close()
+    writer.poll()
+    assert results[0][0] is None
+    assert isinstance(results[0][1], ValueError)
+
+
+def test_writer_survives_other_backend_errors(repo, monkeypatch):
+    real_append = repo.append
+
+    def append(e):
+        if e["game_id"] == 1:
+            raise sqlite3.OperationalError("database is locked")
+        real_append(e)
+    monkeypatch.setattr(repo, "append", append)
+    writer = ScoreWriter(repo)
+    results = []
+    writer.submit(entry(1, 10, 5.0), lambda e, rank, err: results.append((rank, type(err))))
+    writer.submit(entry(2, 10, 5.0), lambda e, rank, err: results.append((rank, type(err))))
+    writer.close(timeout=5)
+    writer.poll()
+    assert results == [(None, sqlite3.OperationalError), (1, type(None))]
+
+
+def test_submit_after_close(repo):
+    writer = ScoreWriter(repo)
+    writer.close()
+    with pytest.raises(ValueError):
+        writer.submit(entry(1, 10, 5.0))
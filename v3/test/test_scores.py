@@ -0,0 +1,397 @@
+import io
+import json
+import multiprocessing
+import os
+import threading
+import pytest
+from conftest import entry, make_entries
+from main import ScoreRank, ScoreRepository, Settings, _iter_json_array, score_key
+from score_writer import ScoreWriter
+from scores import (
+    JsonlScoreRepository, SqliteScoreRepository, main, migrate_json_to_jsonl,
+    migrate_to_sqlite, open_score_repository, read_scores
+)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    return JsonlScoreRepository(Settings(), base_path=tmp_path, filename="score.jsonl")
+
+
+def test_append_writes_one_line_per_entry(repo):
+    repo.append(entry(1))
+    repo.append(entry(2, moves=4))
+    lines = repo.path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["game_id"] for line in lines] == [1, 2]
+    assert repo.load() == [entry(1), entry(2, moves=4)]
+    assert [s["game_id"] for s in repo.top("easy")] == [2, 1]
+
+
+def test_load_missing_file(repo):
+    assert repo.load() == []
+
+
+def test_torn_last_line_is_skipped_and_dropped_on_append(repo):
+    repo.append(entry(1))
+    with repo.path.open("ab") as f:
+        f.write(b'{"game_id": 2, "mov')
+    assert repo.load() == [entry(1)]
+    repo.append(entry(3))
+    assert [s["game_id"] for s in repo.load()] == [1, 3]
+
+
+def test_complete_last_line_without_newline_is_kept(repo):
+    repo.path.write_text(json.dumps(entry(1)), encoding="utf-8")
+    repo.append(entry(2))
+    assert [s["game_id"] for s in repo.load()] == [1, 2]
+
+
+def test_corrupt_middle_line_raises(repo):
+    repo.path.write_text('{"game_id": 1}\nskräp\n{"game_id": 2}\n', encoding="utf-8")
+    with pytest.raises(ValueError):
+        repo.load()
+
+
+def test_migrate_json_to_jsonl(tmp_path):
+    old = ScoreRepository(Settings(), base_path=tmp_path, filename="score.json")
+    old.append(entry(1))
+    old.append(entry(2))
+    assert migrate_json_to_jsonl(old.path, tmp_path / "score.jsonl") == 2
+    new = JsonlScoreRepository(Settings(), base_path=tmp_path, filename="score.jsonl")
+    assert new.load() == old.load()
+    with pytest.raises(ValueError):
+        migrate_json_to_jsonl(old.path, new.path)
+
+
+def test_settings_default_is_plain_json(tmp_path):
+    # ScoreRepository skriver en JSON-lista, så default-namnet får inte vara .jsonl
+    assert ScoreRepository(Settings(data_dir=tmp_path)).path.name == "score.json"
+
+
+def test_open_score_repository_migrates_once(tmp_path):
+    settings = Settings(data_dir=tmp_path, score_file="score.jsonl")
+    ScoreRepository(settings, filename="score.json").append(entry(1))
+    repo = open_score_repository(settings)
+    assert isinstance(repo, JsonlScoreRepository)
+    assert [s["game_id"] for s in repo.load()] == [1]
+    repo.append(entry(2))
+    assert len(open_score_repository(settings).load()) == 2
+
+    old = open_score_repository(Settings(data_dir=tmp_path, score_file="score.json"))
+    assert type(old) is ScoreRepository
+
+
+def test_top_matches_plain_repository(tmp_path):
+    plain = ScoreRepository(Settings(), base_path=tmp_path, filename="score.json")
+    repo = JsonlScoreRepository(Settings(), base_path=tmp_path, filename="score.jsonl")
+    results = [(10, 5.0), (8, 9.0), (10, 4.0), (8, 9.0), (12, 1.0)]
+    for i, (moves, time) in enumerate(results):
+        for r in (plain, repo):
+            r.append(entry(i, moves=moves, time=time))
+    repo.append(entry(99, moves=1, finished=False))
+    assert repo.top("easy") == plain.top("easy")
+    assert repo.top("easy", limit=2) == plain.top("easy", limit=2)
+    assert repo.top("hard") == []
+    with pytest.raises(ValueError):
+        repo.top("omöjlig")
+
+
+def test_index_updated_incrementally_on_append(repo):
+    repo.append(entry(1))
+    index = repo.index()
+    repo.append(entry(2, moves=3))
+    assert repo.index() is index
+    assert [s["game_id"] for s in index.top("easy")] == [2, 1]
+
+
+def test_index_reloads_after_external_change(repo):
+    repo.append(entry(1))
+    index = repo.index()
+    other = JsonlScoreRepository(Settings(), base_path=repo.base_path, filename="score.jsonl")
+    other.append(entry(2, moves=3))
+    assert repo.index() is not index
+    assert [s["game_id"] for s in repo.top("easy")] == [2, 1]
+    # repo ser att filen växte och läser om istället för att bara lägga till
+    repo.append(entry(3, moves=1))
+    assert [s["game_id"] for s in repo.top("easy")] == [3, 2, 1]
+
+
+@pytest.fixture
+def sqlite_repo(tmp_path):
+    repo = SqliteScoreRepository(Settings(), base_path=tmp_path, filename="score.sqlite")
+    yield repo
+    repo.close()
+
+
+def test_sqlite_roundtrip_and_top(tmp_path, sqlite_repo):
+    plain = ScoreRepository(Settings(), base_path=tmp_path, filename="score.json")
+    records = [entry(1, 10, 5.0), entry(2, 8, 9.0), entry(3, 10, 4.0),
+               entry(4, 8, 9.0), entry(5, 1, 1.0, finished=False), entry(6, 2, 2.0, "hard")]
+    for e in records:
+        plain.append(e)
+        sqlite_repo.append(e)
+    assert sqlite_repo.load() == records
+    assert sqlite_repo.top("easy") == plain.top("easy")
+    assert [s["game_id"] for s in sqlite_repo.top("easy", limit=2)] == [2, 4]
+    with pytest.raises(ValueError):
+        sqlite_repo.top("omöjlig")
+
+
+def test_sqlite_uses_wal(sqlite_repo):
+    mode = sqlite_repo._connect().execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode == "wal"
+
+
+def test_sqlite_works_from_other_threads(sqlite_repo):
+    writer = ScoreWriter(sqlite_repo)
+    writer.submit(entry(1))
+    writer.close()
+    assert [s["game_id"] for s in sqlite_repo.top("easy")] == [1]
+
+
+def test_migrate_to_sqlite(tmp_path):
+    old = JsonlScoreRepository(Settings(), base_path=tmp_path, filename="score.jsonl")
+    for i in range(5):
+        old.append(entry(i, moves=10 - i))
+    target = tmp_path / "score.sqlite"
+    assert migrate_to_sqlite(old.path, target) == 5
+    repo = SqliteScoreRepository(Settings(), base_path=tmp_path, filename="score.sqlite")
+    assert repo.load() == old.load()
+    repo.close()
+    with pytest.raises(ValueError):
+        migrate_to_sqlite(old.path, target)
+
+
+def test_open_score_repository_sqlite(tmp_path):
+    ScoreRepository(Settings(data_dir=tmp_path), filename="score.json").append(entry(1))
+    repo = open_score_repository(Settings(data_dir=tmp_path, score_file="score.db"))
+    assert isinstance(repo, SqliteScoreRepository)
+    assert [s["game_id"] for s in repo.load()] == [1]
+    repo.close()
+
+
+def test_rank_of(any_repo):
+    records = [entry(1, 10, 5.0), entry(2, 8, 9.0), entry(3, 10, 4.0), entry(4, 10, 5.0),
+               entry(5, 1, 1.0, difficulty="hard"), entry(6, 2, 1.0, finished=False)]
+    for e in records:
+        any_repo.append(e)
+    # sparade poster: egen plats, lika resultat i sparordning
+    assert [any_repo.rank_of(e).position for e in records[:4]] == [3, 1, 2, 4]
+    assert any_repo.rank_of(records[4]).position == 1
+    # nya poster hamnar efter lika resultat
+    assert any_repo.rank_of(entry(7, 7, 1.0)).position == 1
+    assert any_repo.rank_of(entry(7, 10, 5.0)).position == 5
+    assert any_repo.rank_of(entry(7, 10, 4.5)).position == 3
+    assert any_repo.rank_of(entry(7, 1, 1.0, finished=False)).position == 5
+    with pytest.raises(ValueError):
+        any_repo.rank_of(entry(7, difficulty="omöjlig"))
+
+
+def test_rank_of_with_neighbours(any_repo):
+    for i, moves in enumerate([5, 6, 7, 8, 9]):
+        any_repo.append(entry(i, moves, 1.0))
+    rank = any_repo.rank_of(entry(2, 7, 1.0), neighbours=1)
+    assert rank.position == 3
+    assert [e["game_id"] for e in rank.above] == [1]
+    assert [e["game_id"] for e in rank.below] == [3]
+
+    rank = any_repo.rank_of(entry(99, 7, 1.0), neighbours=2)
+    assert rank.position == 4
+    assert [e["game_id"] for e in rank.above] == [1, 2]
+    assert [e["game_id"] for e in rank.below] == [3, 4]
+
+    rank = any_repo.rank_of(entry(98, 1, 1.0, finished=False), neighbours=2)
+    assert rank.position == 6
+    assert [e["game_id"] for e in rank.above] == [3, 4]
+    assert rank.below == []
+
+
+def test_iter_records_filters(any_repo):
+    records = [entry(1), entry(2, difficulty="hard"), entry(3, finished=False),
+               entry(4, 3, 1.0), entry(5, difficulty="hard", finished=False)]
+    for e in records:
+        any_repo.append(e)
+    ids = lambda **kw: sorted(e["game_id"] for e in any_repo.iter_records(**kw))
+    assert ids() == [1, 2, 3, 4, 5]
+    assert ids(difficulty="hard") == [2, 5]
+    assert ids(finished=True) == [1, 2, 4]
+    assert ids(difficulty="easy", finished=False) == [3]
+    assert [e["game_id"] for e in any_repo.top("easy", limit=1)] == [4]
+
+
+@pytest.mark.parametrize("text", [
+    '', '  \n', '[]', '[1, 2.5e3, "a]b,", {"x": [1, {"y": null}]}, true]',
+    ' [ {"game_id": 1} , {"game_id": 2}\n]\n', '[12345678901234567890]',
+])
+def test_iter_json_array_matches_json_load(text):
+    expected = json.loads(text) if text.strip() else []
+    # liten chunk_size så att värden delas mellan bitarna
+    assert list(_iter_json_array(io.StringIO(text), "x", chunk_size=3)) == expected
+
+
+@pytest.mark.parametrize("text, message", [
+    ('{"a": 1}', "lista"), ('[1, 2', "korrupt"), ('[1 2]', "korrupt"),
+    ('[1,]', "korrupt"), ('[1] x', "korrupt"), ('[{"a": }]', "korrupt"),
+])
+def test_iter_json_array_invalid(text, message):
+    with pytest.raises(ValueError, match=message):
+        list(_iter_json_array(io.StringIO(text), "x", chunk_size=4))
+
+
+def test_json_top_streams_with_bounded_heap(tmp_path, monkeypatch):
+    path = tmp_path / "score.json"
+    path.write_text(json.dumps([entry(i, moves=100 - i % 50) for i in range(200)]), encoding="utf-8")
+    json_repo = ScoreRepository(Settings(), base_path=tmp_path, filename="score.json")
+    # top ska inte läsa in hela listan
+    monkeypatch.setattr(json, "loads", None)
+    top = json_repo.top("easy", limit=3)
+    assert [(e["moves"], e["game_id"]) for e in top] == [(51, 49), (51, 99), (51, 149)]
+
+
+def full_entry(game_id, **kw):
+    return {**entry(game_id, **kw), "timestamp": "2025-11-18 14:17:36", "seed": 7}
+
+
+def test_bulk_append_validates_and_dedupes(any_repo):
+    any_repo.append(full_entry(1))
+    added = any_repo.bulk_append(iter([full_entry(1), full_entry(2), full_entry(3, moves=4),
+                                       full_entry(2, moves=99)]))
+    assert added == 2
+    records = sorted(any_repo.iter_records(), key=lambda e: e["game_id"])
+    assert [(e["game_id"], e["moves"]) for e in records] == [(1, 10), (2, 10), (3, 4)]
+    assert any_repo.bulk_append([full_entry(3)]) == 0
+
+
+@pytest.mark.parametrize("change, message", [
+    ({"seed": None}, "saknar fält"), ({"difficulty": "omöjlig"}, "svårighetsgrad"),
+    ({"moves": -1}, "moves"), ({"moves": True}, "moves"), ({"time": 0}, "time"),
+    ({"finished": "ja"}, "finished"),
+])
+def test_bulk_append_rejects_whole_batch(any_repo, change, message):
+    bad = {k: v for k, v in {**full_entry(2), **change}.items() if v is not None}
+    with pytest.raises(ValueError, match=f"post 2: .*{message}"):
+        any_repo.bulk_append([full_entry(1), bad, full_entry(3)])
+    assert list(any_repo.iter_records()) == []
+
+
+def test_plain_bulk_append_writes_once(tmp_path, monkeypatch):
+    json_repo = ScoreRepository(Settings(), base_path=tmp_path, filename="score.json")
+    saves = []
+    monkeypatch.setattr(json_repo, "_save", saves.append)
+    json_repo.bulk_append(full_entry(i) for i in range(50))
+    assert len(saves) == 1 and len(saves[0]) == 50
+
+
+@pytest.mark.parametrize("name", ["export.csv", "export.jsonl"])
+def test_export_and_import_roundtrip(any_repo, tmp_path, name):
+    records = [full_entry(1), {**full_entry(2, time=1.25, finished=False), "user_name": "Bo, \"Bosse\""},
+               {**full_entry(3, difficulty="hard"), "journal": "A1 B2"}]
+    any_repo.bulk_append(records)
+    path = tmp_path / name
+    assert any_repo.export(path) == 3
+    back = sorted(read_scores(path), key=lambda e: e["game_id"])
+    assert back == sorted(any_repo.iter_records(), key=lambda e: e["game_id"])
+
+    other = ScoreRepository(Settings(), base_path=tmp_path / "other", filename="score.json")
+    assert other.bulk_append(read_scores(path)) == 3
+    assert other.bulk_append(read_scores(path)) == 0
+
+
+def test_export_unknown_format(repo, tmp_path):
+    with pytest.raises(ValueError, match="Okänt format"):
+        repo.export(tmp_path / "export.xml")
+
+
+def test_main_export_and_merge(tmp_path, capsys):
+    source = JsonlScoreRepository(Settings(), base_path=tmp_path, filename="a.jsonl")
+    source.bulk_append([full_entry(1), full_entry(2)])
+    main([str(source.path), str(tmp_path / "a.csv")])
+    target = JsonlScoreRepository(Settings(), base_path=tmp_path, filename="b.jsonl")
+    target.append(full_entry(2))
+    main(["--merge", str(tmp_path / "a.csv"), str(target.path)])
+    assert sorted(e["game_id"] for e in target.iter_records()) == [1, 2]
+    assert "Flyttade 1 poster" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("name", ["new.bin", "new.segments"])
+def test_main_migrates_to_format_of_target(tmp_path, capsys, name):
+    ScoreRepository(Settings(), base_path=tmp_path, filename="old.json").bulk_append(
+        [full_entry(1), full_entry(2)])
+    main([str(tmp_path / "old.json"), str(tmp_path / name)])
+    assert "Flyttade 2 poster" in capsys.readouterr().out
+    repo = open_score_repository(Settings(data_dir=tmp_path, score_file=name))
+    assert [e["game_id"] for e in repo.load()] == [1, 2]
+
+
+def test_main_rejects_unknown_target(tmp_path):
+    ScoreRepository(Settings(), base_path=tmp_path, filename="old.json").append(full_entry(1))
+    with pytest.raises(SystemExit):
+        main([str(tmp_path / "old.json"), str(tmp_path / "new.xml")])
+    assert not (tmp_path / "new.xml").exists()
+
+
+def test_rank_of_game_id_does_not_load_everything(tmp_path, monkeypatch):
+    repo = ScoreRepository(Settings(), base_path=tmp_path, filename="score.json")
+    repo.bulk_append([full_entry(1), full_entry(2)])
+    monkeypatch.setattr(repo, "load", None)
+    assert repo.rank_of_game_id(2).position == 2
+    assert repo.rank_of_game_id(3) is None
+
+
+def test_scan_matches_locate():
+    # få olika resultat så att många poster har lika nyckel
+    records = [dict(e, moves=e["moves"] % 3, time=1.0) for e in make_entries(60)]
+    finished = [e for e in records if e["finished"]]
+    ordered = sorted(finished, key=score_key)
+    keys = [score_key(e) for e in ordered]
+    probes = records + [entry(999, 1, 1.0), entry(998, 0, 0.5), entry(997, 99, 1.0)]
+    for e in probes:
+        for n in (0, 1, 3):
+            assert ScoreRank.scan(finished, e, n) == ScoreRank.locate(ordered, keys, e, n)
+
+
+def test_rank_of_game_id(any_repo):
+    for i, moves in enumerate([9, 5, 7]):
+        any_repo.append(entry(i, moves, 1.0))
+    assert any_repo.rank_of_game_id(2).position == 2
+    assert any_repo.rank_of_game_id(0, neighbours=1) == any_repo.rank_of(entry(0, 9, 1.0), neighbours=1)
+    assert any_repo.rank_of_game_id(42) is None
+
+
+def _append_many(cls, directory, filename, start, count):
+    repo = cls(Settings(), base_path=directory, filename=filename)
+    for i in range(start, start + count):
+        repo.append(entry(i))
+
+
+@pytest.mark.parametrize("cls, filename", [(ScoreRepository, "score.json"),
+                                           (JsonlScoreRepository, "score.jsonl")])
+def test_concurrent_processes_do_not_lose_entries(tmp_path, cls, filename):
+    ctx = multiprocessing.get_context("fork")
+    procs = [ctx.Process(target=_append_many, args=(cls, tmp_path, filename, p * 20, 20))
+             for p in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    records = cls(Settings(), base_path=tmp_path, filename=filename).load()
+    assert sorted(e["game_id"] for e in records) == list(range(80))
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_group_commit_batches_fsync(tmp_path, monkeypatch):
+    fsyncs = []
+    real_fsync = os.fsync
+    monkeypatch.setattr(os, "fsync", lambda fd: (fsyncs.append(fd), real_fsync(fd)))
+    repo = JsonlScoreRepository(Settings(), base_path=tmp_path, filename="score.jsonl",
+                                group_commit=0.2)
+    repo.index()
+    threads = [threading.Thread(target=repo.append, args=(entry(i),)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(e["game_id"] for e in repo.load()) == list(range(8))
+    assert len(fsyncs) < 8
+    # indexet uppdaterades med hela gruppen utan att läsa om filen
+    assert len(repo.index().records) == 8
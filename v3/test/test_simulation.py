@@ -0,0 +1,136 @@
+import pytest
+from types import SimpleNamespace
+
+import simulation
+from main import Settings, WordRepository, new_game
+from simulation import (
+    RandomPlayer, PerfectMemoryPlayer, ForgetfulPlayer,
+    BenchResult, Histogram, build_parser, make_player, play, bench, print_bench,
+    game_seed, percentile, player_seed, simulate
+)
+
+
+@pytest.fixture
+def settings(tmp_path):
+    (tmp_path / "memo.txt").write_text("\n".join(f"ord{i}" for i in range(40)), encoding="utf-8")
+    return Settings(data_dir=tmp_path)
+
+
+@pytest.fixture
+def word_repo(settings):
+    return WordRepository(settings)
+
+
+@pytest.mark.parametrize("player", [RandomPlayer(1), PerfectMemoryPlayer(1), ForgetfulPlayer(1, decay=0.5)])
+def test_players_finish_game(settings, word_repo, player):
+    game = new_game(settings, word_repo, "medium", seed=3)
+    latencies = play(game, player)
+    assert game.is_finished()
+    assert len(latencies) == game.moves
+
+
+def test_play_times_only_the_game(settings, word_repo, monkeypatch):
+    # klockan går ett steg per avläsning, spelarens val kostar 1000 till
+    now = [0]
+
+    def clock():
+        now[0] += 1
+        return now[0]
+
+    class SlowPlayer(PerfectMemoryPlayer):
+        def pick_first(self, game):
+            now[0] += 1000
+            return super().pick_first(game)
+
+        def pick_second(self, game, first):
+            now[0] += 1000
+            return super().pick_second(game, first)
+
+    monkeypatch.setattr(simulation, "time", SimpleNamespace(perf_counter_ns=clock))
+    game = new_game(settings, word_repo, "easy", seed=3)
+    bot = []
+    latencies = play(game, SlowPlayer(1), bot_latencies=bot)
+    assert latencies == [3] * game.moves
+    assert len(bot) == game.moves and all(t > 2000 for t in bot)
+
+
+def test_perfect_memory_beats_random(settings, word_repo):
+    perfect = bench(settings, word_repo, "easy", 30, "perfect", seed=1)
+    random_ = bench(settings, word_repo, "easy", 30, "random", seed=1)
+    assert sum(perfect.moves) < sum(random_.moves)
+    assert max(perfect.moves) <= 2 * 8
+
+
+def test_forgetful_without_decay_is_perfect(settings, word_repo):
+    a = new_game(settings, word_repo, "easy", seed=9)
+    b = new_game(settings, word_repo, "easy", seed=9)
+    play(a, PerfectMemoryPlayer(4))
+    play(b, ForgetfulPlayer(4, decay=0.0))
+    assert a.moves == b.moves
+
+
+def test_bench_is_deterministic(settings, word_repo):
+    first = bench(settings, word_repo, "easy", 10, "forgetful", seed=2, decay=0.2)
+    second = bench(settings, word_repo, "easy", 10, "forgetful", seed=2, decay=0.2)
+    assert first.moves == second.moves
+
+
+def test_make_player_unknown():
+    with pytest.raises(ValueError):
+        make_player("cheater")
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([], 50) == 0.0
+
+
+def test_histogram_merge_and_percentile():
+    a, b = Histogram(), Histogram()
+    for v in (1, 2, 2, 3):
+        a.add(v)
+    for v in (3, 4):
+        b.add(v)
+    a.merge(b)
+    assert a.total == 6
+    assert a.counts == {1: 1, 2: 2, 3: 2, 4: 1}
+    assert a.mean() == pytest.approx(15 / 6)
+    assert a.percentile(50) == 2
+    with pytest.raises(ValueError):
+        a.merge(Histogram(10))
+
+
+def test_simulate_independent_of_chunking(settings):
+    small = simulate(settings, "easy", 40, master_seed=7, workers=0, chunk_size=7)
+    large = simulate(settings, "easy", 40, master_seed=7, workers=0, chunk_size=40)
+    assert small.moves.counts == large.moves.counts
+    other = simulate(settings, "easy", 40, master_seed=8, workers=0)
+    assert other.moves.counts != small.moves.counts
+
+
+def test_simulate_process_pool_matches_serial(settings):
+    serial = simulate(settings, "easy", 30, master_seed=3, workers=0, chunk_size=10)
+    parallel = simulate(settings, "easy", 30, master_seed=3, workers=2, chunk_size=10)
+    assert parallel.moves.counts == serial.moves.counts
+    assert parallel.moves.total == 30
+
+
+@pytest.mark.parametrize("command", ["bench", "simulate"])
+def test_parser_rejects_zero_games(command):
+    with pytest.raises(SystemExit):
+        build_parser().parse_args([command, "--games", "0"])
+
+
+def test_print_bench_without_games(capsys):
+    print_bench(BenchResult("easy", 0, 0.0))
+    assert "Spel/s" in capsys.readouterr().out
+
+
+def test_player_seed_is_independent_of_game_seed():
+    seeds = [game_seed(0, i) for i in range(100)] + [game_seed(5, i) for i in range(100)]
+    derived = [player_seed(s) for s in seeds]
+    assert derived == [player_seed(s) for s in seeds]
+    assert not set(derived) & set(seeds)
+    assert len(set(derived)) == len(seeds)
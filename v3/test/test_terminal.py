@@ -0,0 +1,153 @@
+import io
+import os
+
+from main import Board, CardState
+from terminal import TerminalRenderer, CLEAR_SCREEN, move_to
+
+
+def big_terminal():
+    return os.terminal_size((1000, 1000))
+
+
+def make_board(size):
+    board = Board(size)
+    board.create_board([f"w{i}" for i in range(size * size // 2) for _ in range(2)])
+    return board
+
+
+def test_fallback_prints_whole_board():
+    out = io.StringIO()
+    board = make_board(4)
+    renderer = TerminalRenderer(out)
+    assert renderer.ansi is False
+    renderer.draw(board)
+    renderer.clear()
+    assert out.getvalue() == str(board) + "\n"
+
+
+def test_first_draw_is_full_then_only_changes():
+    out = io.StringIO()
+    board = make_board(4)
+    renderer = TerminalRenderer(out, ansi=True, terminal_size=big_terminal)
+    renderer.draw(board)
+    assert out.getvalue() == CLEAR_SCREEN + str(board) + "\n"
+
+    out.seek(0)
+    out.truncate()
+    board.get_card(1, 2).set_state(CardState.FLIPPED)
+    renderer.draw(board)
+    line, column, text = board.render_cell(1, 2)
+    assert line == 2
+    assert str(board).splitlines()[line][column:column + len(text)] == text
+    assert out.getvalue() == move_to(line, column) + text + move_to(5, 0) + "\x1b[J"
+
+    out.seek(0)
+    out.truncate()
+    renderer.draw(board)
+    assert out.getvalue() == move_to(5, 0) + "\x1b[J"
+
+
+def test_new_board_generation_triggers_full_redraw():
+    out = io.StringIO()
+    board = make_board(4)
+    renderer = TerminalRenderer(out, ansi=True, terminal_size=big_terminal)
+    renderer.draw(board)
+    board.create_board([f"x{i}" for i in range(8) for _ in range(2)])
+    out.seek(0)
+    out.truncate()
+    renderer.draw(board)
+    assert out.getvalue().startswith(CLEAR_SCREEN)
+
+
+def test_redraw_on_26x26_writes_only_changed_cells():
+    out = io.StringIO()
+    board = make_board(26)
+    renderer = TerminalRenderer(out, ansi=True, terminal_size=big_terminal)
+    renderer.draw(board)
+    full = len(out.getvalue())
+    tail = move_to(27, 0) + "\x1b[J"
+    for col in range(20):
+        for state in (CardState.FLIPPED, CardState.HIDDEN):
+            out.seek(0)
+            out.truncate()
+            board.get_card(3, col).set_state(state)
+            renderer.draw(board)
+            line, column, text = board.render_cell(3, col)
+            assert out.getvalue() == move_to(line, column) + text + tail
+            assert len(out.getvalue()) * 50 < full
+
+
+def test_board_too_large_for_terminal_prints_plain():
+    out = io.StringIO()
+    board = make_board(26)
+    size = os.terminal_size((80, 24))
+    renderer = TerminalRenderer(out, ansi=True, terminal_size=lambda: size)
+    renderer.draw(board)
+    assert out.getvalue() == str(board) + "\n"
+
+    # terminalen görs större: nästa draw ritar om allt med escape-koder
+    size = os.terminal_size((1000, 1000))
+    out.seek(0)
+    out.truncate()
+    renderer.draw(board)
+    assert out.getvalue() == CLEAR_SCREEN + str(board) + "\n"
+
+    # och mindre igen mitt i spelet
+    size = os.terminal_size((1000, 20))
+    board.get_card(0, 0).set_state(CardState.FLIPPED)
+    out.seek(0)
+    out.truncate()
+    renderer.draw(board)
+    assert out.getvalue() == str(board) + "\n"
+
+
+def test_play_game_uses_renderer(monkeypatch, tmp_path):
+    import cli
+    from main import Settings, WordRepository
+    (tmp_path / "memo.txt").write_text("a\nb\nc\nd", encoding="utf-8")
+    settings = Settings(difficulties={"tiny": 2}, data_dir=tmp_path)
+    answers = iter(["tiny", "A1", "B1", "", "q"])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(answers))
+    out = io.StringIO()
+    game = cli.play_game(settings, WordRepository(settings), TerminalRenderer(out, ansi=True, terminal_size=big_terminal))
+    assert game.moves == 1
+    assert out.getvalue().count(CLEAR_SCREEN) == 2
+
+
+def test_terminal_with_room_for_prompt_but_not_enter_prints_plain():
+    out = io.StringIO()
+    board = make_board(4)
+    # rubrik + 4 rader + frågeraden, men Enter efter input() rullar
+    renderer = TerminalRenderer(out, ansi=True, terminal_size=lambda: os.terminal_size((80, 6)))
+    renderer.draw(board)
+    assert out.getvalue() == str(board) + "\n"
+
+    renderer.terminal_size = lambda: os.terminal_size((80, 7))
+    out.seek(0)
+    out.truncate()
+    renderer.draw(board)
+    assert out.getvalue().startswith(CLEAR_SCREEN)
+
+
+def test_message_makes_next_draw_full():
+    out = io.StringIO()
+    board = make_board(4)
+    renderer = TerminalRenderer(out, ansi=True, terminal_size=big_terminal)
+    renderer.draw(board)
+    renderer.message("Ogiltig koordinat")
+    out.seek(0)
+    out.truncate()
+    renderer.draw(board)
+    assert out.getvalue() == CLEAR_SCREEN + str(board) + "\n"
+
+
+def test_play_game_redraws_after_invalid_move(monkeypatch, tmp_path):
+    import cli
+    from main import Settings, WordRepository
+    (tmp_path / "memo.txt").write_text("a\nb\nc\nd", encoding="utf-8")
+    settings = Settings(difficulties={"tiny": 2}, data_dir=tmp_path)
+    answers = iter(["tiny", "Z9", "A1", "B1", "", "q"])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(answers))
+    out = io.StringIO()
+    cli.play_game(settings, WordRepository(settings), TerminalRenderer(out, ansi=True, terminal_size=big_terminal))
+    assert out.getvalue().count(CLEAR_SCREEN) == 3